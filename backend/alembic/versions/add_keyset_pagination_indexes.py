@@ -0,0 +1,63 @@
+"""add_keyset_pagination_indexes
+
+Índices compostos (user_id, <timestamp> DESC, id DESC) para paginação por cursor (keyset)
+em transactions, notifications e activity_feed (core/pagination.py).
+Substituem os índices (user_id, date) / (user_id, created_at), que são prefixo dos novos.
+
+Revision ID: add_keyset_pagination_indexes
+Revises: partition_ledger_monthly
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "add_keyset_pagination_indexes"
+down_revision: Union[str, Sequence[str], None] = "partition_ledger_monthly"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (tabela, novo índice, coluna de ordenação, índice substituído ou None)
+KEYSET_INDEXES = [
+    ("transactions", "idx_transactions_user_date_id", "date", "idx_transactions_user_date"),
+    ("notifications", "idx_notifications_user_created_id", "created_at", "idx_notifications_user_created"),
+    ("activity_feed", "idx_activity_feed_user_created_id", "created_at", None),
+]
+
+
+def _index_names(conn, table: str) -> set:
+    return {ix["name"] for ix in sa.inspect(conn).get_indexes(table)}
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    tables = set(sa.inspect(conn).get_table_names())
+    for table, name, sort_column, replaced in KEYSET_INDEXES:
+        if table not in tables:
+            continue
+        existing = _index_names(conn, table)
+        if name not in existing:
+            op.create_index(
+                name,
+                table,
+                ["user_id", sa.text(f"{sort_column} DESC"), sa.text("id DESC")],
+                unique=False,
+            )
+        if replaced and replaced in existing:
+            op.drop_index(replaced, table_name=table)
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    tables = set(sa.inspect(conn).get_table_names())
+    for table, name, sort_column, replaced in reversed(KEYSET_INDEXES):
+        if table not in tables:
+            continue
+        existing = _index_names(conn, table)
+        if replaced and replaced not in existing:
+            op.create_index(replaced, table, ["user_id", sort_column], unique=False)
+        if name in existing:
+            op.drop_index(name, table_name=table)
@@ -0,0 +1,58 @@
+"""add_monthly_category_totals
+
+Rollup monthly_category_totals (user_id, year_month AAAAMM, category_id, type) -> total_cents,
+count, mantido por TransactionService a cada escrita. Resumo mensal, cashflow, resumo por
+categoria, insights e alertas de orçamento passam a ler o rollup em vez de agregar transactions.
+Backfill a partir das transações existentes (não excluídas) no upgrade.
+
+Revision ID: add_monthly_category_totals
+Revises: add_tags_user_name_unique
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "add_monthly_category_totals"
+down_revision: Union[str, Sequence[str], None] = "add_tags_user_name_unique"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "monthly_category_totals",
+        sa.Column("user_id", sa.String(), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("year_month", sa.Integer(), nullable=False),
+        sa.Column("category_id", sa.String(), sa.ForeignKey("categories.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("type", sa.String(length=20), nullable=False),
+        sa.Column("total_cents", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("count", sa.Integer(), nullable=False, server_default="0"),
+        sa.PrimaryKeyConstraint("user_id", "year_month", "category_id", "type"),
+    )
+
+    # Mesmo cálculo de rebuild_monthly_totals (mês em UTC no PostgreSQL)
+    if op.get_bind().dialect.name == "postgresql":
+        month_key = (
+            "CAST(EXTRACT(YEAR FROM timezone('UTC', date)) * 100"
+            " + EXTRACT(MONTH FROM timezone('UTC', date)) AS INTEGER)"
+        )
+    else:
+        month_key = "CAST(substr(date, 1, 4) || substr(date, 6, 2) AS INTEGER)"
+    op.execute(
+        f"""
+        INSERT INTO monthly_category_totals (user_id, year_month, category_id, type, total_cents, count)
+        SELECT user_id, {month_key}, category_id, type,
+               SUM(CAST(ROUND(amount * 100) AS BIGINT)), COUNT(*)
+        FROM transactions
+        WHERE deleted_at IS NULL
+        GROUP BY user_id, {month_key}, category_id, type
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("monthly_category_totals")
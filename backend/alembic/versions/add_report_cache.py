@@ -0,0 +1,43 @@
+"""add_report_cache
+
+Cache de relatórios versionado: user_data_versions (contador por usuário incrementado a cada
+escrita de transações/categorias) e report_cache_entries (backend compartilhado opcional,
+REPORT_CACHE_BACKEND=db; uma linha por usuário + relatório + parâmetros).
+
+Revision ID: add_report_cache
+Revises: add_monthly_category_totals
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "add_report_cache"
+down_revision: Union[str, Sequence[str], None] = "add_monthly_category_totals"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "user_data_versions",
+        sa.Column("user_id", sa.String(), sa.ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("version", sa.BigInteger(), nullable=False, server_default="0"),
+    )
+    op.create_table(
+        "report_cache_entries",
+        sa.Column("user_id", sa.String(), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("cache_key", sa.String(length=255), nullable=False),
+        sa.Column("data_version", sa.BigInteger(), nullable=False),
+        sa.Column("data", sa.JSON(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint("user_id", "cache_key"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("report_cache_entries")
+    op.drop_table("user_data_versions")
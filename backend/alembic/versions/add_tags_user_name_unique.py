@@ -0,0 +1,89 @@
+"""add_tags_user_name_unique
+
+Índice UNIQUE (user_id, name) em tags: alvo do INSERT ... ON CONFLICT DO NOTHING da
+resolução de tags em lote (TagRepository.resolve_ids). Antes de criá-lo, tags repetidas
+do mesmo usuário são fundidas na de menor id: vínculos que colidiriam com o UNIQUE
+(transaction_id, tag_id) são removidos primeiro, os demais são repontados.
+Substitui o índice não único idx_tags_user_name.
+
+Revision ID: add_tags_user_name_unique
+Revises: add_transaction_search
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "add_tags_user_name_unique"
+down_revision: Union[str, Sequence[str], None] = "add_transaction_search"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # transaction_tags já tem UNIQUE (transaction_id, tag_id) (idx_transaction_tags_unique):
+    # antes de repontar, remove os vínculos que colidiriam — transação que já tem outra tag do
+    # mesmo (user_id, name) com id menor (a canônica ou outra duplicada). Sobra um vínculo por
+    # grupo em cada transação.
+    op.execute(
+        """
+        DELETE FROM transaction_tags
+        WHERE EXISTS (
+            SELECT 1 FROM transaction_tags o
+            JOIN tags ot ON ot.id = o.tag_id
+            JOIN tags lt ON lt.id = transaction_tags.tag_id
+            WHERE o.transaction_id = transaction_tags.transaction_id
+              AND ot.user_id = lt.user_id AND ot.name = lt.name
+              AND ot.id < lt.id
+        )
+        """
+    )
+    # Vínculos restantes de tags duplicadas -> tag canônica (menor id com mesmo user_id e name)
+    op.execute(
+        """
+        UPDATE transaction_tags SET tag_id = (
+            SELECT MIN(c.id) FROM tags c
+            JOIN tags d ON d.user_id = c.user_id AND d.name = c.name
+            WHERE d.id = transaction_tags.tag_id
+        )
+        WHERE tag_id IN (
+            SELECT t.id FROM tags t
+            WHERE EXISTS (
+                SELECT 1 FROM tags o
+                WHERE o.user_id = t.user_id AND o.name = t.name AND o.id < t.id
+            )
+        )
+        """
+    )
+    op.execute(
+        """
+        DELETE FROM transaction_tags
+        WHERE EXISTS (
+            SELECT 1 FROM transaction_tags o
+            WHERE o.transaction_id = transaction_tags.transaction_id
+              AND o.tag_id = transaction_tags.tag_id
+              AND o.id < transaction_tags.id
+        )
+        """
+    )
+    op.execute(
+        """
+        DELETE FROM tags
+        WHERE EXISTS (
+            SELECT 1 FROM tags o
+            WHERE o.user_id = tags.user_id AND o.name = tags.name AND o.id < tags.id
+        )
+        """
+    )
+    op.create_index("uq_tags_user_name", "tags", ["user_id", "name"], unique=True)
+    existing = {ix["name"] for ix in sa.inspect(op.get_bind()).get_indexes("tags")}
+    if "idx_tags_user_name" in existing:
+        op.drop_index("idx_tags_user_name", table_name="tags")
+
+
+def downgrade() -> None:
+    op.create_index("idx_tags_user_name", "tags", ["user_id", "name"], unique=False)
+    op.drop_index("uq_tags_user_name", table_name="tags")
@@ -0,0 +1,53 @@
+"""add_transaction_search
+
+Busca textual em transactions.description (db/search.py).
+PostgreSQL: extensões unaccent e pg_trgm, função f_unaccent (IMMUTABLE), coluna gerada
+search_vector (tsvector 'portuguese') com índice GIN e índice GIN trigram em description.
+SQLite: tabela FTS5 externa transactions_fts + triggers, populada com 'rebuild'.
+
+Revision ID: add_transaction_search
+Revises: add_keyset_pagination_indexes
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from db.search import (
+    POSTGRES_SEARCH_DDL,
+    SQLITE_SEARCH_DDL,
+    SQLITE_SEARCH_DROP,
+    SQLITE_SEARCH_REBUILD,
+)
+
+
+revision: str = "add_transaction_search"
+down_revision: Union[str, Sequence[str], None] = "add_keyset_pagination_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == "postgresql":
+        # Coluna gerada: o ADD COLUMN reescreve a tabela e calcula o tsvector das linhas existentes
+        for statement in POSTGRES_SEARCH_DDL:
+            op.execute(statement)
+    elif dialect == "sqlite":
+        for statement in SQLITE_SEARCH_DDL:
+            op.execute(statement)
+        op.execute(SQLITE_SEARCH_REBUILD)
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == "postgresql":
+        op.execute("DROP INDEX IF EXISTS idx_transactions_description_trgm")
+        op.execute("DROP INDEX IF EXISTS idx_transactions_search_vector")
+        op.execute("ALTER TABLE transactions DROP COLUMN IF EXISTS search_vector")
+        op.execute("DROP FUNCTION IF EXISTS f_unaccent(text)")
+    elif dialect == "sqlite":
+        for trigger in ("transactions_fts_ai", "transactions_fts_ad", "transactions_fts_au"):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute(SQLITE_SEARCH_DROP)
@@ -0,0 +1,120 @@
+"""ledger_entries particionada por mês (RANGE em created_at)
+
+Revision ID: partition_ledger_monthly
+Revises: automation_payment_reminder
+Create Date: 2026-10-17
+
+Só PostgreSQL (SQLite: no-op). Recria ledger_entries como tabela particionada:
+PK (id, created_at) — exigência do particionamento —, partições mensais desde o mês da
+entrada mais antiga até 3 meses à frente e uma partição DEFAULT de segurança.
+Dados copiados da tabela antiga na mesma transação da migração.
+Partições futuras: job agendado (db/partitions.ensure_all_partitions).
+transactions continua não particionada (ver db/partitions.py).
+"""
+from datetime import date
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "partition_ledger_monthly"
+down_revision: Union[str, Sequence[str], None] = "automation_payment_reminder"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+MONTHS_AHEAD = 3
+
+LEDGER_INDEXES = [
+    ("idx_ledger_entries_account_created", ["account_id", "created_at"]),
+    ("idx_ledger_entries_user_created", ["user_id", "created_at"]),
+    ("ix_ledger_entries_user_id", ["user_id"]),
+    ("ix_ledger_entries_account_id", ["account_id"]),
+    ("ix_ledger_entries_transaction_id", ["transaction_id"]),
+]
+
+LEDGER_COLUMNS = "id, user_id, account_id, transaction_id, amount, entry_type, created_at"
+
+
+def _add_months(year: int, month: int, n: int):
+    idx = year * 12 + (month - 1) + n
+    return idx // 12, idx % 12 + 1
+
+
+def _ledger_columns(primary_key: bool):
+    return [
+        sa.Column("id", sa.String(), nullable=False, primary_key=primary_key),
+        sa.Column("user_id", sa.String(), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("account_id", sa.String(), sa.ForeignKey("accounts.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("transaction_id", sa.String(), sa.ForeignKey("transactions.id", ondelete="SET NULL"), nullable=True),
+        sa.Column("amount", sa.Numeric(15, 2), nullable=False),
+        sa.Column("entry_type", sa.String(10), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("CURRENT_TIMESTAMP"), nullable=False),
+        sa.CheckConstraint("entry_type IN ('credit', 'debit')", name="check_ledger_entry_type"),
+        sa.CheckConstraint(
+            "(entry_type = 'credit' AND amount > 0) OR (entry_type = 'debit' AND amount < 0)",
+            name="check_ledger_amount_sign",
+        ),
+    ]
+
+
+def _drop_ledger_indexes() -> None:
+    for name, _ in LEDGER_INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS {name}")
+
+
+def _create_ledger_indexes() -> None:
+    for name, columns in LEDGER_INDEXES:
+        op.create_index(name, "ledger_entries", columns)
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    if conn.dialect.name != "postgresql":
+        return
+
+    op.rename_table("ledger_entries", "ledger_entries_old")
+    _drop_ledger_indexes()
+
+    op.create_table(
+        "ledger_entries",
+        *_ledger_columns(primary_key=False),
+        sa.PrimaryKeyConstraint("id", "created_at", name="ledger_entries_pkey_partitioned"),
+        postgresql_partition_by="RANGE (created_at)",
+    )
+
+    oldest = conn.execute(sa.text("SELECT MIN(created_at) FROM ledger_entries_old")).scalar()
+    today = date.today()
+    start = oldest.date() if oldest is not None else today
+    year, month = start.year, start.month
+    last_year, last_month = _add_months(today.year, today.month, MONTHS_AHEAD)
+    while (year, month) <= (last_year, last_month):
+        ny, nm = _add_months(year, month, 1)
+        op.execute(
+            f"CREATE TABLE ledger_entries_y{year:04d}m{month:02d} PARTITION OF ledger_entries "
+            f"FOR VALUES FROM ('{date(year, month, 1).isoformat()}') TO ('{date(ny, nm, 1).isoformat()}')"
+        )
+        year, month = ny, nm
+    op.execute("CREATE TABLE ledger_entries_default PARTITION OF ledger_entries DEFAULT")
+
+    _create_ledger_indexes()
+    op.execute(
+        f"INSERT INTO ledger_entries ({LEDGER_COLUMNS}) SELECT {LEDGER_COLUMNS} FROM ledger_entries_old"
+    )
+    op.drop_table("ledger_entries_old")
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    if conn.dialect.name != "postgresql":
+        return
+
+    op.rename_table("ledger_entries", "ledger_entries_partitioned")
+    _drop_ledger_indexes()
+    op.create_table("ledger_entries", *_ledger_columns(primary_key=True))
+    _create_ledger_indexes()
+    op.execute(
+        f"INSERT INTO ledger_entries ({LEDGER_COLUMNS}) SELECT {LEDGER_COLUMNS} FROM ledger_entries_partitioned"
+    )
+    # Remove a tabela particionada e todas as partições
+    op.execute("DROP TABLE ledger_entries_partitioned CASCADE")
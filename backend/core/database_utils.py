@@ -3,19 +3,42 @@ Utilitários para operações de banco de dados.
 Transações atômicas: commit em sucesso, rollback automático em qualquer exceção.
 Nenhuma escrita parcial pode ser persistida.
 Trilha 7: safe_insert_or_ignore para jobs (evita duplicação por UNIQUE).
+bulk_upsert: INSERT ... ON CONFLICT DO UPDATE multi-linha (PostgreSQL e SQLite).
+bulk_insert_ignore: INSERT ... ON CONFLICT DO NOTHING multi-linha (RETURNING no PostgreSQL).
+run_with_conflict_retry: atomic_transaction com retentativas (backoff + jitter) em conflito de concorrência.
 """
-from typing import TypeVar, Callable, Any
+from typing import TypeVar, Callable, Any, List, Optional, Sequence
 from sqlalchemy.orm import Session
-from sqlalchemy.exc import IntegrityError
+from sqlalchemy import Table
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import DBAPIError, IntegrityError
 from contextlib import contextmanager
 import logging
+import os
+import random
+import time
 
 from fastapi import HTTPException
 
+from core.ledger_utils import ConcurrencyConflictError
+from core.prometheus_metrics import (
+    db_conflict_retries_total,
+    db_conflict_exhausted_total,
+    db_transaction_attempts,
+)
+
 logger = logging.getLogger("vai_de_pix.database")
 
 T = TypeVar("T")
 
+# Retentativa em conflito de concorrência (row_version / serialization failure / deadlock)
+TX_CONFLICT_MAX_ATTEMPTS = max(1, int(os.getenv("TX_CONFLICT_MAX_ATTEMPTS", "3")))
+TX_CONFLICT_BACKOFF_BASE_MS = float(os.getenv("TX_CONFLICT_BACKOFF_BASE_MS", "10"))
+TX_CONFLICT_BACKOFF_MAX_MS = float(os.getenv("TX_CONFLICT_BACKOFF_MAX_MS", "200"))
+
+# SQLSTATE do PostgreSQL: serialization_failure, deadlock_detected
+_RETRYABLE_PGCODES = {"40001", "40P01"}
+
 
 @contextmanager
 def atomic_transaction(db: Session):
@@ -81,6 +104,74 @@ def execute_atomic_operation(
         raise
 
 
+def is_retryable_conflict(exc: BaseException) -> bool:
+    """
+    True se a exceção (ou a que a originou) é conflito de concorrência transitório:
+    ConcurrencyConflictError do ledger (inclusive convertida em HTTP 409 pelo service)
+    ou serialization failure / deadlock do PostgreSQL.
+    """
+    seen = set()
+    while exc is not None and id(exc) not in seen:
+        seen.add(id(exc))
+        if isinstance(exc, ConcurrencyConflictError):
+            return True
+        if isinstance(exc, DBAPIError) and getattr(exc.orig, "pgcode", None) in _RETRYABLE_PGCODES:
+            return True
+        exc = exc.__cause__ or exc.__context__
+    return False
+
+
+def _conflict_backoff_seconds(attempt: int) -> float:
+    """Full jitter: uniforme em [0, min(max, base * 2^(attempt-1))] ms."""
+    cap = min(TX_CONFLICT_BACKOFF_MAX_MS, TX_CONFLICT_BACKOFF_BASE_MS * (2 ** (attempt - 1)))
+    return random.uniform(0, cap) / 1000.0
+
+
+def run_with_conflict_retry(
+    db: Session,
+    operation: Callable[[], T],
+    operation_name: str = "transaction",
+    max_attempts: Optional[int] = None,
+) -> T:
+    """
+    Executa operation() dentro de atomic_transaction; em conflito de concorrência
+    (is_retryable_conflict) faz rollback, espera backoff exponencial com jitter e refaz,
+    até max_attempts (padrão TX_CONFLICT_MAX_ATTEMPTS). Esgotadas as tentativas, re-levanta
+    a última exceção (o service já a converte em HTTP 409).
+    operation deve ser refazível do zero: relê/trava contas a cada chamada (objetos ORM
+    carregados antes são expirados no rollback e recarregados no acesso).
+    """
+    attempts = max_attempts or TX_CONFLICT_MAX_ATTEMPTS
+    for attempt in range(1, attempts + 1):
+        try:
+            with atomic_transaction(db):
+                result = operation()
+            db_transaction_attempts.labels(operation=operation_name).observe(attempt)
+            return result
+        except Exception as e:
+            if not is_retryable_conflict(e):
+                raise
+            if attempt >= attempts:
+                db_conflict_exhausted_total.labels(operation=operation_name).inc()
+                db_transaction_attempts.labels(operation=operation_name).observe(attempt)
+                logger.warning(
+                    "Conflito de concorrência em %s após %s tentativa(s); desistindo",
+                    operation_name,
+                    attempt,
+                )
+                raise
+            db_conflict_retries_total.labels(operation=operation_name).inc()
+            delay = _conflict_backoff_seconds(attempt)
+            logger.info(
+                "Conflito de concorrência em %s (tentativa %s/%s); retentando em %.0f ms",
+                operation_name,
+                attempt,
+                attempts,
+                delay * 1000,
+            )
+            time.sleep(delay)
+
+
 def safe_insert_or_ignore(db: Session, instance: Any) -> bool:
     """
     Insere o objeto; em conflito de UNIQUE (IntegrityError), reverte apenas este insert e retorna False.
@@ -100,3 +191,65 @@ def safe_insert_or_ignore(db: Session, instance: Any) -> bool:
         # Savepoint (begin_nested) já foi revertido ao sair do with por exceção; não fazer rollback da sessão inteira
         return False
 
+
+def bulk_upsert(
+    db: Session,
+    table: Table,
+    rows: List[dict],
+    index_elements: Sequence[str],
+    update_columns: Sequence[str] = (),
+    increment_columns: Sequence[str] = (),
+) -> int:
+    """
+    Upsert em lote: um INSERT ... ON CONFLICT (index_elements) DO UPDATE SET update_columns = excluded.*
+    para todas as linhas (executemany). index_elements deve corresponder a um índice/constraint UNIQUE.
+    increment_columns: somadas ao valor existente (col = col + excluded.col), ex.: contadores/rollups.
+    Suporta PostgreSQL e SQLite (dev/testes). Retorna quantidade de linhas enviadas.
+    """
+    if not rows:
+        return 0
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        stmt = postgresql.insert(table)
+    elif dialect == "sqlite":
+        stmt = sqlite.insert(table)
+    else:
+        raise NotImplementedError(f"bulk_upsert não suportado para o dialeto {dialect}")
+    stmt = stmt.on_conflict_do_update(
+        index_elements=list(index_elements),
+        set_={
+            **{col: stmt.excluded[col] for col in update_columns},
+            **{col: table.c[col] + stmt.excluded[col] for col in increment_columns},
+        },
+    )
+    db.execute(stmt, rows)
+    return len(rows)
+
+
+def bulk_insert_ignore(
+    db: Session,
+    table: Table,
+    rows: List[dict],
+    index_elements: Sequence[str],
+    returning: Optional[Sequence[str]] = None,
+) -> Optional[List[tuple]]:
+    """
+    INSERT multi-linha ... ON CONFLICT (index_elements) DO NOTHING (um statement).
+    returning: colunas devolvidas das linhas efetivamente inseridas — só no PostgreSQL;
+    em SQLite retorna None e o chamador relê o que precisar.
+    """
+    if not rows:
+        return []
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        stmt = postgresql.insert(table).values(rows)
+    elif dialect == "sqlite":
+        stmt = sqlite.insert(table).values(rows)
+    else:
+        raise NotImplementedError(f"bulk_insert_ignore não suportado para o dialeto {dialect}")
+    stmt = stmt.on_conflict_do_nothing(index_elements=list(index_elements))
+    if returning and dialect == "postgresql":
+        stmt = stmt.returning(*[table.c[col] for col in returning])
+        return [tuple(row) for row in db.execute(stmt)]
+    db.execute(stmt)
+    return None
@@ -2,14 +2,24 @@
 Utilitários do ledger contábil.
 Saldo da conta = SUM(amount) das entradas do ledger (amount já é signed).
 Trilha 6.2: sync usa row_version (optimistic locking); conflito → ConcurrencyConflictError (409).
+Caminho de escrita: apply_balance_deltas aplica o delta das entradas recém-anexadas
+(custo constante); SUM completo do ledger fica como verificação opt-in (LEDGER_VERIFY_BALANCE).
 """
+import os
 from decimal import Decimal
 from datetime import datetime
+from typing import Dict, Optional
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from sqlalchemy import update
+from sqlalchemy import and_, case, func
+from sqlalchemy import update, select
 
 from models import LedgerEntry, Account
+from core.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Verificação opt-in: após aplicar o delta, confere account.balance com SUM(ledger) e corrige divergência.
+LEDGER_VERIFY_BALANCE = os.getenv("LEDGER_VERIFY_BALANCE", "").strip().lower() in ("1", "true", "yes")
 
 
 class ConcurrencyConflictError(Exception):
@@ -51,3 +61,134 @@ def sync_account_balance_from_ledger(account_id: str, db: Session) -> None:
         raise ConcurrencyConflictError(
             f"Conta {account_id} foi alterada por outra transação; refaça a operação."
         )
+
+
+def _supports_update_returning(db: Session) -> bool:
+    """True se o dialeto suporta UPDATE ... RETURNING (PostgreSQL)."""
+    dialect = db.get_bind().dialect
+    return bool(getattr(dialect, "full_returning", False) or getattr(dialect, "update_returning", False))
+
+
+def apply_balance_delta(
+    account_id: str,
+    delta: Decimal,
+    db: Session,
+    *,
+    verify: Optional[bool] = None,
+) -> Decimal:
+    """
+    Aplica delta (soma signed das entradas recém-anexadas ao ledger) em account.balance:
+    UPDATE accounts SET balance = balance + :delta, row_version = row_version + 1 ... RETURNING balance.
+    Custo constante, independente do tamanho do histórico da conta.
+    Chamar com a conta já bloqueada (advisory lock + FOR UPDATE).
+    verify=True (default: LEDGER_VERIFY_BALANCE): confere com SUM(ledger); divergência → log ERROR e ressincroniza.
+    Conta inexistente (0 linhas) → ConcurrencyConflictError.
+    """
+    delta = Decimal(str(delta))
+    accounts = Account.__table__
+    stmt = (
+        update(accounts)
+        .where(accounts.c.id == account_id)
+        .values(
+            balance=accounts.c.balance + delta,
+            row_version=accounts.c.row_version + 1,
+            updated_at=datetime.now(),
+        )
+    )
+    if _supports_update_returning(db):
+        row = db.execute(stmt.returning(accounts.c.balance)).first()
+        if row is None:
+            raise ConcurrencyConflictError(
+                f"Conta {account_id} foi alterada por outra transação; refaça a operação."
+            )
+        balance = Decimal(str(row[0]))
+    else:
+        result = db.execute(stmt)
+        if result.rowcount == 0:
+            raise ConcurrencyConflictError(
+                f"Conta {account_id} foi alterada por outra transação; refaça a operação."
+            )
+        balance = Decimal(str(db.execute(
+            select(accounts.c.balance).where(accounts.c.id == account_id)
+        ).scalar()))
+
+    if verify is None:
+        verify = LEDGER_VERIFY_BALANCE
+    if verify:
+        ledger_balance = get_balance_from_ledger(account_id, db)
+        if ledger_balance != balance:
+            logger.error(
+                "Saldo incremental divergente do ledger; ressincronizando",
+                extra={"account_id": account_id, "diff_abs": float(abs(ledger_balance - balance))},
+            )
+            db.execute(
+                update(accounts)
+                .where(accounts.c.id == account_id)
+                .values(balance=ledger_balance)
+            )
+            balance = ledger_balance
+    return balance
+
+
+def apply_balance_deltas(
+    deltas: Dict[str, Decimal],
+    db: Session,
+    *,
+    verify: Optional[bool] = None,
+) -> Dict[str, Decimal]:
+    """
+    Aplica os deltas por conta (ver LedgerRepository.pop_balance_deltas) em ordem de account_id,
+    a mesma ordem dos locks. Retorna {account_id: saldo resultante}.
+    """
+    return {
+        account_id: apply_balance_delta(account_id, deltas[account_id], db, verify=verify)
+        for account_id in sorted(deltas)
+    }
+
+
+def get_account_balance(account_id: str, db: Session, *, verify: Optional[bool] = None) -> Decimal:
+    """
+    Saldo corrente da conta lido de accounts.balance (mantido por apply_balance_delta).
+    Com a conta bloqueada (FOR UPDATE) o valor é consistente; lê a coluna direto do banco
+    (não usa o objeto em cache da sessão). verify=True: usa SUM(ledger) (fonte da verdade).
+    """
+    if verify is None:
+        verify = LEDGER_VERIFY_BALANCE
+    if verify:
+        return get_balance_from_ledger(account_id, db)
+    result = db.execute(
+        select(Account.__table__.c.balance).where(Account.__table__.c.id == account_id)
+    ).scalar()
+    return Decimal(str(result)) if result is not None else Decimal("0.0")
+
+
+def transfer_leg_sign(leg, partner):
+    """
+    Expressão SQL: +1 se a perna de transferência `leg` é a entrada (crédito), −1 se é a saída,
+    NULL se não dá para saber. Não usa a descrição (editável pelo usuário):
+      1. sinal das entradas do ledger da própria perna;
+      2. senão, o oposto do sinal do ledger da perna pareada (transfer_transaction_id);
+      3. senão (nenhuma perna no ledger), a ordem do par: a saída é inserida primeiro e recebe
+         transfer_transaction_id num UPDATE (updated_at preenchido) depois da entrada.
+    `leg` e `partner` são aliases de Transaction; o chamador faz o outer join
+    partner.id == leg.transfer_transaction_id.
+    """
+    def _ledger_sum(tx):
+        return (
+            select(func.sum(LedgerEntry.amount))
+            .where(LedgerEntry.transaction_id == tx.id)
+            .scalar_subquery()
+        )
+
+    own, other = _ledger_sum(leg), _ledger_sum(partner)
+    return case(
+        (own > 0, 1),
+        (own < 0, -1),
+        (other > 0, -1),
+        (other < 0, 1),
+        (leg.created_at > partner.created_at, 1),
+        (leg.created_at < partner.created_at, -1),
+        (and_(leg.updated_at.is_(None), partner.updated_at.isnot(None)), 1),
+        (and_(leg.updated_at.isnot(None), partner.updated_at.is_(None)), -1),
+        else_=None,
+    )
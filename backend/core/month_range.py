@@ -0,0 +1,49 @@
+"""
+Intervalos de mês semiabertos [primeiro dia, primeiro dia do mês seguinte) para consultas.
+
+Filtros como extract('month', date) == m ou date <= último_dia não usam o índice
+(user_id, date) — o primeiro aplica função na coluna; o segundo, com date sendo datetime,
+ainda perde as transações do último dia depois de 00:00. Os leitores mensais calculam os
+limites uma vez (MonthRange) e filtram com date >= start AND date < end.
+"""
+from datetime import date, datetime
+from typing import NamedTuple, Union
+
+from sqlalchemy import and_
+
+
+class MonthRange(NamedTuple):
+    start: datetime  # inclusivo
+    end: datetime  # exclusivo (primeiro instante do mês seguinte)
+
+    @classmethod
+    def of(cls, year: int, month: int) -> "MonthRange":
+        """Intervalo do mês (year, month)."""
+        next_year, next_month = (year + 1, 1) if month == 12 else (year, month + 1)
+        return cls(datetime(year, month, 1), datetime(next_year, next_month, 1))
+
+    @classmethod
+    def containing(cls, value: Union[date, datetime]) -> "MonthRange":
+        """Intervalo do mês que contém value."""
+        return cls.of(value.year, value.month)
+
+    @property
+    def year(self) -> int:
+        return self.start.year
+
+    @property
+    def month(self) -> int:
+        return self.start.month
+
+    def shift(self, months: int) -> "MonthRange":
+        """Mesmo intervalo deslocado de `months` meses (negativo = para trás)."""
+        index = self.start.year * 12 + self.start.month - 1 + months
+        return MonthRange.of(index // 12, index % 12 + 1)
+
+    def through(self, other: "MonthRange") -> "MonthRange":
+        """Intervalo deste mês até o fim de `other` (inclusive)."""
+        return MonthRange(self.start, other.end)
+
+    def filter(self, column):
+        """Predicado column >= start AND column < end (usa índice em column)."""
+        return and_(column >= self.start, column < self.end)
@@ -0,0 +1,88 @@
+"""
+Paginação por cursor (keyset) para listagens ordenadas por (timestamp DESC, id DESC).
+Cursor opaco: base64 url-safe de "<timestamp ISO>|<id>". A página seguinte filtra
+(ts, id) < cursor em vez de OFFSET: custo constante por página e sem linhas repetidas/puladas
+quando novos registros entram no topo da lista.
+Header X-Next-Cursor nas respostas de listagem (corpo continua sendo a lista, compatível com skip).
+"""
+import base64
+import binascii
+from datetime import datetime
+from typing import Optional, Tuple
+
+from fastapi import HTTPException, Response, status
+from sqlalchemy import and_, func, or_, select
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(sort_value: datetime, row_id: str) -> str:
+    """Cursor opaco a partir do último item da página."""
+    raw = f"{sort_value.isoformat()}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """(timestamp, id) do cursor; HTTP 400 se malformado."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8")
+        ts, row_id = raw.split("|", 1)
+        if not row_id:
+            raise ValueError("id vazio")
+        return datetime.fromisoformat(ts), row_id
+    except (ValueError, UnicodeError, binascii.Error):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor de paginação inválido",
+        )
+
+
+def encode_rank_cursor(score: float, row_id: str) -> str:
+    """Cursor de listagens ordenadas por relevância (score DESC, id DESC), ex.: busca."""
+    raw = f"{float(score)!r}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_rank_cursor(cursor: str) -> Tuple[float, str]:
+    """(score, id) do cursor de relevância; HTTP 400 se malformado."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8")
+        score, row_id = raw.split("|", 1)
+        if not row_id:
+            raise ValueError("id vazio")
+        return float(score), row_id
+    except (ValueError, UnicodeError, binascii.Error):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor de paginação inválido",
+        )
+
+
+def keyset_before(model, sort_column, cursor: str):
+    """
+    Filtro (sort_column, id) < cursor para ordenação DESC.
+    O timestamp de comparação é lido do próprio banco pelo id do cursor (mesmo formato
+    armazenado, ex.: server_default no SQLite); se o registro não existir mais, usa o do cursor.
+    """
+    last_ts, last_id = decode_cursor(cursor)
+    stored_ts = select(sort_column).where(model.id == last_id).scalar_subquery()
+    ts = func.coalesce(stored_ts, last_ts)
+    return or_(
+        sort_column < ts,
+        and_(sort_column == ts, model.id < last_id),
+    )
+
+
+def set_next_cursor(response: Response, items: list, limit: int, sort_attr: str) -> Optional[str]:
+    """
+    Grava X-Next-Cursor quando a página veio cheia (pode haver próxima).
+    Retorna o cursor (ou None na última página).
+    """
+    if len(items) < limit or not items:
+        return None
+    last = items[-1]
+    cursor = encode_cursor(getattr(last, sort_attr), last.id)
+    response.headers[NEXT_CURSOR_HEADER] = cursor
+    return cursor
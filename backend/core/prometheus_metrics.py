@@ -4,7 +4,7 @@ Exportadas em GET /metrics para coleta por Prometheus.
 Em ambientes sem prometheus_client (ex.: Vercel serverless), métricas são no-op.
 """
 try:
-    from prometheus_client import Counter, Histogram, generate_latest, CONTENT_TYPE_LATEST
+    from prometheus_client import Counter, Gauge, Histogram, generate_latest, CONTENT_TYPE_LATEST
     _PROMETHEUS_AVAILABLE = True
 except ImportError:
     _PROMETHEUS_AVAILABLE = False
@@ -16,7 +16,10 @@ except ImportError:
             pass
         def observe(self, value):
             pass
+        def set(self, value):
+            pass
     Counter = lambda *a, **k: _NoOpMetric()
+    Gauge = lambda *a, **k: _NoOpMetric()
     Histogram = lambda *a, **k: _NoOpMetric()
     def generate_latest():
         return b""
@@ -40,6 +43,18 @@ insights_cache_misses_total = Counter(
     "Total de recálculos de insights (cache ausente, expirado ou entidade alterada)",
 )
 
+# Cache de relatórios (summary, cashflow, categories/summary) versionado por usuário
+report_cache_hits_total = Counter(
+    "report_cache_hits_total",
+    "Total de relatórios servidos do cache (mesma versão dos dados do usuário)",
+    ["report", "backend"],  # backend: memory | db
+)
+report_cache_misses_total = Counter(
+    "report_cache_misses_total",
+    "Total de relatórios recalculados (sem entrada para a versão atual dos dados)",
+    ["report"],
+)
+
 # Erros durante cálculo de insights
 insights_errors_total = Counter(
     "insights_errors_total",
@@ -70,6 +85,57 @@ job_failures_total = Counter(
     ["job_name"],
 )
 
+# Conflitos de concorrência em escritas (run_with_conflict_retry)
+db_conflict_retries_total = Counter(
+    "db_conflict_retries_total",
+    "Total de retentativas após conflito de concorrência (row_version, serialization failure, deadlock)",
+    ["operation"],
+)
+db_conflict_exhausted_total = Counter(
+    "db_conflict_exhausted_total",
+    "Total de operações que esgotaram as retentativas e retornaram 409",
+    ["operation"],
+)
+db_transaction_attempts = Histogram(
+    "db_transaction_attempts",
+    "Tentativas usadas por operação de escrita com retentativa em conflito",
+    ["operation"],
+    buckets=(1, 2, 3, 4, 5, 8),
+)
+
+# Group commit de escritas por conta (core.write_coalescer)
+tx_group_commit_batch_size = Histogram(
+    "tx_group_commit_batch_size",
+    "Escritas aplicadas por transação no group commit",
+    buckets=(1, 2, 4, 8, 16, 32, 64),
+)
+tx_group_commit_fallbacks_total = Counter(
+    "tx_group_commit_fallbacks_total",
+    "Total de grupos que falharam em lote e foram reaplicados escrita a escrita",
+)
+
+# Efeitos pós-commit (core.side_effects)
+post_commit_queue_depth = Gauge(
+    "post_commit_queue_depth",
+    "Efeitos pós-commit aguardando worker",
+)
+post_commit_handler_duration_seconds = Histogram(
+    "post_commit_handler_duration_seconds",
+    "Duração de cada handler pós-commit em segundos",
+    ["handler"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+post_commit_handler_failures_total = Counter(
+    "post_commit_handler_failures_total",
+    "Total de exceções em handlers pós-commit",
+    ["handler"],
+)
+post_commit_dropped_total = Counter(
+    "post_commit_dropped_total",
+    "Total de efeitos pós-commit descartados por fila cheia",
+    ["handler"],
+)
+
 
 def get_metrics_content():
     """Retorna o corpo da resposta para GET /metrics (formato Prometheus)."""
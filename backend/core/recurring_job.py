@@ -5,6 +5,7 @@ Usa APScheduler para agendar execuções.
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
 from datetime import datetime, timedelta
+from decimal import Decimal
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 
@@ -35,8 +36,12 @@ from core.insight_notifications import (
     NOTIFICATION_TYPE_INSIGHT_SUMMARY,
     RULE_INSIGHT_WEEKLY_SUMMARY_V1,
 )
+from core.amount_parser import from_cents, to_cents
+from core.month_range import MonthRange
 from core.logging_config import get_logger
 from services.balance_snapshot_service import compute_monthly_snapshots, reconcile_snapshots
+from db.partitions import ensure_all_partitions
+from repositories.monthly_totals_repository import MonthlyTotalsRepository, year_month
 
 ENABLE_INSIGHTS = os.getenv("ENABLE_INSIGHTS", "1").strip() in ("1", "true", "yes")
 
@@ -193,6 +198,29 @@ def _execute_automation_rule(automation: AutomationRule, db: Session) -> dict:
     }
 
 
+def budget_spent(db: Session, user_id: str, category_id: str, now: datetime) -> float:
+    """
+    Gasto (expense) da categoria no mês de `now` até `now`: total do mês no rollup
+    monthly_category_totals menos as despesas com data futura (o rollup guarda o mês inteiro).
+    """
+    current_ym = year_month(now)
+    month_cents = sum(
+        row.total_cents
+        for row in MonthlyTotalsRepository(db).rows(
+            user_id, current_ym, current_ym, types=('expense',), category_id=category_id,
+        )
+    )
+    future = db.query(func.coalesce(func.sum(Transaction.amount), 0)).filter(
+        Transaction.user_id == user_id,
+        Transaction.type == 'expense',
+        Transaction.category_id == category_id,
+        Transaction.deleted_at.is_(None),
+        Transaction.date > now,
+        Transaction.date < MonthRange.containing(now).end,
+    ).scalar()
+    return float(from_cents(month_cents - to_cents(Decimal(str(future)))))
+
+
 def execute_budget_alerts():
     """
     Avalia regras de alerta de orçamento (budget_alert).
@@ -203,8 +231,6 @@ def execute_budget_alerts():
     db: Session = SessionLocal()
     try:
         now = datetime.now()
-        first_day_of_month = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-
         rules = db.query(AutomationRule).filter(
             AutomationRule.is_active == True,
             AutomationRule.type == 'budget_alert',
@@ -233,19 +259,8 @@ def execute_budget_alerts():
                 if limit <= 0:
                     continue
 
-                # Soma de despesas na categoria no mês atual
-                total = (
-                    db.query(func.coalesce(func.sum(Transaction.amount), 0))
-                    .filter(
-                        Transaction.user_id == rule.user_id,
-                        Transaction.category_id == category_id,
-                        Transaction.type == 'expense',
-                        Transaction.date >= first_day_of_month,
-                        Transaction.date <= now,
-                    )
-                    .scalar()
-                )
-                total = float(total) if total is not None else 0.0
+                # Soma de despesas na categoria no mês atual, até agora
+                total = budget_spent(db, rule.user_id, category_id, now)
 
                 if total <= limit:
                     continue
@@ -814,11 +829,14 @@ def execute_monthly_snapshots():
     """
     Job mensal (Trilha 5.1): gera snapshots de saldo por conta.
     Idempotente: recalcula do ledger e upsert em account_balance_snapshots.
-    Rollback em falha; ledger não é alterado.
+    Commit por lote de contas (transações curtas); falha faz rollback só do lote corrente
+    e uma nova execução reprocessa com segurança. Ledger não é alterado.
     """
     db: Session = SessionLocal()
     try:
-        count = compute_monthly_snapshots(db, account_id=None, year=None, month=None)
+        count = compute_monthly_snapshots(
+            db, account_id=None, year=None, month=None, commit_per_batch=True
+        )
         db.commit()
         logger.info(
             "Job de snapshots mensais concluído",
@@ -862,6 +880,31 @@ def execute_reconcile_snapshots():
         db.close()
 
 
+def execute_ensure_partitions():
+    """
+    Job diário: garante partições mensais futuras (mês corrente + PARTITION_MONTHS_AHEAD)
+    das tabelas particionadas. Idempotente; no-op em SQLite ou sem a migração aplicada.
+    """
+    db: Session = SessionLocal()
+    try:
+        created = ensure_all_partitions(db)
+        db.commit()
+        for table, names in created.items():
+            if names:
+                logger.info(
+                    "Partições mensais criadas",
+                    extra={"table": table, "partitions": names},
+                )
+    except Exception as e:
+        db.rollback()
+        logger.error(
+            f"Erro no job de partições mensais: {str(e)}",
+            exc_info=True,
+        )
+    finally:
+        db.close()
+
+
 def start_scheduler():
     """Inicia o scheduler de recorrências e alertas."""
     if not scheduler.running:
@@ -914,6 +957,14 @@ def start_scheduler():
             name='Conciliação de snapshots',
             replace_existing=True,
         )
+        # Partições mensais futuras (ledger_entries): diário às 3h; idempotente
+        scheduler.add_job(
+            execute_ensure_partitions,
+            trigger=CronTrigger(hour=3, minute=0),
+            id='ensure_partitions',
+            name='Partições mensais futuras',
+            replace_existing=True,
+        )
         # Alerta de saldo baixo: 1x por dia às 9h
         scheduler.add_job(
             execute_low_balance_alerts,
@@ -0,0 +1,42 @@
+"""
+Cache em memória (por processo) para resultados de leitura caros (séries de saldo, relatórios).
+LRU com limite de entradas; thread-safe. Invalidação é responsabilidade da chave:
+incluir na chave um valor que muda a cada escrita (ex.: row_version das contas).
+"""
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+class LRUResultCache:
+    """LRU thread-safe: get/set por chave; descarta a entrada menos usada ao exceder max_entries."""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max(1, int(max_entries))
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Retorna o valor cacheado (e marca como recente) ou None."""
+        with self._lock:
+            if key not in self._data:
+                return None
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Grava o valor; remove as entradas mais antigas acima do limite."""
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        """Esvazia o cache (testes / manutenção)."""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
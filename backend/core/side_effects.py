@@ -0,0 +1,156 @@
+"""
+Efeitos colaterais pós-commit (fora do caminho crítico da requisição).
+
+Escritas de transação publicam um evento depois do commit principal (ex.: TRANSACTIONS_CREATED);
+os handlers registrados para o evento rodam num pool limitado de threads, cada execução com
+sessão própria (commit ao final, rollback em erro). A requisição só enfileira: alerta de saldo
+baixo, round-up etc. não somam latência nem derrubam a resposta.
+
+Fila limitada (POST_COMMIT_QUEUE_MAX): cheia, o efeito é descartado e contado (melhor perder
+um alerta do que travar escritas). Métricas: profundidade da fila, duração e falhas por handler.
+"""
+import os
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from core.logging_config import get_logger
+from core.prometheus_metrics import (
+    post_commit_queue_depth,
+    post_commit_handler_duration_seconds,
+    post_commit_handler_failures_total,
+    post_commit_dropped_total,
+)
+
+logger = get_logger(__name__)
+
+POST_COMMIT_WORKERS = max(1, int(os.getenv("POST_COMMIT_WORKERS", "2")))
+POST_COMMIT_QUEUE_MAX = max(1, int(os.getenv("POST_COMMIT_QUEUE_MAX", "1000")))
+
+# Eventos de transação
+TRANSACTIONS_CREATED = "transactions.created"
+
+
+@dataclass(frozen=True)
+class TransactionEvent:
+    """
+    Transações commitadas numa escrita (criação unitária, lote ou importação).
+    account_ids: contas cujo saldo mudou; expense_amounts_cents: despesas que disparam round-up.
+    """
+    name: str
+    user_id: str
+    account_ids: Tuple[str, ...] = ()
+    expense_amounts_cents: Tuple[int, ...] = ()
+    transaction_ids: Tuple[str, ...] = ()
+
+
+Handler = Callable[[Session, TransactionEvent], None]
+
+_STOP = object()
+
+
+class PostCommitDispatcher:
+    """Registro de handlers por evento + pool de workers com fila limitada."""
+
+    def __init__(self, workers: Optional[int] = None, max_queue: Optional[int] = None):
+        self.workers = workers or POST_COMMIT_WORKERS
+        self._handlers: Dict[str, List[Handler]] = {}
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_queue or POST_COMMIT_QUEUE_MAX)
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+
+    def handler(self, event_name: str) -> Callable[[Handler], Handler]:
+        """Decorator: registra fn(db, event) para event_name."""
+        def decorator(fn: Handler) -> Handler:
+            self._handlers.setdefault(event_name, []).append(fn)
+            return fn
+        return decorator
+
+    def dispatch(self, bind, event: TransactionEvent) -> None:
+        """
+        Enfileira os handlers do evento (chamar depois do commit). Não bloqueia: com a fila
+        cheia o efeito é descartado e logado. bind: engine das sessões dos handlers.
+        """
+        handlers = self._handlers.get(event.name, [])
+        if not handlers:
+            return
+        self._ensure_workers()
+        for fn in handlers:
+            try:
+                self._queue.put_nowait((bind, fn, event))
+            except queue.Full:
+                post_commit_dropped_total.labels(handler=fn.__name__).inc()
+                logger.warning(
+                    "Fila pós-commit cheia; efeito %s descartado (%s)",
+                    fn.__name__,
+                    event.name,
+                    extra={"user_id": event.user_id},
+                )
+                continue
+            post_commit_queue_depth.set(self._queue.qsize())
+
+    def wait_idle(self) -> None:
+        """Bloqueia até a fila esvaziar e os handlers em execução terminarem (testes, shutdown)."""
+        self._queue.join()
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        """Processa o que está na fila e encerra os workers (podem ser recriados no próximo dispatch)."""
+        with self._lock:
+            threads, self._threads = self._threads, []
+            for _ in threads:
+                self._queue.put(_STOP)
+        for t in threads:
+            t.join(timeout)
+
+    def _ensure_workers(self) -> None:
+        if len(self._threads) >= self.workers:
+            return
+        with self._lock:
+            while len(self._threads) < self.workers:
+                t = threading.Thread(
+                    target=self._worker,
+                    name=f"post-commit-{len(self._threads)}",
+                    daemon=True,
+                )
+                t.start()
+                self._threads.append(t)
+
+    def _worker(self) -> None:
+        while True:
+            task = self._queue.get()
+            try:
+                if task is _STOP:
+                    return
+                post_commit_queue_depth.set(self._queue.qsize())
+                self._run(*task)
+            finally:
+                self._queue.task_done()
+
+    def _run(self, bind, fn: Handler, event: TransactionEvent) -> None:
+        started = time.perf_counter()
+        db = Session(bind=bind, autoflush=False)
+        try:
+            fn(db, event)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            post_commit_handler_failures_total.labels(handler=fn.__name__).inc()
+            logger.exception(
+                "Erro no efeito pós-commit %s (%s): %s",
+                fn.__name__,
+                event.name,
+                e,
+                extra={"user_id": event.user_id},
+            )
+        finally:
+            db.close()
+            post_commit_handler_duration_seconds.labels(handler=fn.__name__).observe(
+                time.perf_counter() - started
+            )
+
+
+post_commit_dispatcher = PostCommitDispatcher()
@@ -0,0 +1,136 @@
+"""
+Group commit de escritas concorrentes na mesma conta (opcional, TX_GROUP_COMMIT=1).
+
+Contas compartilhadas (casa, empresa) recebem rajadas de escritas que se serializam no
+pg_advisory_xact_lock da conta, cada uma pagando um commit. Com o coalescer, a primeira
+requisição de uma chave (user_id, account_id) vira "líder": espera uma janela curta
+(TX_GROUP_COMMIT_WINDOW_MS), recolhe as escritas que chegaram nesse intervalo e aplica todas
+numa única transação (um lock, um INSERT em lote no ledger, um UPDATE de saldo), em sessão
+própria. Cada chamador recebe o próprio resultado (ou a própria exceção).
+
+Se o lote falhar (ex.: Idempotency-Key repetida dentro do grupo), cada escrita é reaplicada
+sozinha, para que o erro de uma não derrube as outras.
+"""
+import os
+import threading
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+from sqlalchemy.orm import Session
+
+from core.database_utils import run_with_conflict_retry
+from core.logging_config import get_logger
+from core.prometheus_metrics import tx_group_commit_batch_size, tx_group_commit_fallbacks_total
+
+logger = get_logger(__name__)
+
+TX_GROUP_COMMIT_ENABLED = os.getenv("TX_GROUP_COMMIT", "").strip().lower() in ("1", "true", "yes")
+TX_GROUP_COMMIT_WINDOW_MS = float(os.getenv("TX_GROUP_COMMIT_WINDOW_MS", "3"))
+TX_GROUP_COMMIT_MAX_BATCH = max(1, int(os.getenv("TX_GROUP_COMMIT_MAX_BATCH", "50")))
+
+# apply_batch(session, key, items) -> um resultado por item, na mesma ordem
+ApplyBatch = Callable[[Session, Hashable, List[Any]], List[Any]]
+
+
+class _PendingWrite:
+    __slots__ = ("item", "result", "error")
+
+    def __init__(self, item: Any):
+        self.item = item
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+
+class _Group:
+    __slots__ = ("writes", "full", "done")
+
+    def __init__(self):
+        self.writes: List[_PendingWrite] = []
+        self.full = threading.Event()
+        self.done = threading.Event()
+
+
+class AccountWriteCoalescer:
+    """Agrupa escritas por chave durante window_ms (ou até max_batch) e aplica o grupo de uma vez."""
+
+    def __init__(
+        self,
+        apply_batch: ApplyBatch,
+        window_ms: Optional[float] = None,
+        max_batch: Optional[int] = None,
+        operation_name: str = "transaction_group_commit",
+    ):
+        self.apply_batch = apply_batch
+        self.window_ms = TX_GROUP_COMMIT_WINDOW_MS if window_ms is None else window_ms
+        self.max_batch = max_batch or TX_GROUP_COMMIT_MAX_BATCH
+        self.operation_name = operation_name
+        self._lock = threading.Lock()
+        self._groups: Dict[Hashable, _Group] = {}
+
+    def submit(self, bind, key: Hashable, item: Any) -> Any:
+        """
+        Enfileira item no grupo aberto da chave e bloqueia até o grupo ser aplicado.
+        bind: engine/conexão usada pela sessão do líder. Retorna o resultado do item;
+        re-levanta a exceção que a escrita dele causou.
+        """
+        write = _PendingWrite(item)
+        with self._lock:
+            group = self._groups.get(key)
+            leader = group is None
+            if leader:
+                group = self._groups[key] = _Group()
+            group.writes.append(write)
+            if len(group.writes) >= self.max_batch:
+                # Grupo cheio: fecha para novas escritas (a próxima abre outro) e acorda o líder
+                self._groups.pop(key, None)
+                group.full.set()
+
+        if leader:
+            group.full.wait(self.window_ms / 1000.0)
+            with self._lock:
+                if self._groups.get(key) is group:
+                    del self._groups[key]
+            try:
+                self._flush(bind, key, group.writes)
+            finally:
+                group.done.set()
+        else:
+            group.done.wait()
+
+        if write.error is not None:
+            raise write.error
+        return write.result
+
+    def _flush(self, bind, key: Hashable, writes: List[_PendingWrite]) -> None:
+        tx_group_commit_batch_size.observe(len(writes))
+        session = Session(bind=bind, autoflush=False)
+        try:
+            try:
+                results = self._apply(session, key, writes)
+                for write, result in zip(writes, results):
+                    write.result = result
+                return
+            except Exception as e:
+                if len(writes) == 1:
+                    writes[0].error = e
+                    return
+                tx_group_commit_fallbacks_total.inc()
+                logger.warning(
+                    "Group commit falhou (%s escritas); reaplicando uma a uma: %s",
+                    len(writes),
+                    e,
+                )
+            for write in writes:
+                try:
+                    write.result = self._apply(session, key, [write])[0]
+                except Exception as e:
+                    write.error = e
+        finally:
+            session.close()
+
+    def _apply(self, session: Session, key: Hashable, writes: List[_PendingWrite]) -> List[Any]:
+        items = [w.item for w in writes]
+        return run_with_conflict_retry(
+            session,
+            lambda: self.apply_batch(session, key, items),
+            operation_name=self.operation_name,
+        )
@@ -2,14 +2,18 @@
 Trilha 6 — Locking forte com PostgreSQL advisory locks transacionais.
 pg_advisory_xact_lock: lock automático ao fim da transação; não depende de linhas;
 evita deadlock com ordem determinística de locks.
-SQLite: no-op (não suporta advisory lock).
+lock_accounts_for_write: advisory locks de todas as contas em um statement + SELECT ... FOR
+UPDATE de todas as linhas em outro (dois round trips, qualquer quantidade de contas).
+SQLite: no-op (não suporta advisory lock); FOR UPDATE é ignorado pelo SQLite.
 """
 import hashlib
-from typing import List, Union
+from typing import Dict, Iterable, List, Optional, Union
 
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 
+from models import Account
+
 
 def _uuid_to_bigint(value: str, prefix: str = "") -> int:
     """
@@ -38,16 +42,57 @@ def lock_account(account_id: str, db: Session) -> None:
     db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": key})
 
 
+def _advisory_lock_many(keys: List[int], db: Session) -> None:
+    """Advisory locks transacionais de todas as chaves, na ordem da lista, em um único statement."""
+    if not keys:
+        return
+    db.execute(
+        text(
+            "SELECT pg_advisory_xact_lock(k) "
+            "FROM unnest(CAST(:keys AS bigint[])) WITH ORDINALITY AS u(k, n) ORDER BY n"
+        ),
+        {"keys": keys},
+    )
+
+
 def lock_accounts_ordered(account_ids: List[str], db: Session) -> None:
     """
     Obtém advisory lock em todas as contas, em ordem determinística (evita deadlock).
-    Ordem: account_ids ordenados.
+    Ordem: account_ids ordenados. Um único statement para todas as contas.
     Em SQLite: no-op.
     """
     if not _is_postgres(db):
         return
-    for aid in sorted(account_ids):
-        lock_account(aid, db)
+    _advisory_lock_many([_uuid_to_bigint(aid, "account:") for aid in sorted(set(account_ids))], db)
+
+
+def lock_accounts_for_write(
+    account_ids: Iterable[str],
+    db: Session,
+    user_id: Optional[str] = None,
+) -> Dict[str, Account]:
+    """
+    Bloqueia as contas para escrita e devolve {account_id: Account} já recarregadas:
+    advisory locks em ordem de id (um statement) e
+    SELECT ... WHERE id IN (...) ORDER BY id FOR UPDATE (outro statement).
+    user_id: só linhas do usuário entram no resultado (validação de posse sem query extra).
+    Contas inexistentes ficam fora do dicionário. Em SQLite só o SELECT é executado.
+    """
+    ids = sorted(set(account_ids))
+    if not ids:
+        return {}
+    lock_accounts_ordered(ids, db)
+    query = db.query(Account).filter(Account.id.in_(ids))
+    if user_id is not None:
+        query = query.filter(Account.user_id == user_id)
+    accounts = (
+        query
+        .order_by(Account.id)
+        .with_for_update()
+        .populate_existing()
+        .all()
+    )
+    return {a.id: a for a in accounts}
 
 
 def lock_goal(goal_id: str, db: Session) -> None:
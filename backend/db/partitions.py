@@ -0,0 +1,156 @@
+"""
+Particionamento por mês (PostgreSQL, RANGE declarativo).
+ledger_entries é particionada por created_at (migração partition_ledger_entries_monthly):
+partições ledger_entries_yYYYYmMM com limites [1º dia do mês, 1º dia do mês seguinte) e uma
+partição DEFAULT de segurança. O job agendado cria as partições futuras com antecedência,
+para que nenhuma escrita caia na DEFAULT; se alguma cair (job parado), a criação da partição
+do mês move essas linhas da DEFAULT para ela.
+
+transactions não é particionada: o PK de uma tabela particionada precisa incluir a chave de
+partição, o que quebraria as FKs para transactions.id (transaction_tags, ledger_entries,
+transfer_transaction_id) e a unicidade de (user_id, idempotency_key).
+
+SQLite: no-op (sem particionamento).
+"""
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+# tabela particionada -> coluna da chave de partição
+PARTITIONED_TABLES: Dict[str, str] = {
+    "ledger_entries": "created_at",
+}
+
+# Quantos meses à frente manter partições criadas
+PARTITION_MONTHS_AHEAD = 3
+
+
+def _is_postgres(db: Session) -> bool:
+    """True se o bind for PostgreSQL."""
+    return db.get_bind().dialect.name == "postgresql"
+
+
+def _add_months(year: int, month: int, n: int) -> Tuple[int, int]:
+    idx = year * 12 + (month - 1) + n
+    return idx // 12, idx % 12 + 1
+
+
+def month_partition_name(table: str, year: int, month: int) -> str:
+    """Nome da partição mensal: <tabela>_yYYYYmMM."""
+    return f"{table}_y{year:04d}m{month:02d}"
+
+
+def month_partition_bounds(year: int, month: int) -> Tuple[date, date]:
+    """Limites [início, fim) da partição do mês (fim = 1º dia do mês seguinte)."""
+    ny, nm = _add_months(year, month, 1)
+    return date(year, month, 1), date(ny, nm, 1)
+
+
+def is_partitioned(db: Session, table: str) -> bool:
+    """True se a tabela existir como tabela particionada (migração aplicada)."""
+    if not _is_postgres(db):
+        return False
+    row = db.execute(
+        text(
+            "SELECT 1 FROM pg_partitioned_table pt "
+            "JOIN pg_class c ON c.oid = pt.partrelid "
+            "WHERE c.relname = :t AND pg_table_is_visible(c.oid)"
+        ),
+        {"t": table},
+    ).fetchone()
+    return row is not None
+
+
+def default_partition_name(db: Session, table: str) -> Optional[str]:
+    """Nome da partição DEFAULT da tabela particionada (None se não houver)."""
+    return db.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = :t AND pg_table_is_visible(p.oid) "
+            "AND pg_get_expr(c.relpartbound, c.oid) = 'DEFAULT'"
+        ),
+        {"t": table},
+    ).scalar()
+
+
+def _create_month_partition(
+    db: Session, table: str, name: str, start: date, end: date, default: Optional[str]
+) -> int:
+    """
+    CREATE TABLE ... PARTITION OF para [start, end). O PostgreSQL recusa a partição nova se a
+    DEFAULT já tiver linhas no intervalo: essas linhas saem da DEFAULT para uma tabela
+    temporária e, criada a partição, voltam pela tabela-mãe (roteadas para a partição nova).
+    Tudo na transação do chamador. Retorna quantas linhas foram movidas da DEFAULT.
+    """
+    column = PARTITIONED_TABLES[table]
+    bounds = {"start": start, "end": end}
+    moved = 0
+    if default:
+        # Sem escritas concorrentes na tabela até o commit: nada novo cai na DEFAULT no meio do caminho
+        db.execute(text(f'LOCK TABLE "{table}" IN SHARE ROW EXCLUSIVE MODE'))
+        pending = f"{name}_pending"
+        db.execute(text(f'CREATE TEMP TABLE "{pending}" (LIKE "{table}") ON COMMIT DROP'))
+        moved = db.execute(
+            text(
+                f'WITH moved AS (DELETE FROM "{default}" '
+                f'WHERE "{column}" >= :start AND "{column}" < :end RETURNING *) '
+                f'INSERT INTO "{pending}" SELECT * FROM moved'
+            ),
+            bounds,
+        ).rowcount
+    db.execute(text(
+        f'CREATE TABLE IF NOT EXISTS "{name}" PARTITION OF "{table}" '
+        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    ))
+    if default:
+        if moved:
+            db.execute(text(f'INSERT INTO "{table}" SELECT * FROM "{pending}"'))
+        db.execute(text(f'DROP TABLE "{pending}"'))
+    return moved
+
+
+def ensure_month_partitions(
+    db: Session,
+    table: str,
+    months_ahead: int = PARTITION_MONTHS_AHEAD,
+    today: Optional[date] = None,
+) -> List[str]:
+    """
+    Garante partições do mês corrente até months_ahead meses à frente.
+    Idempotente (CREATE TABLE IF NOT EXISTS ... PARTITION OF). Linhas do mês que já estavam na
+    partição DEFAULT passam para a partição nova (_create_month_partition). Retorna os nomes
+    criados agora. Em SQLite ou se a tabela não for particionada: no-op, retorna [].
+    """
+    if table not in PARTITIONED_TABLES:
+        raise ValueError(f"Tabela não particionada: {table}")
+    if not is_partitioned(db, table):
+        return []
+    today = today or date.today()
+    default = default_partition_name(db, table)
+    created: List[str] = []
+    for i in range(months_ahead + 1):
+        year, month = _add_months(today.year, today.month, i)
+        name = month_partition_name(table, year, month)
+        exists = db.execute(text("SELECT to_regclass(:n)"), {"n": name}).scalar()
+        if exists:
+            continue
+        start, end = month_partition_bounds(year, month)
+        _create_month_partition(db, table, name, start, end, default)
+        created.append(name)
+    return created
+
+
+def ensure_all_partitions(
+    db: Session,
+    months_ahead: int = PARTITION_MONTHS_AHEAD,
+    today: Optional[date] = None,
+) -> Dict[str, List[str]]:
+    """ensure_month_partitions para todas as tabelas de PARTITIONED_TABLES."""
+    return {
+        table: ensure_month_partitions(db, table, months_ahead=months_ahead, today=today)
+        for table in PARTITIONED_TABLES
+    }
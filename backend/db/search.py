@@ -0,0 +1,78 @@
+"""
+Busca textual em transactions.description.
+
+PostgreSQL: coluna gerada search_vector (tsvector, configuração 'portuguese', sem acentos via
+unaccent) com índice GIN — usada por GET /api/transactions/search com ranking ts_rank.
+Índice GIN pg_trgm em description: torna indexável o filtro ILIKE '%termo%' de
+TransactionRepository.get_by_user(search=...).
+SQLite (dev/testes): tabela FTS5 externa (transactions_fts, tokenizer unicode61 sem
+diacríticos) mantida por triggers; ranking bm25.
+
+Os objetos são criados pela migração add_transaction_search e, em create_all, pelo
+evento after_create da tabela transactions (install_search_ddl).
+"""
+import re
+from typing import List
+
+from sqlalchemy import DDL, event
+
+SEARCH_CONFIG = "portuguese"
+SEARCH_MAX_TERMS = 8
+
+_TERM = re.compile(r"\w+", re.UNICODE)
+
+POSTGRES_SEARCH_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS unaccent",
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    # unaccent() é STABLE; wrapper IMMUTABLE (dicionário fixo) para coluna gerada e índices
+    "CREATE OR REPLACE FUNCTION f_unaccent(text) RETURNS text "
+    "LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT "
+    "AS $$ SELECT public.unaccent('public.unaccent'::regdictionary, $1) $$",
+    "ALTER TABLE transactions ADD COLUMN IF NOT EXISTS search_vector tsvector "
+    f"GENERATED ALWAYS AS (to_tsvector('{SEARCH_CONFIG}', f_unaccent(coalesce(description, '')))) STORED",
+    "CREATE INDEX IF NOT EXISTS idx_transactions_search_vector ON transactions USING gin (search_vector)",
+    "CREATE INDEX IF NOT EXISTS idx_transactions_description_trgm "
+    "ON transactions USING gin (description gin_trgm_ops)",
+]
+
+SQLITE_SEARCH_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS transactions_fts USING fts5("
+    "description, content='transactions', tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS transactions_fts_ai AFTER INSERT ON transactions BEGIN "
+    "INSERT INTO transactions_fts(rowid, description) VALUES (new.rowid, new.description); END",
+    "CREATE TRIGGER IF NOT EXISTS transactions_fts_ad AFTER DELETE ON transactions BEGIN "
+    "INSERT INTO transactions_fts(transactions_fts, rowid, description) "
+    "VALUES ('delete', old.rowid, old.description); END",
+    "CREATE TRIGGER IF NOT EXISTS transactions_fts_au AFTER UPDATE OF description ON transactions BEGIN "
+    "INSERT INTO transactions_fts(transactions_fts, rowid, description) "
+    "VALUES ('delete', old.rowid, old.description); "
+    "INSERT INTO transactions_fts(rowid, description) VALUES (new.rowid, new.description); END",
+]
+
+SQLITE_SEARCH_REBUILD = "INSERT INTO transactions_fts(transactions_fts) VALUES ('rebuild')"
+SQLITE_SEARCH_DROP = "DROP TABLE IF EXISTS transactions_fts"
+
+
+def install_search_ddl(table) -> None:
+    """Registra a criação dos objetos de busca após o CREATE TABLE de transactions (create_all)."""
+    for statement in POSTGRES_SEARCH_DDL:
+        event.listen(table, "after_create", DDL(statement).execute_if(dialect="postgresql"))
+    for statement in SQLITE_SEARCH_DDL:
+        event.listen(table, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+    # Tabela FTS não é conhecida pelo metadata: sem isto, um drop_all/create_all manteria índice velho
+    event.listen(table, "after_drop", DDL(SQLITE_SEARCH_DROP).execute_if(dialect="sqlite"))
+
+
+def search_terms(query: str) -> List[str]:
+    """Palavras da busca (minúsculas, só caracteres de palavra); no máximo SEARCH_MAX_TERMS."""
+    return _TERM.findall((query or "").lower())[:SEARCH_MAX_TERMS]
+
+
+def postgres_tsquery(terms: List[str]) -> str:
+    """Termos -> texto para to_tsquery: prefixo em cada termo, todos obrigatórios (AND)."""
+    return " & ".join(f"{t}:*" for t in terms)
+
+
+def sqlite_match(terms: List[str]) -> str:
+    """Termos -> expressão MATCH do FTS5: prefixo em cada termo, todos obrigatórios."""
+    return " ".join(f'"{t}"*' for t in terms)
@@ -4,10 +4,10 @@ Regra: mês atual vs mês anterior; sem divisão por zero; ordenação por impac
 """
 from typing import List, Dict, Any
 from sqlalchemy.orm import Session
-from sqlalchemy import func
 
-from models import Transaction, Category
-from domain.insight_policies.common import month_bounds
+from core.amount_parser import from_cents
+from domain.insight_policies.common import month_range
+from repositories.monthly_totals_repository import MonthlyTotalsRepository, year_month
 
 
 def compute_category_monthly_variation_v1(user_id: str, db: Session) -> List[Dict[str, Any]]:
@@ -17,48 +17,25 @@ def compute_category_monthly_variation_v1(user_id: str, db: Session) -> List[Dic
     Caso borda: mês anterior 0 → variation_pct null, explicação "Novo gasto neste mês".
     Ordenação: por impact_score (|current - previous|) DESC.
     """
-    curr_first, curr_last = month_bounds(0)
-    prev_first, prev_last = month_bounds(1)
+    current, previous = month_range(0), month_range(1)
 
-    current_month = (
-        db.query(
-            Transaction.category_id,
-            Category.name.label("category_name"),
-            func.coalesce(func.sum(Transaction.amount), 0).label("total"),
-        )
-        .join(Category, Transaction.category_id == Category.id)
-        .filter(
-            Transaction.user_id == user_id,
-            Transaction.type == "expense",
-            Transaction.deleted_at.is_(None),
-            Transaction.date >= curr_first,
-            Transaction.date <= curr_last,
-        )
-        .group_by(Transaction.category_id, Category.name)
-        .all()
+    # Rollup monthly_category_totals: O(categorias), não O(transações do mês)
+    totals = MonthlyTotalsRepository(db)
+    current_month = totals.totals_by_category(
+        user_id, year_month(current.start), year_month(current.start), "expense"
     )
-    previous_month = (
-        db.query(
-            Transaction.category_id,
-            func.coalesce(func.sum(Transaction.amount), 0).label("total"),
+    prev_by_cat = {
+        row.category_id: float(from_cents(row.total_cents))
+        for row in totals.rows(
+            user_id, year_month(previous.start), year_month(previous.start), types=("expense",)
         )
-        .filter(
-            Transaction.user_id == user_id,
-            Transaction.type == "expense",
-            Transaction.deleted_at.is_(None),
-            Transaction.date >= prev_first,
-            Transaction.date <= prev_last,
-        )
-        .group_by(Transaction.category_id)
-        .all()
-    )
-    prev_by_cat = {row.category_id: float(row.total) for row in previous_month}
+    }
 
     result = []
     for row in current_month:
-        curr_total = float(row.total)
+        curr_total = float(from_cents(row.total_cents))
         prev_total = prev_by_cat.get(row.category_id) or 0.0
-        insight_hash = f"category_variation:{row.category_id}:{curr_first.year}-{curr_first.month:02d}"
+        insight_hash = f"category_variation:{row.category_id}:{current.year}-{current.month:02d}"
 
         if prev_total == 0 or prev_total is None:
             impact = round(abs(curr_total), 2)
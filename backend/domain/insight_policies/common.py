@@ -3,6 +3,8 @@ Utilitários compartilhados pelas policies de insights.
 """
 from datetime import date, timedelta
 
+from core.month_range import MonthRange
+
 
 def month_bounds(months_ago: int) -> tuple[date, date]:
     """Retorna (primeiro_dia, ultimo_dia) do mês há N meses atrás. Mês atual = 0."""
@@ -20,3 +22,8 @@ def month_bounds(months_ago: int) -> tuple[date, date]:
     else:
         last = date(year, month + 1, 1) - timedelta(days=1)
     return first, last
+
+
+def month_range(months_ago: int) -> MonthRange:
+    """Intervalo semiaberto [início, início do mês seguinte) do mês há N meses. Mês atual = 0."""
+    return MonthRange.containing(date.today()).shift(-months_ago)
@@ -45,6 +45,8 @@ from core.recurring_job import start_scheduler
 from core.request_logging import StructuredLoggingMiddleware
 from core.request_id_middleware import RequestIDMiddleware
 from core.prometheus_metrics import get_metrics_content, get_metrics_content_type
+from core.side_effects import post_commit_dispatcher
+from core.pagination import NEXT_CURSOR_HEADER
 
 # Load environment variables
 load_dotenv(dotenv_path=Path(__file__).parent / ".env", override=True)
@@ -105,7 +107,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS", "PATCH"],
     allow_headers=["*"],
-    expose_headers=["*"],
+    # "*" não vale em requisições com credenciais: headers lidos pelo front listados explicitamente
+    expose_headers=["*", NEXT_CURSOR_HEADER],
 )
 
 # Security
@@ -187,6 +190,12 @@ def on_startup():
     except Exception as e:
         print(f"⚠️ Scheduler não iniciado: {e}")
 
+
+# Efeitos pós-commit pendentes (alertas, round-up) terminam antes do processo sair
+@app.on_event("shutdown")
+def on_shutdown():
+    post_commit_dispatcher.shutdown()
+
 # Protected route example
 @app.get("/api/protected")
 async def protected_route(
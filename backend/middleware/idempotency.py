@@ -17,6 +17,7 @@ from services.idempotency_service import (
     save_failed_by_key,
     IdempotencyAcquireResult,
     ENDPOINT_TRANSACTIONS_CREATE,
+    ENDPOINT_TRANSACTIONS_BATCH,
     ENDPOINT_GOALS_CREATE,
 )
 
@@ -108,6 +109,15 @@ def get_idempotency_context_transactions(
     return IdempotencyContext(user_id=current_user.id, key=key, endpoint=ENDPOINT_TRANSACTIONS_CREATE)
 
 
+def get_idempotency_context_transactions_batch(
+    request: Request,
+    current_user: User = Depends(get_current_user),
+) -> IdempotencyContext:
+    """Dependency: IdempotencyContext para POST /api/transactions/batch (key vale para o lote inteiro)."""
+    key = get_idempotency_key_from_request(request.headers)
+    return IdempotencyContext(user_id=current_user.id, key=key, endpoint=ENDPOINT_TRANSACTIONS_BATCH)
+
+
 def get_idempotency_context_goals(
     request: Request,
     current_user: User = Depends(get_current_user),
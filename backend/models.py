@@ -1,7 +1,8 @@
-from sqlalchemy import Column, Integer, String, Float, Numeric, DateTime, Boolean, Text, ForeignKey, JSON, Index, CheckConstraint
+from sqlalchemy import BigInteger, Column, Integer, String, Float, Numeric, DateTime, Boolean, Text, ForeignKey, JSON, Index, CheckConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from database import Base
+from db.search import install_search_ddl
 import uuid
 
 class User(Base):
@@ -157,12 +158,60 @@ class Transaction(Base):
         CheckConstraint("type IN ('income', 'expense', 'transfer')", name="check_transaction_type"),
         CheckConstraint("amount > 0", name="check_transaction_amount_positive"),
         CheckConstraint("length(description) >= 1", name="check_transaction_description_length"),
-        Index('idx_transactions_user_date', 'user_id', 'date'),
+        # Listagem paginada por cursor: ORDER BY date DESC, id DESC (core/pagination.py)
+        Index('idx_transactions_user_date_id', 'user_id', date.desc(), id.desc()),
         Index('idx_transactions_user_type', 'user_id', 'type'),
         Index('idx_transactions_account_date', 'account_id', 'date'),
         Index('idx_transactions_category_date', 'category_id', 'date'),
     )
 
+
+# Busca textual em description (tsvector/pg_trgm no PostgreSQL, FTS5 no SQLite): db/search.py
+install_search_ddl(Transaction.__table__)
+
+
+class MonthlyCategoryTotal(Base):
+    """
+    Rollup de transações não excluídas por usuário, mês (AAAAMM), categoria e tipo.
+    Mantido por TransactionService na mesma transação de cada escrita
+    (repositories/monthly_totals_repository.py); recalculável com scripts/rebuild_monthly_totals.py.
+    """
+    __tablename__ = "monthly_category_totals"
+
+    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    year_month = Column(Integer, primary_key=True)  # ano * 100 + mês (ex.: 202405)
+    category_id = Column(String, ForeignKey("categories.id", ondelete="CASCADE"), primary_key=True)
+    type = Column(String(20), primary_key=True)  # income, expense, transfer
+    total_cents = Column(BigInteger, nullable=False, default=0)
+    count = Column(Integer, nullable=False, default=0)
+
+
+class UserDataVersion(Base):
+    """
+    Versão dos dados financeiros do usuário: incrementada na mesma transação de cada escrita de
+    transações (TransactionService) e de categorias. Faz parte da chave do cache de relatórios,
+    então a invalidação é exata (sem TTL).
+    """
+    __tablename__ = "user_data_versions"
+
+    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+
+
+class ReportCacheEntry(Base):
+    """
+    Backend compartilhado (opcional, REPORT_CACHE_BACKEND=db) do cache de relatórios:
+    uma linha por (usuário, relatório + parâmetros), válida só para data_version.
+    """
+    __tablename__ = "report_cache_entries"
+
+    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    cache_key = Column(String(255), primary_key=True)  # relatório:parâmetros
+    data_version = Column(BigInteger, nullable=False)
+    data = Column(JSON, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+
 class Goal(Base):
     __tablename__ = "goals"
     
@@ -273,7 +322,7 @@ class Notification(Base):
     __table_args__ = (
         CheckConstraint("length(title) >= 1", name="check_notification_title_length"),
         Index('idx_notifications_user_read', 'user_id', 'read_at'),
-        Index('idx_notifications_user_created', 'user_id', 'created_at'),
+        Index('idx_notifications_user_created_id', 'user_id', created_at.desc(), id.desc()),
     )
 
 
@@ -366,6 +415,10 @@ class ActivityFeedItem(Base):
 
     user = relationship("User", back_populates="activity_feed_items")
 
+    __table_args__ = (
+        Index('idx_activity_feed_user_created_id', 'user_id', created_at.desc(), id.desc()),
+    )
+
 
 class Tag(Base):
     """Tags para categorização de transações (tabela tags)."""
@@ -381,6 +434,11 @@ class Tag(Base):
         back_populates="tag",
     )
 
+    __table_args__ = (
+        # Resolução de tags em lote: INSERT ... ON CONFLICT (user_id, name) DO NOTHING
+        Index("uq_tags_user_name", "user_id", "name", unique=True),
+    )
+
 
 class TransactionTag(Base):
     """Associação transação–tag (tabela transaction_tags)."""
@@ -399,6 +457,8 @@ class LedgerEntry(Base):
     Ledger contábil imutável (append-only).
     Cada movimento de conta gera uma entrada; saldo = SUM(amount) por account_id.
     Não permitir UPDATE nem DELETE; apenas INSERT.
+    PostgreSQL: particionada por mês em created_at (migração partition_ledger_monthly; PK física
+    (id, created_at)). Filtrar por created_at com limites constantes para permitir partition pruning.
     """
     __tablename__ = "ledger_entries"
 
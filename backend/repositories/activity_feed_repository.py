@@ -7,6 +7,7 @@ from sqlalchemy.orm import Session
 from sqlalchemy import desc
 
 from models import ActivityFeedItem
+from core.pagination import keyset_before
 
 
 def create_feed_item(
@@ -41,15 +42,22 @@ def list_feed_by_user(
     limit: int = 50,
     offset: int = 0,
     only_unread: bool = False,
+    after: Optional[str] = None,
 ) -> List[ActivityFeedItem]:
-    """Lista feed do usuário ordenado por created_at DESC. Paginação: limit (default 50), offset."""
+    """
+    Lista feed do usuário ordenado por (created_at DESC, id DESC).
+    Paginação: limit (default 50), offset; ou after (cursor keyset), que ignora offset.
+    """
     query = (
         db.query(ActivityFeedItem)
         .filter(ActivityFeedItem.user_id == user_id)
-        .order_by(desc(ActivityFeedItem.created_at))
+        .order_by(desc(ActivityFeedItem.created_at), desc(ActivityFeedItem.id))
     )
     if only_unread:
         query = query.filter(ActivityFeedItem.is_read.is_(False))
+    if after:
+        query = query.filter(keyset_before(ActivityFeedItem, ActivityFeedItem.created_at, after))
+        offset = 0
     return query.limit(limit).offset(offset).all()
 
 
@@ -2,13 +2,25 @@
 Repositório do ledger contábil (append-only).
 Não expõe update nem delete; apenas criação e leitura.
 """
-from typing import List, Optional
+import uuid
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, insert
 
 from models import LedgerEntry
 
 
+def _validate_entry(amount, entry_type: str) -> None:
+    """Regras de sinal do ledger: credit = positivo, debit = negativo."""
+    if entry_type not in ("credit", "debit"):
+        raise ValueError("entry_type deve ser 'credit' ou 'debit'")
+    if entry_type == "credit" and amount <= 0:
+        raise ValueError("credit deve ter amount > 0")
+    if entry_type == "debit" and amount >= 0:
+        raise ValueError("debit deve ter amount < 0")
+
+
 class LedgerRepository:
     """
     Repositório para entradas do ledger.
@@ -17,6 +29,8 @@ class LedgerRepository:
 
     def __init__(self, db: Session):
         self.db = db
+        # Soma signed das entradas anexadas por conta (aplicada em account.balance via apply_balance_deltas)
+        self._balance_deltas: Dict[str, Decimal] = {}
 
     def append(
         self,
@@ -31,12 +45,7 @@ class LedgerRepository:
         amount: credit = positivo, debit = negativo.
         entry_type: 'credit' | 'debit'.
         """
-        if entry_type not in ("credit", "debit"):
-            raise ValueError("entry_type deve ser 'credit' ou 'debit'")
-        if entry_type == "credit" and amount <= 0:
-            raise ValueError("credit deve ter amount > 0")
-        if entry_type == "debit" and amount >= 0:
-            raise ValueError("debit deve ter amount < 0")
+        _validate_entry(amount, entry_type)
 
         entry = LedgerEntry(
             user_id=user_id,
@@ -46,8 +55,49 @@ class LedgerRepository:
             entry_type=entry_type,
         )
         self.db.add(entry)
+        self._track_delta(account_id, amount)
         return entry
 
+    def append_many(self, entries: Iterable[dict]) -> List[dict]:
+        """
+        Insere várias entradas no ledger em um único INSERT multi-linha (executemany).
+        Cada item: user_id, account_id, amount, entry_type, transaction_id (opcional).
+        Valida todas as regras de sinal em memória antes de enviar qualquer linha:
+        se uma entrada for inválida, nada é inserido.
+        Retorna as linhas inseridas (com id gerado).
+        """
+        rows = []
+        for e in entries:
+            _validate_entry(e["amount"], e["entry_type"])
+            rows.append({
+                "id": str(uuid.uuid4()),
+                "user_id": e["user_id"],
+                "account_id": e["account_id"],
+                "transaction_id": e.get("transaction_id"),
+                "amount": e["amount"],
+                "entry_type": e["entry_type"],
+            })
+        if not rows:
+            return rows
+        self.db.execute(insert(LedgerEntry.__table__), rows)
+        for row in rows:
+            self._track_delta(row["account_id"], row["amount"])
+        return rows
+
+    def _track_delta(self, account_id: str, amount) -> None:
+        self._balance_deltas[account_id] = (
+            self._balance_deltas.get(account_id, Decimal("0")) + Decimal(str(amount))
+        )
+
+    def pop_balance_deltas(self) -> Dict[str, Decimal]:
+        """
+        Retorna {account_id: delta} das entradas anexadas desde a última chamada e zera o acumulador.
+        delta = soma signed dos amounts (credit > 0, debit < 0).
+        """
+        deltas = self._balance_deltas
+        self._balance_deltas = {}
+        return deltas
+
     def get_entries_by_account(
         self,
         account_id: str,
@@ -71,3 +121,14 @@ class LedgerRepository:
             .order_by(LedgerEntry.created_at)
             .all()
         )
+
+    def get_entries_by_transactions(self, transaction_ids: List[str]) -> List[LedgerEntry]:
+        """Lista entradas associadas a várias transações (uma query)."""
+        if not transaction_ids:
+            return []
+        return (
+            self.db.query(LedgerEntry)
+            .filter(LedgerEntry.transaction_id.in_(transaction_ids))
+            .order_by(LedgerEntry.created_at)
+            .all()
+        )
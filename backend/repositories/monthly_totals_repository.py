@@ -0,0 +1,244 @@
+"""
+Rollup monthly_category_totals: (user_id, year_month, category_id, type) -> total_cents, count.
+
+Escrita: TransactionService registra cada transação criada (+1) ou removida/alterada (-1 com os
+valores antigos) num MonthlyTotalsRepository e chama flush() na mesma transação do banco: um
+upsert multi-linha com incremento (col = col + excluded.col) por escrita.
+Leitura: resumo mensal, cashflow, resumo por categoria, insights e alertas de orçamento leem o
+rollup — custo O(categorias x meses), não O(transações). Períodos são alinhados ao mês.
+rebuild_monthly_totals recalcula tudo a partir de transactions (migração e
+scripts/rebuild_monthly_totals.py).
+
+Mês da transação: campos de Transaction.date; datas com fuso são convertidas para UTC antes
+(o rebuild no PostgreSQL usa date AT TIME ZONE 'UTC').
+"""
+from collections import defaultdict
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
+
+from sqlalchemy import BigInteger, Integer, and_, cast, delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from core.amount_parser import to_cents
+from core.database_utils import bulk_upsert
+from models import Category, MonthlyCategoryTotal, Transaction
+from repositories.report_cache_repository import bump_data_version
+
+_TABLE = MonthlyCategoryTotal.__table__
+_KEY_COLUMNS = ["user_id", "year_month", "category_id", "type"]
+
+# (user_id, year_month, category_id, type)
+TotalsKey = Tuple[str, int, str, str]
+
+
+class MonthlyTotalRow(NamedTuple):
+    year_month: int
+    category_id: str
+    type: str
+    total_cents: int
+    count: int
+
+    @property
+    def year(self) -> int:
+        return self.year_month // 100
+
+    @property
+    def month(self) -> int:
+        return self.year_month % 100
+
+
+def year_month(value: Union[date, datetime]) -> int:
+    """Chave AAAAMM do mês de uma data (datetime com fuso: mês em UTC)."""
+    if isinstance(value, datetime) and value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return value.year * 100 + value.month
+
+
+def shift_year_month(ym: int, months: int) -> int:
+    """AAAAMM deslocado de `months` meses (negativo = para trás)."""
+    index = (ym // 100) * 12 + (ym % 100 - 1) + months
+    return (index // 12) * 100 + index % 12 + 1
+
+
+def _month_key_expr(dialect_name: str):
+    """Expressão SQL AAAAMM de transactions.date, coerente com year_month() em Python."""
+    if dialect_name == "postgresql":
+        utc = func.timezone("UTC", Transaction.date)
+        return cast(func.extract("year", utc) * 100 + func.extract("month", utc), Integer)
+    # SQLite: datetime gravado como texto 'AAAA-MM-DD HH:MM:SS'
+    return cast(func.substr(Transaction.date, 1, 4).op("||")(func.substr(Transaction.date, 6, 2)), Integer)
+
+
+class MonthlyTotalsRepository:
+    """Acumula deltas do rollup (add/add_transaction) e aplica com flush(); consultas de leitura."""
+
+    def __init__(self, db: Session):
+        self.db = db
+        self._deltas: Dict[TotalsKey, List[int]] = defaultdict(lambda: [0, 0])
+
+    # --- escrita ---
+
+    def add(
+        self,
+        user_id: str,
+        tx_date: Union[date, datetime],
+        category_id: str,
+        tx_type: str,
+        amount,
+        sign: int = 1,
+    ) -> None:
+        """Registra uma transação (+1) ou sua remoção (sign=-1) no mês/categoria/tipo."""
+        delta = self._deltas[(user_id, year_month(tx_date), category_id, tx_type)]
+        delta[0] += sign * to_cents(Decimal(str(amount)))
+        delta[1] += sign
+
+    def add_transaction(self, tx: Union[Transaction, dict], sign: int = 1) -> None:
+        """add() a partir de um Transaction ou de um dict com as mesmas chaves."""
+        get = tx.get if isinstance(tx, dict) else lambda key: getattr(tx, key)
+        self.add(get("user_id"), get("date"), get("category_id"), get("type"), get("amount"), sign)
+
+    def flush(self) -> None:
+        """Aplica os deltas acumulados (um upsert multi-linha) e remove linhas que zeraram."""
+        deltas = {k: v for k, v in self._deltas.items() if v != [0, 0]}
+        self._deltas.clear()
+        if not deltas:
+            return
+        bulk_upsert(
+            self.db,
+            _TABLE,
+            [
+                dict(zip(_KEY_COLUMNS, key), total_cents=cents, count=count)
+                for key, (cents, count) in sorted(deltas.items())
+            ],
+            index_elements=_KEY_COLUMNS,
+            increment_columns=["total_cents", "count"],
+        )
+        # Remoções podem zerar linhas: limpa as do(s) usuário(s) afetado(s) (prefixo da PK)
+        removed_users = {key[0] for key, (_, count) in deltas.items() if count < 0}
+        if removed_users:
+            self.db.execute(
+                delete(_TABLE).where(
+                    _TABLE.c.user_id.in_(removed_users),
+                    _TABLE.c["count"] <= 0,
+                )
+            )
+
+    # --- leitura ---
+
+    def rows(
+        self,
+        user_id: str,
+        start_ym: int,
+        end_ym: Optional[int] = None,
+        types: Optional[Iterable[str]] = None,
+        category_id: Optional[str] = None,
+    ) -> List[MonthlyTotalRow]:
+        """Linhas do rollup do usuário entre start_ym e end_ym (inclusive)."""
+        conditions = [_TABLE.c.user_id == user_id, _TABLE.c.year_month >= start_ym]
+        if end_ym is not None:
+            conditions.append(_TABLE.c.year_month <= end_ym)
+        if types is not None:
+            conditions.append(_TABLE.c.type.in_(list(types)))
+        if category_id is not None:
+            conditions.append(_TABLE.c.category_id == category_id)
+        result = self.db.execute(
+            select(
+                _TABLE.c.year_month,
+                _TABLE.c.category_id,
+                _TABLE.c.type,
+                _TABLE.c.total_cents,
+                _TABLE.c["count"],
+            )
+            .where(and_(*conditions))
+            .order_by(_TABLE.c.year_month, _TABLE.c.category_id, _TABLE.c.type)
+        )
+        return [MonthlyTotalRow(*row) for row in result]
+
+    def rows_for_months(self, user_id: str, year_months: Iterable[int]) -> List[MonthlyTotalRow]:
+        """Linhas do rollup do usuário nos meses AAAAMM informados (lista arbitrária), numa query."""
+        year_months = sorted(set(year_months))
+        if not year_months:
+            return []
+        result = self.db.execute(
+            select(
+                _TABLE.c.year_month,
+                _TABLE.c.category_id,
+                _TABLE.c.type,
+                _TABLE.c.total_cents,
+                _TABLE.c["count"],
+            )
+            .where(
+                _TABLE.c.user_id == user_id,
+                # faixa contínua na PK + IN para meses salteados
+                _TABLE.c.year_month >= year_months[0],
+                _TABLE.c.year_month <= year_months[-1],
+                _TABLE.c.year_month.in_(year_months),
+            )
+            .order_by(_TABLE.c.year_month, _TABLE.c.category_id, _TABLE.c.type)
+        )
+        return [MonthlyTotalRow(*row) for row in result]
+
+    def totals_by_category(
+        self, user_id: str, start_ym: int, end_ym: Optional[int], tx_type: str
+    ) -> List[tuple]:
+        """[(category_id, category_name, total_cents, count)] do tipo no período, maior total primeiro."""
+        conditions = [
+            _TABLE.c.user_id == user_id,
+            _TABLE.c.type == tx_type,
+            _TABLE.c.year_month >= start_ym,
+        ]
+        if end_ym is not None:
+            conditions.append(_TABLE.c.year_month <= end_ym)
+        total = func.sum(_TABLE.c.total_cents)
+        return self.db.execute(
+            select(
+                _TABLE.c.category_id,
+                Category.name.label("category_name"),
+                total.label("total_cents"),
+                func.sum(_TABLE.c["count"]).label("count"),
+            )
+            .select_from(_TABLE.join(Category.__table__, Category.__table__.c.id == _TABLE.c.category_id))
+            .where(and_(*conditions))
+            .group_by(_TABLE.c.category_id, Category.name)
+            .order_by(total.desc())
+        ).all()
+
+
+def rebuild_monthly_totals(db: Session, user_id: Optional[str] = None) -> int:
+    """
+    Recalcula o rollup a partir de transactions (não excluídas): DELETE + INSERT ... SELECT
+    agrupado, na transação do chamador. user_id: só esse usuário. Retorna linhas gravadas.
+    Incrementa a versão dos dados (cache de relatórios) de cada usuário cujo rollup foi
+    recalculado, na mesma transação.
+    """
+    month_key = _month_key_expr(db.get_bind().dialect.name).label("year_month")
+    source = (
+        select(
+            Transaction.user_id,
+            month_key,
+            Transaction.category_id,
+            Transaction.type,
+            func.sum(cast(func.round(Transaction.amount * 100), BigInteger)),
+            func.count(),
+        )
+        .where(Transaction.deleted_at.is_(None))
+        .group_by(Transaction.user_id, month_key, Transaction.category_id, Transaction.type)
+    )
+    clear = delete(_TABLE)
+    if user_id is not None:
+        source = source.where(Transaction.user_id == user_id)
+        clear = clear.where(_TABLE.c.user_id == user_id)
+        user_ids = {user_id}
+    else:
+        # Quem tinha rollup (pode ficar sem linhas) ou passa a ter
+        user_ids = {uid for (uid,) in db.execute(select(_TABLE.c.user_id).distinct())}
+    db.execute(clear)
+    result = db.execute(
+        insert(_TABLE).from_select(_KEY_COLUMNS + ["total_cents", "count"], source)
+    )
+    if user_id is None:
+        user_ids.update(uid for (uid,) in db.execute(select(_TABLE.c.user_id).distinct()))
+    if user_ids:
+        bump_data_version(db, user_ids)
+    return result.rowcount
@@ -1,11 +1,12 @@
 """
 Repository para notificações.
-Paginação aplicada aqui (skip/limit) para listagens.
+Paginação aplicada aqui (skip/limit ou cursor keyset) para listagens.
 """
-from typing import List
+from typing import List, Optional
 from sqlalchemy.orm import Session
 
 from models import Notification
+from core.pagination import keyset_before
 
 
 class NotificationRepository:
@@ -20,9 +21,21 @@ class NotificationRepository:
         skip: int = 0,
         limit: int = 50,
         unread_only: bool = False,
+        after: Optional[str] = None,
     ) -> List[Notification]:
-        """Lista notificações do usuário com paginação. Ordenação: mais recentes primeiro."""
+        """
+        Lista notificações do usuário com paginação. Ordenação: mais recentes primeiro
+        (created_at DESC, id DESC). after: cursor keyset; quando informado, skip é ignorado.
+        """
         query = self.db.query(Notification).filter(Notification.user_id == user_id)
         if unread_only:
             query = query.filter(Notification.read_at.is_(None))
-        return query.order_by(Notification.created_at.desc()).offset(skip).limit(limit).all()
+        if after:
+            query = query.filter(keyset_before(Notification, Notification.created_at, after))
+            skip = 0
+        return (
+            query.order_by(Notification.created_at.desc(), Notification.id.desc())
+            .offset(skip)
+            .limit(limit)
+            .all()
+        )
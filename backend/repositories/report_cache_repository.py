@@ -0,0 +1,72 @@
+"""
+Versão dos dados do usuário (user_data_versions) e backend em banco do cache de relatórios
+(report_cache_entries).
+
+bump_data_version roda na transação da escrita (upsert com incremento): o cache nunca vê a
+versão nova antes dos dados novos estarem commitados.
+"""
+from typing import Any, Iterable, Optional
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from core.database_utils import bulk_upsert
+from models import ReportCacheEntry, UserDataVersion
+
+_VERSIONS = UserDataVersion.__table__
+_ENTRIES = ReportCacheEntry.__table__
+
+
+def bump_data_version(db: Session, user_ids: Iterable[str]) -> None:
+    """Incrementa a versão dos dados de cada usuário (um upsert multi-linha)."""
+    bulk_upsert(
+        db,
+        _VERSIONS,
+        [{"user_id": user_id, "version": 1} for user_id in sorted(set(user_ids))],
+        index_elements=["user_id"],
+        increment_columns=["version"],
+    )
+
+
+def get_data_version(db: Session, user_id: str) -> int:
+    """Versão atual dos dados do usuário (0 se ainda não houve escrita)."""
+    version = db.execute(
+        select(_VERSIONS.c.version).where(_VERSIONS.c.user_id == user_id)
+    ).scalar()
+    return int(version or 0)
+
+
+class ReportCacheRepository:
+    """Leitura/gravação de resultados de relatório por (usuário, chave, versão)."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get(self, user_id: str, cache_key: str, data_version: int) -> Optional[Any]:
+        """Resultado gravado para a versão informada, ou None."""
+        return self.db.execute(
+            select(_ENTRIES.c.data).where(
+                _ENTRIES.c.user_id == user_id,
+                _ENTRIES.c.cache_key == cache_key,
+                _ENTRIES.c.data_version == data_version,
+            )
+        ).scalar()
+
+    def put(self, user_id: str, cache_key: str, data_version: int, data: Any) -> None:
+        """
+        Grava (ou substitui) o resultado da chave e apaga as entradas do usuário de versões
+        anteriores: no máximo uma linha por relatório + parâmetros. Não faz commit.
+        """
+        self.db.execute(
+            delete(_ENTRIES).where(
+                _ENTRIES.c.user_id == user_id,
+                _ENTRIES.c.data_version < data_version,
+            )
+        )
+        bulk_upsert(
+            self.db,
+            _ENTRIES,
+            [{"user_id": user_id, "cache_key": cache_key, "data_version": data_version, "data": data}],
+            index_elements=["user_id", "cache_key"],
+            update_columns=["data_version", "data"],
+        )
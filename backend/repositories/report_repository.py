@@ -1,12 +1,55 @@
 """
 Repository para relatórios
 """
-from typing import List
+from collections import defaultdict
+from decimal import Decimal
+from typing import Dict, List, NamedTuple, Tuple
 from datetime import date, datetime, timedelta
+from sqlalchemy import and_, case, func
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func, extract
 
-from models import Transaction, Goal, Envelope, Category, Account, TransactionTag
+from models import Transaction, Goal, Envelope, Category, Account
+from core.amount_parser import from_cents, to_cents
+from core.month_range import MonthRange
+from repositories.monthly_totals_repository import (
+    MonthlyTotalsRepository,
+    shift_year_month,
+    year_month,
+)
+from repositories.transaction_tag_repository import tag_load_option, tag_names_by_user
+
+
+class CashflowRow(NamedTuple):
+    year: int
+    month: int
+    type: str
+    total: Decimal
+
+
+class CategorySummaryRow(NamedTuple):
+    category_id: str
+    category_name: str
+    total_amount: Decimal
+    transaction_count: int
+
+
+class PeriodTotals(NamedTuple):
+    total_transactions: int
+    total_income: Decimal
+    total_expenses: Decimal
+
+
+def _decimal(value) -> Decimal:
+    """SUM do banco (Decimal, float no SQLite ou 0 do COALESCE) -> Decimal."""
+    return value if isinstance(value, Decimal) else Decimal(str(value))
+
+
+def _sum_by_type(tx_type: str, condition=None):
+    """SUM(CASE WHEN type = tx_type [AND condition] THEN |amount| ELSE 0 END), 0 sem linhas."""
+    matches = Transaction.type == tx_type
+    if condition is not None:
+        matches = and_(matches, condition)
+    return func.coalesce(func.sum(case((matches, func.abs(Transaction.amount)), else_=0)), 0)
 
 
 class ReportRepository:
@@ -33,58 +76,94 @@ class ReportRepository:
         self,
         user_id: str,
         start_date: date
-    ) -> List[Transaction]:
-        """Busca transações para exportação com tags (eager load para t.tags)."""
-        return self.db.query(Transaction).filter(
+    ) -> Tuple[List[Transaction], Dict[str, List[str]]]:
+        """
+        Transações para exportação + mapa {transaction_id: [nomes de tags]} (duas queries,
+        sem carregar os vínculos N:N como objetos ORM).
+        """
+        transactions = self.db.query(Transaction).filter(
             Transaction.user_id == user_id,
             Transaction.date >= start_date
-        ).options(
-            joinedload(Transaction.transaction_tag_links).joinedload(TransactionTag.tag)
-        ).all()
+        ).options(tag_load_option(include_tags=False)).all()
+        return transactions, tag_names_by_user(self.db, user_id, start_date)
+
+    def _first_month_head(self, user_id: str, start_date: date) -> list:
+        """
+        Filtros das transações do mês de start_date a partir do próprio start_date (janelas de
+        months*30 dias começam no meio do mês; os meses inteiros seguintes saem do rollup).
+        """
+        start = start_date
+        if not isinstance(start, datetime):
+            start = datetime(start.year, start.month, start.day)
+        return [
+            Transaction.user_id == user_id,
+            Transaction.deleted_at.is_(None),
+            MonthRange(start, MonthRange.containing(start_date).end).filter(Transaction.date),
+        ]
 
     def get_cashflow_data(
         self,
         user_id: str,
         start_date: datetime
-    ) -> List:
-        """Busca dados de cashflow agregados por mês."""
-        return self.db.query(
-            extract('year', Transaction.date).label('year'),
-            extract('month', Transaction.date).label('month'),
-            Transaction.type,
-            func.sum(func.abs(Transaction.amount)).label('total')
-        ).filter(
-            Transaction.user_id == user_id,
-            Transaction.date >= start_date
-        ).group_by(
-            extract('year', Transaction.date),
-            extract('month', Transaction.date),
-            Transaction.type
-        ).all()
+    ) -> List[CashflowRow]:
+        """
+        Cashflow agregado por mês e tipo (income, expense e transfer) de start_date em diante.
+        Mês de start_date: transações a partir de start_date; meses seguintes: rollup
+        monthly_category_totals. Linhas com year, month, type e total (Decimal).
+        """
+        first_ym = year_month(start_date)
+        totals: Dict[Tuple[int, str], int] = defaultdict(int)
+        head = self.db.query(
+            Transaction.type, func.sum(func.abs(Transaction.amount))
+        ).filter(*self._first_month_head(user_id, start_date)).group_by(Transaction.type)
+        for tx_type, total in head:
+            totals[(first_ym, tx_type)] += to_cents(_decimal(total))
+        for row in MonthlyTotalsRepository(self.db).rows(user_id, shift_year_month(first_ym, 1)):
+            totals[(row.year_month, row.type)] += row.total_cents
+        return [
+            CashflowRow(ym // 100, ym % 100, tx_type, from_cents(cents))
+            for (ym, tx_type), cents in sorted(totals.items())
+        ]
     
     def get_category_summary(
         self,
         user_id: str,
         type_filter: str,
         start_date: date
-    ) -> List:
-        """Busca resumo por categoria."""
-        return self.db.query(
+    ) -> List[CategorySummaryRow]:
+        """
+        Resumo por categoria de start_date em diante, maior total primeiro: transações do mês
+        de start_date a partir de start_date + rollup monthly_category_totals dos meses seguintes.
+        """
+        totals: Dict[Tuple[str, str], List[int]] = defaultdict(lambda: [0, 0])
+        head = self.db.query(
             Transaction.category_id,
-            Category.name.label('category_name'),
-            func.sum(func.abs(Transaction.amount)).label('total_amount'),
-            func.count(Transaction.id).label('transaction_count')
+            Category.name,
+            func.sum(func.abs(Transaction.amount)),
+            func.count(Transaction.id),
         ).join(
             Category, Transaction.category_id == Category.id
         ).filter(
-            Transaction.user_id == user_id,
-            Transaction.type == type_filter,
-            Transaction.date >= start_date
-        ).group_by(
-            Transaction.category_id, Category.name
-        ).order_by(
-            func.sum(func.abs(Transaction.amount)).desc()
-        ).all()
+            *self._first_month_head(user_id, start_date), Transaction.type == type_filter
+        ).group_by(Transaction.category_id, Category.name)
+        for category_id, name, total, count in head:
+            acc = totals[(category_id, name)]
+            acc[0] += to_cents(_decimal(total))
+            acc[1] += int(count)
+        for category_id, name, cents, count in MonthlyTotalsRepository(self.db).totals_by_category(
+            user_id, shift_year_month(year_month(start_date), 1), None, type_filter
+        ):
+            acc = totals[(category_id, name)]
+            acc[0] += int(cents)
+            acc[1] += int(count)
+        return sorted(
+            (
+                CategorySummaryRow(category_id, name, from_cents(cents), count)
+                for (category_id, name), (cents, count) in totals.items()
+            ),
+            key=lambda row: row.total_amount,
+            reverse=True,
+        )
     
     def get_all_user_data(
         self,
@@ -98,51 +177,53 @@ class ReportRepository:
             'accounts': self.db.query(Account).filter(Account.user_id == user_id).all(),
         }
     
+    def get_period_totals(
+        self,
+        user_id: str,
+        start: date,
+        end: date
+    ) -> PeriodTotals:
+        """
+        Contagem e totais de receitas/despesas em [start, end), numa query de agregação
+        (COUNT + SUM(CASE ...)): custo de memória constante, sem carregar transações no Python.
+        """
+        count, income, expenses = self.db.query(
+            func.count(Transaction.id),
+            _sum_by_type("income"),
+            _sum_by_type("expense"),
+        ).filter(
+            Transaction.user_id == user_id,
+            Transaction.deleted_at.is_(None),
+            Transaction.date >= start,
+            Transaction.date < end,
+        ).one()
+        return PeriodTotals(int(count), _decimal(income), _decimal(expenses))
+    
     def get_monthly_comparison(
         self,
         user_id: str,
         year: int,
         month: int
     ) -> dict:
-        """Busca dados do mês atual e anterior para comparação."""
-        from calendar import monthrange
-        
-        # Mês atual
-        current_month_start = date(year, month, 1)
-        current_month_end = date(year, month, monthrange(year, month)[1])
-        
-        # Mês anterior
-        if month == 1:
-            prev_year = year - 1
-            prev_month = 12
-        else:
-            prev_year = year
-            prev_month = month - 1
-        
-        prev_month_start = date(prev_year, prev_month, 1)
-        prev_month_end = date(prev_year, prev_month, monthrange(prev_year, prev_month)[1])
-        
-        # Buscar transações do mês atual
-        current_transactions = self.db.query(Transaction).filter(
-            Transaction.user_id == user_id,
-            Transaction.date >= current_month_start,
-            Transaction.date <= current_month_end
-        ).all()
-        
-        # Buscar transações do mês anterior
-        prev_transactions = self.db.query(Transaction).filter(
+        """
+        Totais do mês e do anterior para comparação: uma query com agregação condicional
+        (SUM(CASE ...) por mês e tipo) sobre [início do mês anterior, fim do mês).
+        """
+        current_range = MonthRange.of(year, month)
+        prev_range = current_range.shift(-1)
+        in_current = Transaction.date >= current_range.start
+        row = self.db.query(
+            _sum_by_type("income", in_current),
+            _sum_by_type("expense", in_current),
+            _sum_by_type("income", ~in_current),
+            _sum_by_type("expense", ~in_current),
+        ).filter(
             Transaction.user_id == user_id,
-            Transaction.date >= prev_month_start,
-            Transaction.date <= prev_month_end
-        ).all()
-        
-        # Calcular totais
-        current_income = sum(t.amount for t in current_transactions if t.type == 'income')
-        current_expense = sum(abs(t.amount) for t in current_transactions if t.type == 'expense')
+            Transaction.deleted_at.is_(None),
+            prev_range.through(current_range).filter(Transaction.date),
+        ).one()
+        current_income, current_expense, prev_income, prev_expense = (_decimal(v) for v in row)
         current_balance = current_income - current_expense
-        
-        prev_income = sum(t.amount for t in prev_transactions if t.type == 'income')
-        prev_expense = sum(abs(t.amount) for t in prev_transactions if t.type == 'expense')
         prev_balance = prev_income - prev_expense
         
         return {
@@ -163,72 +244,3 @@ class ReportRepository:
             'expense_percentage_change': ((current_expense - prev_expense) / prev_expense * 100) if prev_expense > 0 else 0.0,
             'balance_percentage_change': ((current_balance - prev_balance) / abs(prev_balance) * 100) if prev_balance != 0 else 0.0
         }
-    
-    def get_wealth_evolution(
-        self,
-        user_id: str,
-        months: int = 12
-    ) -> List[dict]:
-        """Busca evolução do patrimônio total ao longo do tempo."""
-        from services.account_service import AccountService
-        
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=months * 30)
-        
-        # Buscar todas as contas do usuário
-        accounts = self.db.query(Account).filter(
-            Account.user_id == user_id,
-            Account.deleted_at.is_(None)
-        ).all()
-        
-        # Agrupar transações por mês
-        monthly_data = self.db.query(
-            extract('year', Transaction.date).label('year'),
-            extract('month', Transaction.date).label('month'),
-            Transaction.type,
-            func.sum(func.abs(Transaction.amount)).label('total')
-        ).filter(
-            Transaction.user_id == user_id,
-            Transaction.date >= start_date
-        ).group_by(
-            extract('year', Transaction.date),
-            extract('month', Transaction.date),
-            Transaction.type
-        ).order_by(
-            extract('year', Transaction.date),
-            extract('month', Transaction.date)
-        ).all()
-        
-        # Calcular saldo inicial (soma dos saldos iniciais das contas)
-        initial_balance = sum(float(acc.balance) for acc in accounts)
-        
-        # Processar mês a mês
-        wealth_data = {}
-        current_balance = initial_balance
-        
-        for item in monthly_data:
-            month_key = f"{int(item.year)}-{int(item.month):02d}"
-            if month_key not in wealth_data:
-                wealth_data[month_key] = {'income': 0, 'expense': 0}
-            
-            if item.type == 'income':
-                wealth_data[month_key]['income'] = float(item.total)
-            elif item.type == 'expense':
-                wealth_data[month_key]['expense'] = float(item.total)
-        
-        # Construir série temporal
-        result = []
-        running_balance = initial_balance
-        
-        for month_key in sorted(wealth_data.keys()):
-            data = wealth_data[month_key]
-            running_balance += data['income'] - data['expense']
-            
-            year, month = month_key.split('-')
-            result.append({
-                'date': f"{year}-{month}-01",
-                'total_balance': float(running_balance)
-            })
-        
-        return result
-
@@ -1,11 +1,13 @@
 """
 Repository para tags
 """
-from typing import List, Optional
+import uuid
+from typing import Dict, Iterable, List, Optional
 from sqlalchemy.orm import Session
 
 from models import Tag
 from repositories.base_repository import BaseRepository
+from core.database_utils import bulk_insert_ignore
 
 
 class TagRepository(BaseRepository[Tag]):
@@ -39,3 +41,45 @@ class TagRepository(BaseRepository[Tag]):
             Tag.name == name
         ).first()
 
+    def resolve_ids(
+        self,
+        user_id: str,
+        names: Iterable[str],
+        memo: Optional[Dict[str, str]] = None,
+    ) -> Dict[str, str]:
+        """
+        {nome: tag_id} das tags do usuário, criando as que faltam, em lote:
+        um SELECT ... WHERE name IN (...) e um INSERT multi-linha ON CONFLICT (user_id, name)
+        DO NOTHING RETURNING para as ausentes; em SQLite (sem RETURNING) ou quando outra
+        requisição criou a tag em paralelo, as restantes são relidas com um SELECT.
+        memo: mapa nome -> id do usuário reaproveitado entre chamadas (ex.: lotes da importação);
+        nomes já presentes não vão ao banco e os resolvidos são gravados nele.
+        """
+        memo = {} if memo is None else memo
+        wanted = list(dict.fromkeys(names))
+        pending = [n for n in wanted if n not in memo]
+        if pending:
+            memo.update(self._ids_by_name(user_id, pending))
+            missing = [n for n in pending if n not in memo]
+            if missing:
+                inserted = bulk_insert_ignore(
+                    self.db,
+                    Tag.__table__,
+                    [{"id": str(uuid.uuid4()), "name": n, "user_id": user_id} for n in missing],
+                    index_elements=["user_id", "name"],
+                    returning=["name", "id"],
+                )
+                memo.update(dict(inserted or []))
+                unresolved = [n for n in missing if n not in memo]
+                if unresolved:
+                    memo.update(self._ids_by_name(user_id, unresolved))
+        return {n: memo[n] for n in wanted}
+
+    def _ids_by_name(self, user_id: str, names: List[str]) -> Dict[str, str]:
+        return {
+            name: tag_id
+            for tag_id, name in self.db.query(Tag.id, Tag.name).filter(
+                Tag.user_id == user_id,
+                Tag.name.in_(names),
+            )
+        }
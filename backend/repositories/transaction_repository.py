@@ -1,13 +1,20 @@
 """
 Repository para transações
 """
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 from datetime import date, datetime
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import and_, extract, or_, func
+from sqlalchemy.orm import Session
+from sqlalchemy import Float, and_, cast, column, func, literal_column, or_, table
+from sqlalchemy.dialects.postgresql import REAL
 
 from models import Transaction, TransactionTag
 from repositories.base_repository import BaseRepository
+from repositories.transaction_tag_repository import tag_load_option
+from repositories.monthly_totals_repository import MonthlyTotalsRepository
+from core.amount_parser import from_cents
+from core.month_range import MonthRange
+from core.pagination import decode_rank_cursor, keyset_before
+from db.search import SEARCH_CONFIG, postgres_tsquery, search_terms, sqlite_match
 
 
 class TransactionRepository(BaseRepository[Transaction]):
@@ -27,9 +34,16 @@ class TransactionRepository(BaseRepository[Transaction]):
         start_date: Optional[date] = None,
         end_date: Optional[date] = None,
         tag_ids: Optional[List[str]] = None,
-        search: Optional[str] = None
+        search: Optional[str] = None,
+        after: Optional[str] = None,
+        include_tags: bool = True,
     ) -> List[Transaction]:
-        """Busca transações do usuário com filtros."""
+        """
+        Busca transações do usuário com filtros. Ordenação (date DESC, id DESC).
+        after: cursor opaco (core.pagination) — keyset no índice (user_id, date, id); quando
+        informado, skip é ignorado.
+        include_tags: tags via selectinload (uma query extra); False não carrega (t.tags == []).
+        """
         # Base query com filtro de usuário e soft delete
         query = self.db.query(Transaction).filter(
             and_(
@@ -60,11 +74,65 @@ class TransactionRepository(BaseRepository[Transaction]):
             search_term = f"%{search.lower()}%"
             query = query.filter(Transaction.description.ilike(search_term))
         
-        query = query.options(
-            joinedload(Transaction.transaction_tag_links).joinedload(TransactionTag.tag)
+        if after:
+            query = query.filter(keyset_before(Transaction, Transaction.date, after))
+            skip = 0
+
+        query = query.options(tag_load_option(include_tags))
+        return (
+            query.order_by(Transaction.date.desc(), Transaction.id.desc())
+            .offset(skip)
+            .limit(limit)
+            .all()
         )
-        return query.order_by(Transaction.date.desc()).offset(skip).limit(limit).all()
     
+    def search(
+        self,
+        user_id: str,
+        query: str,
+        limit: int = 50,
+        after: Optional[str] = None,
+        include_tags: bool = True,
+    ) -> List[Tuple[Transaction, float]]:
+        """
+        Busca textual indexada em description (db/search.py), sem acentos e por prefixo de palavra.
+        Ordenação por relevância (score DESC, id DESC); after: cursor de relevância
+        (core.pagination.encode_rank_cursor). Retorna [(transação, score)].
+        PostgreSQL: search_vector @@ to_tsquery('portuguese'), score ts_rank.
+        SQLite: FTS5 MATCH, score -bm25.
+        """
+        terms = search_terms(query)
+        if not terms:
+            return []
+        if self.db.get_bind().dialect.name == "postgresql":
+            vector = literal_column("transactions.search_vector")
+            tsquery = func.to_tsquery(
+                literal_column(f"'{SEARCH_CONFIG}'::regconfig"),
+                func.f_unaccent(postgres_tsquery(terms)),
+            )
+            score = func.ts_rank(vector, tsquery)
+            q = self.db.query(Transaction, score.label("search_score")).filter(vector.op("@@")(tsquery))
+            score_type = REAL
+        else:
+            fts = table("transactions_fts", column("rowid"))
+            score = -func.bm25(literal_column("transactions_fts"))
+            q = (
+                self.db.query(Transaction, score.label("search_score"))
+                .join(fts, fts.c.rowid == literal_column("transactions.rowid"))
+                .filter(literal_column("transactions_fts").op("MATCH")(sqlite_match(terms)))
+            )
+            score_type = Float
+        q = q.filter(Transaction.user_id == user_id, Transaction.deleted_at.is_(None))
+        if after:
+            last_score, last_id = decode_rank_cursor(after)
+            last_score = cast(last_score, score_type)
+            q = q.filter(or_(score < last_score, and_(score == last_score, Transaction.id < last_id)))
+        q = q.options(tag_load_option(include_tags))
+        return [
+            (t, float(rank))
+            for t, rank in q.order_by(score.desc(), Transaction.id.desc()).limit(limit).all()
+        ]
+
     def get_by_user_and_id(self, user_id: str, transaction_id: str) -> Optional[Transaction]:
         """Busca transação específica do usuário."""
         return self.db.query(Transaction).filter(
@@ -81,13 +149,12 @@ class TransactionRepository(BaseRepository[Transaction]):
         year: int,
         month: int
     ) -> List[Transaction]:
-        """Busca transações do mês específico."""
+        """Busca transações do mês específico (intervalo semiaberto: usa o índice user_id, date)."""
         return self.db.query(Transaction).filter(
             and_(
                 Transaction.user_id == user_id,
                 Transaction.deleted_at.is_(None),
-                extract('year', Transaction.date) == year,
-                extract('month', Transaction.date) == month
+                MonthRange.of(year, month).filter(Transaction.date),
             )
         ).all()
     
@@ -121,56 +188,46 @@ class TransactionRepository(BaseRepository[Transaction]):
         self, user_id: str, year: int, month: int
     ) -> dict:
         """
-        Agregações SQL para resumo mensal (COUNT, SUM, GROUP BY).
+        Resumo mensal a partir do rollup monthly_category_totals (uma query, O(categorias)).
         Retorna dict: total_transactions, total_income, total_expenses, net_balance, category_breakdown.
         """
-        base_filter = [
-            Transaction.user_id == user_id,
-            Transaction.deleted_at.is_(None),
-            extract("year", Transaction.date) == year,
-            extract("month", Transaction.date) == month,
-        ]
-        total_transactions = (
-            self.db.query(func.count(Transaction.id))
-            .filter(*base_filter)
-            .scalar() or 0
-        )
-        total_income = (
-            self.db.query(func.coalesce(func.sum(Transaction.amount), 0))
-            .filter(*base_filter, Transaction.type == "income")
-            .scalar() or 0
-        )
-        total_expenses = (
-            self.db.query(func.coalesce(func.sum(Transaction.amount), 0))
-            .filter(*base_filter, Transaction.type == "expense")
-            .scalar() or 0
-        )
-        total_income = float(total_income)
-        total_expenses = float(total_expenses)
-        net_balance = total_income - total_expenses
-        rows = (
-            self.db.query(
-                Transaction.category_id,
-                Transaction.type,
-                func.sum(Transaction.amount).label("total"),
-            )
-            .filter(*base_filter)
-            .group_by(Transaction.category_id, Transaction.type)
-            .all()
-        )
-        category_breakdown: dict = {}
-        for cat_id, ttype, total in rows:
-            if cat_id not in category_breakdown:
-                category_breakdown[cat_id] = {"income": 0, "expense": 0}
-            if ttype == "income":
-                category_breakdown[cat_id]["income"] = float(total)
-            else:
-                category_breakdown[cat_id]["expense"] = float(total)
-        return {
-            "total_transactions": total_transactions,
-            "total_income": total_income,
-            "total_expenses": total_expenses,
-            "net_balance": net_balance,
-            "category_breakdown": category_breakdown,
-        }
+        return self.get_monthly_summaries_aggregates(user_id, [(year, month)])[(year, month)]
 
+    def get_monthly_summaries_aggregates(
+        self, user_id: str, months: List[Tuple[int, int]]
+    ) -> Dict[Tuple[int, int], dict]:
+        """
+        Resumos de vários meses [(ano, mês)] numa única query ao rollup (ex.: o ano inteiro).
+        Totais e breakdown por categoria saem da mesma passada pelas linhas (mês x categoria x tipo).
+        Retorna {(ano, mês): dict de get_monthly_summary_aggregates}; meses sem transações vêm zerados.
+        """
+        cents: Dict[Tuple[int, int], dict] = {
+            (year, month): {"count": 0, "income": 0, "expense": 0, "breakdown": {}}
+            for year, month in months
+        }
+        rows = MonthlyTotalsRepository(self.db).rows_for_months(
+            user_id, [year * 100 + month for year, month in months]
+        )
+        for r in rows:
+            acc = cents[(r.year, r.month)]
+            acc["count"] += r.count
+            if r.type in ("income", "expense"):
+                acc[r.type] += r.total_cents
+            # Breakdown: tipos que não são income (expense, transfer) contam como "expense"
+            side = "income" if r.type == "income" else "expense"
+            acc["breakdown"].setdefault(r.category_id, {"income": 0, "expense": 0})[side] += r.total_cents
+        result = {}
+        for key, acc in cents.items():
+            total_income = float(from_cents(acc["income"]))
+            total_expenses = float(from_cents(acc["expense"]))
+            result[key] = {
+                "total_transactions": acc["count"],
+                "total_income": total_income,
+                "total_expenses": total_expenses,
+                "net_balance": total_income - total_expenses,
+                "category_breakdown": {
+                    category_id: {side: float(from_cents(c)) for side, c in totals.items()}
+                    for category_id, totals in acc["breakdown"].items()
+                },
+            }
+        return result
@@ -1,12 +1,63 @@
 """
-Repository para transaction_tags
+Repository para transaction_tags.
+Estratégia de carga de tags das transações (evita joinedload N:N com offset/limit, que
+multiplica linhas por tag):
+- tag_load_option(include_tags): selectinload (uma query extra por página) ou noload;
+- tag_names_by_transaction / tag_names_by_user: mapa compacto {transaction_id: [nomes]} em
+  uma query, para exportações e serialização sem percorrer objetos ORM.
 """
-from typing import List, Optional
-from sqlalchemy.orm import Session
+from collections import defaultdict
+from datetime import date
+from typing import Dict, Iterable, List, Optional
+from sqlalchemy.orm import Session, noload, selectinload
 
-from models import TransactionTag, Tag
+from models import Transaction, TransactionTag, Tag
 from repositories.base_repository import BaseRepository
 
+# Máximo de ids por IN (limite de parâmetros do SQLite)
+TAG_MAP_CHUNK_SIZE = 900
+
+
+def tag_load_option(include_tags: bool = True):
+    """Opção de carga de Transaction.transaction_tag_links (+ Tag) para queries de transações."""
+    if not include_tags:
+        return noload(Transaction.transaction_tag_links)
+    return selectinload(Transaction.transaction_tag_links).joinedload(TransactionTag.tag)
+
+
+def tag_names_by_transaction(db: Session, transaction_ids: Iterable[str]) -> Dict[str, List[str]]:
+    """{transaction_id: [nomes]} das transações informadas (uma query por bloco de ids)."""
+    ids = list(dict.fromkeys(transaction_ids))
+    result: Dict[str, List[str]] = defaultdict(list)
+    for i in range(0, len(ids), TAG_MAP_CHUNK_SIZE):
+        rows = (
+            db.query(TransactionTag.transaction_id, Tag.name)
+            .join(Tag, Tag.id == TransactionTag.tag_id)
+            .filter(TransactionTag.transaction_id.in_(ids[i:i + TAG_MAP_CHUNK_SIZE]))
+            .order_by(TransactionTag.transaction_id, Tag.name)
+        )
+        for transaction_id, name in rows:
+            result[transaction_id].append(name)
+    return dict(result)
+
+
+def tag_names_by_user(
+    db: Session, user_id: str, start_date: Optional[date] = None
+) -> Dict[str, List[str]]:
+    """{transaction_id: [nomes]} de todas as transações do usuário (desde start_date), em uma query."""
+    query = (
+        db.query(TransactionTag.transaction_id, Tag.name)
+        .join(Tag, Tag.id == TransactionTag.tag_id)
+        .join(Transaction, Transaction.id == TransactionTag.transaction_id)
+        .filter(Transaction.user_id == user_id)
+    )
+    if start_date is not None:
+        query = query.filter(Transaction.date >= start_date)
+    result: Dict[str, List[str]] = defaultdict(list)
+    for transaction_id, name in query.order_by(TransactionTag.transaction_id, Tag.name):
+        result[transaction_id].append(name)
+    return dict(result)
+
 
 class TransactionTagRepository(BaseRepository[TransactionTag]):
     """Repository para operações de transaction_tags."""
@@ -1,7 +1,7 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from datetime import datetime
+from datetime import datetime, date
 from pydantic import BaseModel
 
 from database import get_db
@@ -15,6 +15,10 @@ from services.accounts_service import (
     update_account as svc_update_account,
     delete_account as svc_delete_account,
 )
+from services.balance_history_service import (
+    get_account_balance_history,
+    default_history_range,
+)
 
 router = APIRouter()
 
@@ -40,6 +44,20 @@ class AccountResponse(BaseModel):
         from_attributes = True
 
 
+class BalanceHistoryPoint(BaseModel):
+    date: date
+    balance: float
+    balance_str: str
+
+
+class AccountBalanceHistory(BaseModel):
+    account_id: str
+    granularity: str
+    start_date: date
+    end_date: date
+    points: List[BalanceHistoryPoint]
+
+
 def _account_to_response(a: Account) -> AccountResponse:
     r = AccountResponse.model_validate(a)
     r.balance_str = serialize_money(a.balance)
@@ -92,3 +110,27 @@ async def delete_account(
     """
     svc_delete_account(db, current_user.id, account_id)
     return {"message": "Conta removida com sucesso"}
+
+
+@router.get("/{account_id}/balance-history", response_model=AccountBalanceHistory)
+async def get_balance_history(
+    account_id: str,
+    granularity: str = Query("month", regex="^(day|week|month)$"),
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Série histórica de saldo da conta (fim de cada dia/semana/mês).
+    Padrão: últimos 12 meses, mensal. Calculada de snapshots mensais + deltas do ledger.
+    """
+    default_start, default_end = default_history_range()
+    return get_account_balance_history(
+        db,
+        current_user.id,
+        account_id,
+        start_date or default_start,
+        end_date or default_end,
+        granularity,
+    )
@@ -1,13 +1,16 @@
 """
 Rotas do activity feed (lista, unread count, marcar como lido).
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.orm import Session
 
 from database import get_db
 from models import User
 from auth_utils import get_current_user
 from schemas import ActivityFeedItemSchema
+from core.pagination import set_next_cursor
 from repositories.activity_feed_repository import (
     list_feed_by_user,
     mark_as_read,
@@ -19,20 +22,24 @@ router = APIRouter()
 
 @router.get("/", response_model=list[ActivityFeedItemSchema])
 async def get_activity_feed(
+    response: Response,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
     limit: int = Query(50, ge=1, le=100),
     offset: int = Query(0, ge=0),
     only_unread: bool = Query(False),
+    after: Optional[str] = Query(None, description="Cursor da página seguinte (header X-Next-Cursor)"),
 ):
-    """Lista feed do usuário. Paginação: limit (default 50), offset."""
+    """Lista feed do usuário. Paginação: limit (default 50), offset ou after (cursor)."""
     items = list_feed_by_user(
         db=db,
         user_id=current_user.id,
         limit=limit,
         offset=offset,
         only_unread=only_unread,
+        after=after,
     )
+    set_next_cursor(response, items, limit, "created_at")
     return [ActivityFeedItemSchema.model_validate(i) for i in items]
 
 
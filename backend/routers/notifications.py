@@ -1,11 +1,12 @@
 """
 Rotas de notificações in-app.
-Paginação padrão: skip (default 0), limit (default 50, max 100) aplicada no repositório.
+Paginação padrão: skip (default 0), limit (default 50, max 100) aplicada no repositório;
+ou after (cursor keyset, header X-Next-Cursor).
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.orm import Session
 from sqlalchemy import func
-from typing import List
+from typing import List, Optional
 from datetime import datetime
 
 from database import get_db
@@ -13,26 +14,31 @@ from models import Notification, User
 from auth_utils import get_current_user
 from schemas import NotificationResponse
 from repositories.notification_repository import NotificationRepository
+from core.pagination import set_next_cursor
 
 router = APIRouter()
 
 
 @router.get("/", response_model=List[NotificationResponse])
 async def list_notifications(
+    response: Response,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
     unread_only: bool = Query(False, description="Apenas não lidas"),
     skip: int = Query(0, ge=0, description="Registros a pular (padrão 0)"),
     limit: int = Query(50, ge=1, le=100, description="Máximo de registros (padrão 50, máx 100)"),
+    after: Optional[str] = Query(None, description="Cursor da página seguinte (header X-Next-Cursor)"),
 ):
-    """Lista notificações do usuário, mais recentes primeiro. Paginação: skip, limit."""
+    """Lista notificações do usuário, mais recentes primeiro. Paginação: skip, limit ou after (cursor)."""
     repo = NotificationRepository(db)
     items = repo.list_by_user(
         user_id=current_user.id,
         skip=skip,
         limit=limit,
         unread_only=unread_only,
+        after=after,
     )
+    set_next_cursor(response, items, limit, "created_at")
     # Serializar com schema que mapeia metadata_ -> metadata (evita conflito com SQLAlchemy)
     return [NotificationResponse.model_validate(n) for n in items]
 
@@ -9,7 +9,7 @@ from typing import Any, Optional
 from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from pydantic import BaseModel
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm import Session
 
 from auth_utils import (
     verify_token,
@@ -23,7 +23,6 @@ from models import (
     Account,
     Category,
     Transaction,
-    TransactionTag,
     Goal,
     Envelope,
     Notification,
@@ -34,6 +33,7 @@ from models import (
     InsightFeedback,
     UserInsightPreferences,
 )
+from repositories.transaction_tag_repository import tag_load_option, tag_names_by_user
 
 router = APIRouter()
 security = HTTPBearer()
@@ -79,7 +79,7 @@ def _category_export(cat: Category) -> dict[str, Any]:
     }
 
 
-def _transaction_export(tx: Transaction) -> dict[str, Any]:
+def _transaction_export(tx: Transaction, tags: list[str]) -> dict[str, Any]:
     return {
         "id": tx.id,
         "date": _iso(tx.date),
@@ -88,7 +88,7 @@ def _transaction_export(tx: Transaction) -> dict[str, Any]:
         "type": tx.type,
         "amount": tx.amount,
         "description": tx.description,
-        "tags": tx.tags,
+        "tags": tags,
         "transfer_transaction_id": tx.transfer_transaction_id,
         "created_at": _iso(tx.created_at),
         "updated_at": _iso(tx.updated_at),
@@ -194,18 +194,17 @@ async def export_user_data(
     transactions = (
         db.query(Transaction)
         .filter(Transaction.user_id == user.id)
-        .options(
-            joinedload(Transaction.transaction_tag_links).joinedload(TransactionTag.tag)
-        )
+        .options(tag_load_option(include_tags=False))
         .all()
     )
+    tags_by_transaction = tag_names_by_user(db, user.id)
 
     payload = {
         "exported_at": datetime.utcnow().isoformat() + "Z",
         "user": _user_export(user),
         "accounts": [_account_export(a) for a in user.accounts],
         "categories": [_category_export(c) for c in user.categories],
-        "transactions": [_transaction_export(t) for t in transactions],
+        "transactions": [_transaction_export(t, tags_by_transaction.get(t.id, [])) for t in transactions],
         "goals": [_goal_export(g) for g in user.goals],
         "envelopes": [_envelope_export(e) for e in user.envelopes],
         "notifications": [_notification_export(n) for n in user.notifications],
@@ -1,7 +1,7 @@
 from datetime import date
 from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from pydantic import BaseModel
 
 from database import get_db
@@ -13,6 +13,8 @@ from services.report_service import (
     get_category_summary as get_category_summary_data,
     get_export_data,
 )
+from services.report_cache_service import report_cache
+from services.balance_history_service import get_wealth_history as get_wealth_history_data, default_history_range
 
 router = APIRouter()
 
@@ -32,6 +34,19 @@ class CategorySummary(BaseModel):
     percentage: float
 
 
+class WealthHistoryPoint(BaseModel):
+    date: date
+    balance: float
+    balance_str: str
+
+
+class WealthHistory(BaseModel):
+    granularity: str
+    start_date: date
+    end_date: date
+    points: List[WealthHistoryPoint]
+
+
 class FinancialSummary(BaseModel):
     total_transactions: int
     total_income: float
@@ -47,8 +62,11 @@ async def get_financial_summary(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    """Get financial summary for specified months."""
-    data = get_financial_summary_data(current_user.id, months, db)
+    """Get financial summary for specified months. Cache versionado (services.report_cache_service)."""
+    data = report_cache.get_or_compute(
+        db, current_user.id, "summary", {"months": months, "today": date.today()},
+        lambda: get_financial_summary_data(current_user.id, months, db),
+    )
     return FinancialSummary(**data)
 
 
@@ -58,8 +76,11 @@ async def get_cashflow(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    """Get monthly cashflow data."""
-    data = get_cashflow_data(current_user.id, months, db)
+    """Get monthly cashflow data. Cache versionado (services.report_cache_service)."""
+    data = report_cache.get_or_compute(
+        db, current_user.id, "cashflow", {"months": months, "today": date.today()},
+        lambda: get_cashflow_data(current_user.id, months, db),
+    )
     return [CashflowData(**item) for item in data]
 
 
@@ -70,11 +91,34 @@ async def get_category_summary(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    """Get spending/income summary by category."""
-    data = get_category_summary_data(current_user.id, type_filter, months, db)
+    """Get spending/income summary by category. Cache versionado (services.report_cache_service)."""
+    data = report_cache.get_or_compute(
+        db, current_user.id, "categories_summary",
+        {"type": type_filter, "months": months, "today": date.today()},
+        lambda: get_category_summary_data(current_user.id, type_filter, months, db),
+    )
     return [CategorySummary(**item) for item in data]
 
 
+@router.get("/wealth-history", response_model=WealthHistory)
+async def get_wealth_history(
+    granularity: str = Query("month", regex="^(day|week|month)$"),
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Série histórica do patrimônio (soma das contas ativas). Padrão: últimos 12 meses, mensal."""
+    default_start, default_end = default_history_range()
+    return get_wealth_history_data(
+        db,
+        current_user.id,
+        start_date or default_start,
+        end_date or default_end,
+        granularity,
+    )
+
+
 @router.get("/export")
 async def export_data(
     months: int = Query(6, ge=1, le=24),
@@ -2,9 +2,12 @@
 # Todos os valores recebidos pela API devem estar em centavos (int).
 # Nenhum float é aceito na camada de entrada.
 from decimal import Decimal
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+import codecs
+import io
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response, UploadFile, File, Form
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
+from starlette.concurrency import run_in_threadpool
 from typing import List, Optional
 from datetime import datetime, date
 from pydantic import BaseModel, Field, model_validator, field_validator
@@ -18,18 +21,39 @@ from services.transaction_service import (
     get_account_for_user,
     get_transaction_by_id,
     get_monthly_summary as service_get_monthly_summary,
+    get_monthly_summaries as service_get_monthly_summaries,
     get_existing_by_idempotency_key,
     get_transaction_and_account_for_delete,
+    group_commit_enabled,
 )
-from middleware.idempotency import IdempotencyContext, get_idempotency_context_transactions
-from core.database_utils import atomic_transaction
+from middleware.idempotency import (
+    IdempotencyContext,
+    get_idempotency_context_transactions,
+    get_idempotency_context_transactions_batch,
+)
+from core.database_utils import run_with_conflict_retry
+from core.pagination import NEXT_CURSOR_HEADER, encode_rank_cursor, set_next_cursor
 from core.request_context import set_idempotency_key
-from services.automation_checks import check_low_balance_after_transaction
-from services.round_up_service import apply_round_up_after_expense
+from services.transaction_side_effects import publish_transactions_created
+from services.transaction_import_service import (
+    check_row_limit,
+    detect_format,
+    import_batches,
+    iter_csv_rows,
+    iter_import_batches,
+    iter_ofx_rows,
+    validate_default_category,
+)
 from core.amount_parser import serialize_money
 
 router = APIRouter()
 
+# Máximo de itens em POST /api/transactions/batch
+TRANSACTION_BATCH_MAX_ITEMS = 100
+
+# Máximo de meses em GET /api/transactions/summary/monthly/batch
+MONTHLY_SUMMARY_MAX_MONTHS = 24
+
 
 class TransactionDeleteBatch(BaseModel):
     """Body para exclusão em lote de transações."""
@@ -98,14 +122,37 @@ class TransactionResponse(BaseModel):
         from_attributes = True
 
 
-def _transaction_to_response(t: Transaction) -> TransactionResponse:
-    """Monta TransactionResponse com amount (number) e amount_str (string)."""
+def _transaction_data_from_create(transaction: TransactionCreate) -> dict:
+    """Payload do service a partir do body de criação."""
+    transaction_data = {
+        "date": transaction.date,
+        "category_id": transaction.category_id,
+        "type": transaction.type,
+        "amount_cents": transaction.amount_cents,
+        "description": transaction.description,
+        "tags": transaction.tags or [],
+    }
+    if transaction.to_account_id is not None:
+        transaction_data["to_account_id"] = transaction.to_account_id
+    if transaction.shared_expense_id is not None:
+        transaction_data["shared_expense_id"] = transaction.shared_expense_id
+    return transaction_data
+
+
+def _transaction_to_response(t: Transaction, include_tags: bool = True) -> TransactionResponse:
+    """
+    Monta TransactionResponse com amount (number) e amount_str (string).
+    include_tags=False: tags não foram carregadas (noload) e saem como null.
+    """
     r = TransactionResponse.model_validate(t)
     r.amount_str = serialize_money(t.amount)
+    if not include_tags:
+        r.tags = None
     return r
 
 @router.get("/", response_model=List[TransactionResponse])
 async def get_transactions(
+    response: Response,
     skip: int = Query(0, ge=0, description="Registros a pular (padrão 0)"),
     limit: int = Query(50, ge=1, le=100, description="Máximo de registros (padrão 50, máx 100)"),
     type_filter: Optional[str] = Query(None, regex="^(income|expense)$"),
@@ -113,10 +160,15 @@ async def get_transactions(
     account_id: Optional[str] = None,
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
+    after: Optional[str] = Query(None, description="Cursor da página seguinte (header X-Next-Cursor)"),
+    include_tags: bool = Query(True, description="Carregar tags (false: tags = null, uma query a menos)"),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Get user's transactions with filters. Paginação aplicada no repositório: skip (default 0), limit (default 50, max 100)."""
+    """
+    Get user's transactions with filters. Paginação aplicada no repositório: skip (default 0),
+    limit (default 50, max 100) ou after (cursor keyset; header X-Next-Cursor quando há próxima página).
+    """
     repo = TransactionRepository(db)
     transactions = repo.get_by_user(
         user_id=current_user.id,
@@ -129,8 +181,35 @@ async def get_transactions(
         end_date=end_date,
         tag_ids=None,
         search=None,
+        after=after,
+        include_tags=include_tags,
     )
-    return [_transaction_to_response(t) for t in transactions]
+    set_next_cursor(response, transactions, limit, "date")
+    return [_transaction_to_response(t, include_tags) for t in transactions]
+
+@router.get("/search", response_model=List[TransactionResponse])
+async def search_transactions(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200, description="Termos buscados na descrição"),
+    limit: int = Query(50, ge=1, le=100, description="Máximo de registros (padrão 50, máx 100)"),
+    after: Optional[str] = Query(None, description="Cursor da página seguinte (header X-Next-Cursor)"),
+    include_tags: bool = Query(True, description="Carregar tags (false: tags = null, uma query a menos)"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Busca na descrição das transações, ordenada por relevância. Sem acentos e por prefixo de
+    palavra ("pao" encontra "Pão de açúcar"); todos os termos obrigatórios.
+    Índice textual (tsvector no PostgreSQL, FTS5 no SQLite) em vez de ILIKE.
+    """
+    repo = TransactionRepository(db)
+    results = repo.search(
+        user_id=current_user.id, query=q, limit=limit, after=after, include_tags=include_tags
+    )
+    if len(results) == limit:
+        last, score = results[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_rank_cursor(score, last.id)
+    return [_transaction_to_response(t, include_tags) for t, _ in results]
 
 @router.post("/", response_model=TransactionResponse)
 async def create_transaction(
@@ -164,28 +243,32 @@ async def create_transaction(
                 detail="Conta não encontrada"
             )
 
-        transaction_data = {
-            "date": transaction.date,
-            "category_id": transaction.category_id,
-            "type": transaction.type,
-            "amount_cents": transaction.amount_cents,
-            "description": transaction.description,
-            "tags": transaction.tags or [],
-        }
-        if transaction.to_account_id is not None:
-            transaction_data["to_account_id"] = transaction.to_account_id
-        if transaction.shared_expense_id is not None:
-            transaction_data["shared_expense_id"] = transaction.shared_expense_id
+        transaction_data = _transaction_data_from_create(transaction)
         if idem.key:
             transaction_data["idempotency_key"] = idem.key
 
         try:
-            with atomic_transaction(db):
-                db_transaction = TransactionService.create_transaction(
-                    transaction_data=transaction_data,
-                    account=account,
-                    user_id=current_user.id,
-                    db=db,
+            if transaction.type != "transfer" and group_commit_enabled():
+                # Group commit: o líder do grupo grava e commita; a espera sai do event loop
+                db_transaction = await run_in_threadpool(
+                    TransactionService.create_transaction_coalesced,
+                    transaction_data,
+                    account,
+                    current_user.id,
+                    db,
+                )
+            else:
+                # Retentativas com backoff (time.sleep) e o trabalho no banco fora do event loop
+                db_transaction = await run_in_threadpool(
+                    run_with_conflict_retry,
+                    db,
+                    lambda: TransactionService.create_transaction(
+                        transaction_data=transaction_data,
+                        account=account,
+                        user_id=current_user.id,
+                        db=db,
+                    ),
+                    operation_name="transaction_create",
                 )
         except IntegrityError:
             if idem.key:
@@ -198,16 +281,85 @@ async def create_transaction(
                 status_code=status.HTTP_409_CONFLICT,
                 detail="Requisição duplicada (mesma Idempotency-Key). Use a mesma key para retry ou uma nova para outra transação.",
             )
-        try:
-            check_low_balance_after_transaction(db, transaction.account_id, current_user.id)
-        except Exception:
-            pass
-        if transaction.type == "expense":
-            try:
-                apply_round_up_after_expense(db, current_user.id, transaction.amount_cents)
-            except Exception:
-                pass
         resp = _transaction_to_response(db_transaction)
+        publish_transactions_created(
+            db,
+            current_user.id,
+            account_ids=[transaction.account_id],
+            expense_amounts_cents=[transaction.amount_cents] if transaction.type == "expense" else [],
+            transaction_ids=[db_transaction.id],
+        )
+        idem.save_success(200, resp.model_dump(mode="json"))
+        return resp
+    except HTTPException:
+        idem.save_failed()
+        raise
+    except Exception:
+        idem.save_failed()
+        raise
+
+
+class TransactionBatchCreate(BaseModel):
+    """Body para criação em lote (tudo ou nada)."""
+    items: List[TransactionCreate] = Field(
+        ..., min_length=1, max_length=TRANSACTION_BATCH_MAX_ITEMS,
+        description=f"Transações a criar (máx. {TRANSACTION_BATCH_MAX_ITEMS})",
+    )
+
+
+class TransactionBatchResponse(BaseModel):
+    created: int
+    transactions: List[TransactionResponse]
+
+
+@router.post("/batch", response_model=TransactionBatchResponse)
+async def create_transactions_batch(
+    body: TransactionBatchCreate,
+    idem: IdempotencyContext = Depends(get_idempotency_context_transactions_batch),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Cria várias transações em uma única transação de banco (tudo ou nada).
+    Contas e categorias validadas em duas queries; locks de todas as contas uma vez, em ordem.
+    Idempotency-Key opcional vale para o lote inteiro (mesmo key + mesmo body → mesma resposta).
+    """
+    set_idempotency_key(idem.key)
+    idem.acquire(body.model_dump(mode="json"))
+
+    if idem.cached_response is not None:
+        return idem.cached_response
+    if idem.conflict_in_progress:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Outra requisição com a mesma Idempotency-Key está em andamento. Aguarde ou retente.",
+        )
+
+    try:
+        items = []
+        for transaction in body.items:
+            data = _transaction_data_from_create(transaction)
+            data["account_id"] = transaction.account_id
+            items.append(data)
+        def _create_batch():
+            created = TransactionService.create_transactions_batch(
+                items=items,
+                user_id=current_user.id,
+                db=db,
+            )
+            return [_transaction_to_response(t) for t in created]
+
+        responses = await run_in_threadpool(
+            run_with_conflict_retry, db, _create_batch, operation_name="transaction_batch_create"
+        )
+        publish_transactions_created(
+            db,
+            current_user.id,
+            account_ids=[t.account_id for t in body.items],
+            expense_amounts_cents=[t.amount_cents for t in body.items if t.type == "expense"],
+            transaction_ids=[r.id for r in responses],
+        )
+        resp = TransactionBatchResponse(created=len(responses), transactions=responses)
         idem.save_success(200, resp.model_dump(mode="json"))
         return resp
     except HTTPException:
@@ -218,6 +370,88 @@ async def create_transaction(
         raise
 
 
+class TransactionImportRowResult(BaseModel):
+    line: int
+    status: str  # created | duplicate | error
+    transaction_id: Optional[str] = None
+    error: Optional[str] = None
+
+
+class TransactionImportResponse(BaseModel):
+    imported: int
+    duplicates: int
+    errors: int
+    results: List[TransactionImportRowResult]
+
+
+@router.post("/import", response_model=TransactionImportResponse)
+async def import_transactions(
+    file: UploadFile = File(..., description="Extrato CSV (data;descrição;valor[;tipo;categoria;tags]) ou OFX"),
+    account_id: str = Form(...),
+    category_id: Optional[str] = Form(None, description="Categoria padrão para linhas sem categoria reconhecida"),
+    file_format: Optional[str] = Form(None, alias="format", regex="^(csv|ofx)$"),
+    encoding: str = Form("utf-8"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Importa extrato bancário (CSV/OFX) em lotes: leitura em streaming, em duas passadas (a
+    primeira só conta as linhas: acima do limite → 413 sem gravar nada); por lote, categorias
+    resolvidas numa query, lock da conta uma vez, INSERT em lote de transações e ledger,
+    um delta de saldo e um commit. Retorna o resultado de cada linha.
+    OFX: FITID já importado na conta → "duplicate" (reimportar o extrato não duplica).
+    """
+    fmt = detect_format(file.filename, file_format)
+    account = get_account_for_user(db, account_id, current_user.id)
+    if not account:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Conta não encontrada"
+        )
+    validate_default_category(db, current_user.id, category_id)
+
+    try:
+        codec = codecs.lookup(encoding).name
+    except LookupError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"encoding inválido: {encoding!r}",
+        )
+    # utf-8-sig: ignora BOM comum em CSV exportado por planilhas
+    text_encoding = "utf-8-sig" if codec == "utf-8" else codec
+
+    def _read(consume):
+        file.file.seek(0)
+        stream = io.TextIOWrapper(file.file, encoding=text_encoding, errors="replace")
+        try:
+            return consume(iter_csv_rows(stream) if fmt == "csv" else iter_ofx_rows(stream))
+        finally:
+            # Solta o TextIOWrapper sem fechar o arquivo do upload (o Starlette o fecha)
+            stream.detach()
+
+    # Leitura do arquivo e lotes (com retentativas) no threadpool, fora do event loop
+    await run_in_threadpool(_read, check_row_limit)
+    results = await run_in_threadpool(
+        _read,
+        lambda parsed: import_batches(db, current_user.id, account, iter_import_batches(parsed), category_id),
+    )
+
+    imported = sum(1 for r in results if r["status"] == "created")
+    if imported:
+        publish_transactions_created(
+            db,
+            current_user.id,
+            account_ids=[account.id],
+            transaction_ids=[r["transaction_id"] for r in results if r["status"] == "created"],
+        )
+    return TransactionImportResponse(
+        imported=imported,
+        duplicates=sum(1 for r in results if r["status"] == "duplicate"),
+        errors=sum(1 for r in results if r["status"] == "error"),
+        results=[TransactionImportRowResult(**r) for r in results],
+    )
+
+
 @router.delete("/", status_code=status.HTTP_200_OK)
 async def delete_transactions_batch(
     body: TransactionDeleteBatch,
@@ -226,32 +460,20 @@ async def delete_transactions_batch(
 ):
     """
     Exclui várias transações em uma única requisição (hard delete).
+    Set-based: custo em round trips constante (ver TransactionService.delete_transactions_batch).
     Retorna ids excluídos (para o frontend atualizar o store) e falhas por id.
     """
-    deleted_ids: List[str] = []
-    errors = []
-    with atomic_transaction(db):
-        for transaction_id in body.ids:
-            db_transaction, account = get_transaction_and_account_for_delete(
-                db, transaction_id, current_user.id
-            )
-            if not db_transaction:
-                errors.append({"id": transaction_id, "reason": "not_found"})
-                continue
-            if not account:
-                errors.append({"id": transaction_id, "reason": "account_not_found"})
-                continue
-            try:
-                TransactionService.delete_transaction(
-                    db_transaction=db_transaction,
-                    account=account,
-                    user_id=current_user.id,
-                    db=db,
-                    hard=True,
-                )
-                deleted_ids.append(transaction_id)
-            except Exception:
-                errors.append({"id": transaction_id, "reason": "delete_failed"})
+    deleted_ids, errors = await run_in_threadpool(
+        run_with_conflict_retry,
+        db,
+        lambda: TransactionService.delete_transactions_batch(
+            transaction_ids=body.ids,
+            user_id=current_user.id,
+            db=db,
+            hard=True,
+        ),
+        operation_name="transaction_batch_delete",
+    )
     return {
         "deleted": len(deleted_ids),
         "deleted_ids": deleted_ids,
@@ -280,6 +502,50 @@ async def get_monthly_summary(
     }
 
 
+@router.get("/summary/monthly/batch")
+async def get_monthly_summaries(
+    months: Optional[List[str]] = Query(None, description="Meses no formato AAAA-MM (repetível)"),
+    year: Optional[int] = Query(None, description="Ano inteiro (12 meses), alternativa a months"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Resumos de vários meses numa requisição (ex.: o ano inteiro para o gráfico anual).
+    Uma única query ao rollup mensal; cada item tem o formato de GET /summary/monthly.
+    """
+    if (months is None) == (year is None):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Informe months (AAAA-MM) ou year",
+        )
+    if year is not None:
+        periods = [(year, m) for m in range(1, 13)]
+    else:
+        periods = []
+        for value in months:
+            try:
+                parsed = datetime.strptime(value, "%Y-%m")
+            except ValueError:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Mês inválido: {value} (use AAAA-MM)",
+                )
+            if (parsed.year, parsed.month) not in periods:
+                periods.append((parsed.year, parsed.month))
+    if len(periods) > MONTHLY_SUMMARY_MAX_MONTHS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Máximo de {MONTHLY_SUMMARY_MAX_MONTHS} meses por requisição",
+        )
+    summaries = service_get_monthly_summaries(db, current_user.id, periods)
+    return {
+        "months": [
+            {"year": y, "month": m, **summaries[(y, m)]}
+            for y, m in sorted(periods)
+        ]
+    }
+
+
 @router.get("/{transaction_id}", response_model=TransactionResponse)
 async def get_transaction(
     transaction_id: str,
@@ -323,16 +589,21 @@ async def update_transaction(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Conta não encontrada"
         )
-    with atomic_transaction(db):
-        updated = TransactionService.update_transaction(
-            db_transaction=db_transaction,
-            update_data=update_data,
-            old_account=old_account,
-            new_account=new_account,
-            user_id=current_user.id,
-            db=db,
-        )
-        return _transaction_to_response(updated)
+    return await run_in_threadpool(
+        run_with_conflict_retry,
+        db,
+        lambda: _transaction_to_response(
+            TransactionService.update_transaction(
+                db_transaction=db_transaction,
+                update_data=dict(update_data),
+                old_account=old_account,
+                new_account=new_account,
+                user_id=current_user.id,
+                db=db,
+            )
+        ),
+        operation_name="transaction_update",
+    )
 
 @router.delete("/{transaction_id}")
 async def delete_transaction(
@@ -354,12 +625,16 @@ async def delete_transaction(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Conta da transação não encontrada"
         )
-    with atomic_transaction(db):
-        TransactionService.delete_transaction(
+    await run_in_threadpool(
+        run_with_conflict_retry,
+        db,
+        lambda: TransactionService.delete_transaction(
             db_transaction=db_transaction,
             account=account,
             user_id=current_user.id,
             db=db,
             hard=True,
-        )
+        ),
+        operation_name="transaction_delete",
+    )
     return {"message": "Transação removida com sucesso"}
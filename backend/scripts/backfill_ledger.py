@@ -3,129 +3,201 @@ Backfill inicial do ledger: migra transações existentes para ledger_entries.
 Execute uma vez após aplicar a migração add_ledger_entries_table.
 Transações que já possuem entradas no ledger são ignoradas (idempotente).
 
-Uso: python scripts/backfill_ledger.py [--dry-run]
+Streaming: lotes por keyset (created_at, id), só transações sem entrada no ledger (anti-join
+NOT EXISTS no SQL); um INSERT multi-linha e um commit por lote. O cursor (último id processado
+e contas a sincronizar) é gravado em arquivo após cada commit: execução interrompida retoma do
+ponto onde parou. Depois de um lote com erro o cursor não avança mais nesta execução: a próxima
+retoma desde antes dele (lotes já gravados são ignorados pelo anti-join). Saldo de cada conta
+tocada é sincronizado uma única vez ao final.
+Direção das pernas de transferência: core.ledger_utils.transfer_leg_sign (ledger/pareamento,
+não a descrição).
+
+Uso: python scripts/backfill_ledger.py [--dry-run] [--batch-size N] [--cursor-file arquivo] [--reset]
 """
 import sys
 import os
 import argparse
+import json
+from datetime import datetime
+from typing import Optional
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from sqlalchemy import and_, exists, or_, select
+from sqlalchemy.orm import Session, aliased
+
 from database import SessionLocal
 from models import Transaction, LedgerEntry
 from repositories.ledger_repository import LedgerRepository
-from core.ledger_utils import sync_account_balance_from_ledger
+from core.ledger_utils import sync_account_balance_from_ledger, transfer_leg_sign
+
+BACKFILL_BATCH_SIZE = 1000
+DEFAULT_CURSOR_FILE = os.getenv("BACKFILL_LEDGER_CURSOR_FILE", "backfill_ledger.cursor.json")
+
+
+def _load_cursor(path: Optional[str]) -> dict:
+    if not path or not os.path.exists(path):
+        return {"last_id": None, "last_created_at": None, "pending_sync": []}
+    with open(path, encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def _save_cursor(path: Optional[str], cursor: dict) -> None:
+    if not path:
+        return
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(cursor, fh)
+    os.replace(tmp, path)
+
+
+def _after_cursor(db: Session, cursor: dict):
+    """
+    Filtro keyset (created_at, id) > cursor. created_at do cursor é lido do próprio banco
+    (subquery pelo id) para comparar valores no mesmo formato; se a transação do cursor não
+    existir mais, usa o created_at gravado no arquivo.
+    """
+    last_id = cursor.get("last_id")
+    if not last_id:
+        return None
+    if db.query(Transaction.id).filter(Transaction.id == last_id).first():
+        last_ts = (
+            select(Transaction.created_at)
+            .where(Transaction.id == last_id)
+            .scalar_subquery()
+        )
+    else:
+        last_ts = datetime.fromisoformat(cursor["last_created_at"])
+    return or_(
+        Transaction.created_at > last_ts,
+        and_(Transaction.created_at == last_ts, Transaction.id > last_id),
+    )
 
 
-def backfill_ledger(dry_run: bool = False) -> dict:
+def backfill_ledger(
+    dry_run: bool = False,
+    batch_size: int = BACKFILL_BATCH_SIZE,
+    cursor_file: Optional[str] = DEFAULT_CURSOR_FILE,
+    reset: bool = False,
+    db: Optional[Session] = None,
+) -> dict:
     """
     Cria uma entrada no ledger para cada transação existente que ainda não tem.
     income -> credit (amount > 0), expense -> debit (amount < 0).
     transfer: cada perna gera uma entrada (débito na origem, crédito no destino).
+    dry_run: não grava entradas nem cursor.
     """
-    db = SessionLocal()
-    stats = {"processed": 0, "created": 0, "skipped": 0, "errors": 0}
-
-    try:
-        # Transações não deletadas
-        transactions = (
-            db.query(Transaction)
-            .filter(Transaction.deleted_at.is_(None))
-            .order_by(Transaction.created_at)
-            .all()
-        )
+    own_session = db is None
+    db = db or SessionLocal()
+    stats = {"processed": 0, "created": 0, "skipped": 0, "errors": 0, "batches": 0, "synced": 0}
+    cursor = {"last_id": None, "last_created_at": None, "pending_sync": []} if reset else _load_cursor(cursor_file)
+    touched = set(cursor.get("pending_sync") or [])
+    # position: keyset da leitura (sempre avança); cursor: o que é gravado (só após commit)
+    position = dict(cursor)
+    failed = False
 
-        # IDs de transações que já têm alguma entrada no ledger
-        existing = set(
-            row[0]
-            for row in db.query(LedgerEntry.transaction_id)
-            .filter(LedgerEntry.transaction_id.isnot(None))
-            .distinct()
-            .all()
-        )
+    partner = aliased(Transaction)
+    has_ledger = exists().where(LedgerEntry.transaction_id == Transaction.id)
 
+    try:
         ledger = LedgerRepository(db)
+        while True:
+            query = (
+                db.query(Transaction, transfer_leg_sign(Transaction, partner))
+                .outerjoin(
+                    partner,
+                    and_(
+                        partner.id == Transaction.transfer_transaction_id,
+                        partner.deleted_at.is_(None),
+                    ),
+                )
+                .filter(Transaction.deleted_at.is_(None), ~has_ledger)
+            )
+            after = _after_cursor(db, position)
+            if after is not None:
+                query = query.filter(after)
+            batch = (
+                query.order_by(Transaction.created_at, Transaction.id)
+                .limit(batch_size)
+                .all()
+            )
+            if not batch:
+                break
 
-        for t in transactions:
-            stats["processed"] += 1
-            if t.id in existing:
-                stats["skipped"] += 1
-                continue
-
-            try:
+            pending = []
+            for t, sign in batch:
+                stats["processed"] += 1
+                amount = float(t.amount or 0)
+                if amount <= 0:
+                    stats["errors"] += 1
+                    continue
                 if t.type == "income":
-                    ledger.append(
-                        user_id=t.user_id,
-                        account_id=t.account_id,
-                        amount=float(t.amount),
-                        entry_type="credit",
-                        transaction_id=t.id,
-                    )
+                    entry_type = "credit"
                 elif t.type == "expense":
-                    ledger.append(
-                        user_id=t.user_id,
-                        account_id=t.account_id,
-                        amount=-float(t.amount),
-                        entry_type="debit",
-                        transaction_id=t.id,
-                    )
+                    amount, entry_type = -amount, "debit"
                 elif t.type == "transfer":
-                    # Duas pernas: origem = débito, destino = crédito. Ordem: origem criada primeiro (created_at).
-                    other = (
-                        db.query(Transaction)
-                        .filter(
-                            Transaction.id == t.transfer_transaction_id,
-                            Transaction.deleted_at.is_(None),
-                        )
-                        .first()
-                    )
-                    if not other:
+                    # Sem par ou direção indeterminável: fica para revisão manual
+                    if t.transfer_transaction_id is None or sign is None:
                         stats["skipped"] += 1
                         continue
-                    is_origin = t.created_at <= other.created_at if other.created_at else True
-                    if is_origin:
-                        ledger.append(
-                            user_id=t.user_id,
-                            account_id=t.account_id,
-                            amount=-float(t.amount),
-                            entry_type="debit",
-                            transaction_id=t.id,
-                        )
+                    if sign < 0:
+                        amount, entry_type = -amount, "debit"
                     else:
-                        ledger.append(
-                            user_id=t.user_id,
-                            account_id=t.account_id,
-                            amount=float(t.amount),
-                            entry_type="credit",
-                            transaction_id=t.id,
-                        )
-                    stats["created"] += 1
-                    existing.add(t.id)
+                        entry_type = "credit"
                 else:
                     stats["skipped"] += 1
                     continue
+                pending.append({
+                    "user_id": t.user_id,
+                    "account_id": t.account_id,
+                    "amount": amount,
+                    "entry_type": entry_type,
+                    "transaction_id": t.id,
+                })
+
+            last = batch[-1][0]
+            position = {
+                "last_id": last.id,
+                "last_created_at": last.created_at.isoformat() if last.created_at else None,
+            }
+            stats["batches"] += 1
+            if dry_run:
+                stats["created"] += len(pending)
+                continue
 
-                stats["created"] += 1
-                existing.add(t.id)
-            except Exception as e:
-                stats["errors"] += 1
-                print(f"  Erro transação {t.id}: {e}", file=sys.stderr)
+            # Um único INSERT multi-linha por lote; append_many valida as regras de sinal antes de gravar
+            try:
+                ledger.append_many(pending)
+                ledger.pop_balance_deltas()
+                db.commit()
+                stats["created"] += len(pending)
+                touched.update(e["account_id"] for e in pending)
+                if not failed:
+                    cursor.update(position)
+            except ValueError as e:
+                db.rollback()
+                failed = True
+                stats["errors"] += len(pending)
+                print(f"  Erro no lote: {e}", file=sys.stderr)
+            cursor["pending_sync"] = sorted(touched)
+            _save_cursor(cursor_file, cursor)
 
-        if not dry_run and stats["created"] > 0:
-            db.commit()
-            # Sincronizar account.balance com SUM(ledger) para compatibilidade com listagens
-            account_ids = set(
-                row[0]
-                for row in db.query(LedgerEntry.account_id).distinct().all()
-            )
-            for aid in account_ids:
+        if dry_run:
+            db.rollback()
+        elif touched:
+            # Sincronizar account.balance com SUM(ledger) uma vez por conta tocada
+            for aid in sorted(touched):
                 sync_account_balance_from_ledger(aid, db)
             db.commit()
-        elif dry_run or stats["created"] == 0:
-            db.rollback()
-
+            stats["synced"] = len(touched)
+            cursor["pending_sync"] = []
+            _save_cursor(cursor_file, cursor)
+    except Exception:
+        db.rollback()
+        raise
     finally:
-        db.close()
+        if own_session:
+            db.close()
 
     return stats
 
@@ -139,6 +211,22 @@ def main():
         action="store_true",
         help="Simular sem persistir",
     )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=BACKFILL_BATCH_SIZE,
+        help="Transações por lote (um INSERT e um commit por lote)",
+    )
+    parser.add_argument(
+        "--cursor-file",
+        default=DEFAULT_CURSOR_FILE,
+        help="Arquivo do cursor de retomada",
+    )
+    parser.add_argument(
+        "--reset",
+        action="store_true",
+        help="Ignorar o cursor salvo e começar do início",
+    )
     args = parser.parse_args()
 
     print("=" * 60)
@@ -147,12 +235,19 @@ def main():
     print(f"Modo: {'DRY RUN (simulação)' if args.dry_run else 'EXECUÇÃO REAL'}")
     print()
 
-    stats = backfill_ledger(dry_run=args.dry_run)
+    stats = backfill_ledger(
+        dry_run=args.dry_run,
+        batch_size=args.batch_size,
+        cursor_file=None if args.dry_run else args.cursor_file,
+        reset=args.reset,
+    )
 
-    print(f"Transações processadas: {stats['processed']}")
+    print(f"Transações sem ledger:  {stats['processed']}")
+    print(f"Lotes:                  {stats['batches']}")
     print(f"Entradas criadas:       {stats['created']}")
-    print(f"Já no ledger (skip):    {stats['skipped']}")
+    print(f"Ignoradas (skip):       {stats['skipped']}")
     print(f"Erros:                  {stats['errors']}")
+    print(f"Contas sincronizadas:   {stats['synced']}")
     if args.dry_run and stats["created"] > 0:
         print()
         print("Execute sem --dry-run para persistir.")
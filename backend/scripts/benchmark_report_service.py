@@ -0,0 +1,144 @@
+"""
+Benchmark: resumo financeiro e comparação mensal agregados no SQL vs carregando transações no ORM.
+Para cada tamanho, cria um usuário sintético com N transações nos últimos 24 meses num banco
+descartável (SQLite em memória por padrão, ou --database-url para um PostgreSQL de teste já migrado)
+e mede a mediana de latência e o pico de memória Python (tracemalloc) de cada caminho.
+Agregado no SQL: memória constante e latência só do banco; ORM: ambos crescem com N.
+
+Uso: python scripts/benchmark_report_service.py [--sizes N ...] [--repeat R] [--database-url URL]
+"""
+import sys
+import os
+import argparse
+import random
+import statistics
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session, sessionmaker
+
+from database import Base
+from models import Account, Category, Transaction, User
+from repositories.report_repository import ReportRepository
+from services.report_service import _period_dates, get_financial_summary
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+SUMMARY_MONTHS = 24
+
+
+def seed(db: Session, rows: int, batch_size: int = 5000) -> str:
+    """Cria usuário, conta, categoria e `rows` transações nos últimos SUMMARY_MONTHS meses. Retorna user_id."""
+    user = User(email=f"bench-{uuid.uuid4().hex[:8]}@example.com", name="Benchmark", hashed_password="x")
+    db.add(user)
+    db.flush()
+    account = Account(name="Conta", type="checking", balance=0, user_id=user.id)
+    category = Category(name="Geral", type="expense", color="#000000", icon="tag", user_id=user.id)
+    db.add_all([account, category])
+    db.flush()
+
+    rnd = random.Random(42)
+    now = datetime.now()
+    step = timedelta(minutes=SUMMARY_MONTHS * 30 * 24 * 60 / max(rows, 1))
+    for offset in range(0, rows, batch_size):
+        db.execute(insert(Transaction.__table__), [
+            {
+                "id": str(uuid.uuid4()),
+                "date": now - step * (offset + i + 1),
+                "account_id": account.id,
+                "category_id": category.id,
+                "type": "income" if rnd.random() < 0.2 else "expense",
+                "amount": rnd.randint(100, 50000) / 100,
+                "description": "Benchmark",
+                "user_id": user.id,
+            }
+            for i in range(min(batch_size, rows - offset))
+        ])
+    db.commit()
+    return user.id
+
+
+def _orm_financial_summary(db: Session, user_id: str) -> dict:
+    """Caminho antigo: carrega todas as transações do período e soma no Python (referência)."""
+    end_date, start_date = _period_dates(SUMMARY_MONTHS)
+    transactions = db.query(Transaction).filter(
+        Transaction.user_id == user_id,
+        Transaction.date >= start_date,
+        Transaction.date < end_date + timedelta(days=1),
+    ).all()
+    income = sum(t.amount for t in transactions if t.type == "income")
+    expenses = sum(abs(t.amount) for t in transactions if t.type == "expense")
+    return {"total_transactions": len(transactions), "total_income": income, "total_expenses": expenses}
+
+
+def _measure(db: Session, fn: Callable[[], object], repeat: int) -> Tuple[float, float]:
+    """(mediana em ms, pico de memória em KiB) de fn; sessão limpa antes de cada execução."""
+    samples, peak = [], 0
+    for _ in range(repeat):
+        db.expunge_all()
+        tracemalloc.start()
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return statistics.median(samples), peak / 1024
+
+
+def run_benchmark(db: Session, sizes: List[int], repeat: int = 5) -> List[Dict]:
+    """[{"rows", "<caminho>_ms", "<caminho>_kib"}] por tamanho."""
+    now = datetime.now()
+    results = []
+    for rows in sizes:
+        user_id = seed(db, rows)
+        repo = ReportRepository(db)
+        paths = {
+            "sql_summary": lambda: get_financial_summary(user_id, SUMMARY_MONTHS, db),
+            "sql_comparison": lambda: repo.get_monthly_comparison(user_id, now.year, now.month),
+            "orm_summary": lambda: _orm_financial_summary(db, user_id),
+        }
+        result = {"rows": rows}
+        for name, fn in paths.items():
+            result[f"{name}_ms"], result[f"{name}_kib"] = _measure(db, fn, repeat)
+        results.append(result)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do resumo financeiro (agregação SQL vs ORM).")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Transações por usuário sintético")
+    parser.add_argument("--repeat", type=int, default=5, help="Execuções por medição (mediana)")
+    parser.add_argument(
+        "--database-url",
+        default="sqlite://",
+        help="Banco descartável (padrão: SQLite em memória; PostgreSQL precisa estar migrado)",
+    )
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url)
+    if engine.dialect.name == "sqlite":
+        Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    try:
+        print(f"{engine.dialect.name}; mediana de {args.repeat} execuções; memória = pico tracemalloc")
+        print(
+            f"{'transações':>11}{'resumo SQL':>20}{'comparação SQL':>20}{'resumo ORM':>22}"
+        )
+        for r in run_benchmark(db, args.sizes, args.repeat):
+            print(
+                f"{r['rows']:>11}"
+                f"{r['sql_summary_ms']:>9.2f} ms{r['sql_summary_kib']:>6.0f} KiB"
+                f"{r['sql_comparison_ms']:>9.2f} ms{r['sql_comparison_kib']:>6.0f} KiB"
+                f"{r['orm_summary_ms']:>9.2f} ms{r['orm_summary_kib']:>8.0f} KiB"
+            )
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
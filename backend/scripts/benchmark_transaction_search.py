@@ -0,0 +1,115 @@
+"""
+Benchmark: busca indexada (TransactionRepository.search) vs ILIKE '%termo%' (get_by_user(search=...)).
+Cria um usuário sintético com N transações num banco descartável (SQLite em memória por padrão,
+ou --database-url para um PostgreSQL de teste já migrado) e mede a mediana de cada caminho.
+
+Uso: python scripts/benchmark_transaction_search.py [--rows N] [--repeat R] [--database-url URL] [termos ...]
+"""
+import sys
+import os
+import argparse
+import random
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session, sessionmaker
+
+from database import Base
+from models import Account, Category, Transaction, User
+from repositories.transaction_repository import TransactionRepository
+
+DEFAULT_TERMS = ["mercado", "pao", "farmacia", "uber"]
+
+_WORDS = [
+    "Mercado", "Padaria", "Pão", "Farmácia", "Uber", "Restaurante", "Posto", "Combustível",
+    "Aluguel", "Condomínio", "Academia", "Cinema", "Livraria", "Açougue", "Feira", "Pix",
+    "Salário", "Freela", "Internet", "Energia", "Água", "Streaming", "Presente", "Viagem",
+]
+
+
+def seed(db: Session, rows: int, batch_size: int = 5000) -> str:
+    """Cria usuário, conta, categoria e `rows` transações com descrições variadas. Retorna user_id."""
+    user = User(email=f"bench-{uuid.uuid4().hex[:8]}@example.com", name="Benchmark", hashed_password="x")
+    db.add(user)
+    db.flush()
+    account = Account(name="Conta", type="checking", balance=0, user_id=user.id)
+    category = Category(name="Geral", type="expense", color="#000000", icon="tag", user_id=user.id)
+    db.add_all([account, category])
+    db.flush()
+
+    rnd = random.Random(42)
+    start = datetime(2020, 1, 1)
+    for offset in range(0, rows, batch_size):
+        db.execute(insert(Transaction.__table__), [
+            {
+                "id": str(uuid.uuid4()),
+                "date": start + timedelta(minutes=37 * (offset + i)),
+                "account_id": account.id,
+                "category_id": category.id,
+                "type": "expense",
+                "amount": rnd.randint(100, 50000) / 100,
+                "description": " ".join(rnd.sample(_WORDS, 3)),
+                "user_id": user.id,
+            }
+            for i in range(min(batch_size, rows - offset))
+        ])
+    db.commit()
+    return user.id
+
+
+def _median_ms(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples)
+
+
+def run_benchmark(db: Session, user_id: str, terms: List[str], repeat: int = 5, limit: int = 50) -> List[Dict]:
+    """Mediana (ms) de cada caminho por termo: [{"term", "ilike_ms", "indexed_ms"}]."""
+    repo = TransactionRepository(db)
+    results = []
+    for term in terms:
+        results.append({
+            "term": term,
+            "ilike_ms": _median_ms(lambda: repo.get_by_user(user_id, limit=limit, search=term), repeat),
+            "indexed_ms": _median_ms(lambda: repo.search(user_id, term, limit=limit), repeat),
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da busca de transações (índice textual vs ILIKE).")
+    parser.add_argument("terms", nargs="*", default=DEFAULT_TERMS, help="Termos buscados")
+    parser.add_argument("--rows", type=int, default=100_000, help="Transações do usuário sintético")
+    parser.add_argument("--repeat", type=int, default=5, help="Execuções por medição (mediana)")
+    parser.add_argument(
+        "--database-url",
+        default="sqlite://",
+        help="Banco descartável (padrão: SQLite em memória; PostgreSQL precisa estar migrado)",
+    )
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url)
+    if engine.dialect.name == "sqlite":
+        Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    try:
+        user_id = seed(db, args.rows)
+        print(f"{args.rows} transações ({engine.dialect.name}); mediana de {args.repeat} execuções")
+        print(f"{'termo':<14}{'ILIKE (ms)':>12}{'índice (ms)':>14}")
+        for r in run_benchmark(db, user_id, args.terms, args.repeat):
+            print(f"{r['term']:<14}{r['ilike_ms']:>12.2f}{r['indexed_ms']:>14.2f}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
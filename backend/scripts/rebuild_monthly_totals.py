@@ -0,0 +1,46 @@
+"""
+Recalcula o rollup monthly_category_totals a partir de transactions (não excluídas).
+Use após correções manuais no banco ou se o rollup divergir das transações; a migração
+add_monthly_category_totals já faz o backfill inicial. Idempotente: apaga e reinsere.
+Na mesma transação incrementa a versão dos dados dos usuários recalculados: relatórios em
+cache (services/report_cache_service.py) deixam de ser servidos.
+
+Uso: python scripts/rebuild_monthly_totals.py [--user-id ID]
+"""
+import sys
+import os
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import SessionLocal
+from repositories.monthly_totals_repository import rebuild_monthly_totals
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Recalcula monthly_category_totals a partir das transações."
+    )
+    parser.add_argument(
+        "--user-id",
+        default=None,
+        help="Recalcular só este usuário (padrão: todos)",
+    )
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        rows = rebuild_monthly_totals(db, user_id=args.user_id)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+    scope = f"usuário {args.user_id}" if args.user_id else "todos os usuários"
+    print(f"monthly_category_totals recalculado ({scope}): {rows} linhas")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Conciliação de saldos: compara accounts.balance, SUM(ledger) e saldo derivado das transações
+para todas as contas (SQL agregado por lote de ids; lotes em paralelo num pool de processos).
+Grava relatório de divergências (CSV ou JSON) e, com --fix, corrige accounts.balance para o
+saldo do ledger (fonte da verdade) com UPDATE em lote.
+
+Uso: python scripts/reconcile_balances.py [--fix] [--workers N] [--batch-size N] [--report arquivo.csv|.json]
+"""
+import sys
+import os
+import argparse
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import SessionLocal
+from services.balance_reconciliation_service import (
+    RECONCILE_BATCH_SIZE,
+    reconcile_all_balances,
+    write_report,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Conciliação de saldos (armazenado x ledger x transações) de todas as contas."
+    )
+    parser.add_argument(
+        "--fix",
+        action="store_true",
+        help="Corrigir accounts.balance divergentes para o saldo do ledger",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Processos em paralelo (1 = sequencial)",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=RECONCILE_BATCH_SIZE,
+        help="Contas por lote",
+    )
+    parser.add_argument(
+        "--report",
+        default=f"reconcile_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+        help="Arquivo do relatório (.csv ou .json)",
+    )
+    parser.add_argument(
+        "--format",
+        choices=["csv", "json"],
+        default=None,
+        help="Formato do relatório (padrão: pela extensão)",
+    )
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("CONCILIAÇÃO DE SALDOS - VAI DE PIX")
+    print("=" * 60)
+    print(f"Modo: {'CORREÇÃO' if args.fix else 'SOMENTE RELATÓRIO'}")
+    print(f"Workers: {args.workers}  Lote: {args.batch_size}")
+    print()
+
+    started = time.monotonic()
+    db = SessionLocal()
+    try:
+        result = reconcile_all_balances(
+            db,
+            fix=args.fix,
+            batch_size=args.batch_size,
+            workers=args.workers,
+        )
+    finally:
+        db.close()
+    elapsed = time.monotonic() - started
+
+    fmt = write_report(result["discrepancies"], args.report, args.format)
+    stored = sum(1 for d in result["discrepancies"] if abs(d["stored_diff"]) > 0)
+
+    print(f"Contas verificadas:        {result['checked']}")
+    print(f"Lotes:                     {result['batches']}")
+    print(f"Contas com divergência:    {len(result['discrepancies'])}")
+    print(f"  saldo armazenado ≠ ledger: {stored}")
+    print(f"Contas corrigidas:         {result['fixed']}")
+    print(f"Relatório ({fmt}):          {args.report}")
+    print(f"Tempo:                     {elapsed:.2f}s")
+
+    if result["discrepancies"] and not args.fix:
+        print()
+        print("Execute com --fix para corrigir os saldos armazenados.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
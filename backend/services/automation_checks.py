@@ -6,7 +6,7 @@ from decimal import Decimal
 from sqlalchemy.orm import Session
 
 from models import AutomationRule
-from core.ledger_utils import get_balance_from_ledger
+from core.ledger_utils import get_account_balance
 from services.notification_service import create_notification
 
 
@@ -17,22 +17,23 @@ def check_low_balance_after_transaction(
 ) -> None:
     """
     Após uma transação, verifica regras low_balance_alert para a conta.
-    Se o saldo (do ledger) ficar abaixo do mínimo configurado, cria notificação.
+    Se o saldo ficar abaixo do mínimo configurado, cria notificação.
+    Sem regra para a conta, não lê saldo; saldo de accounts.balance (mantido pelos deltas do
+    ledger; SUM do ledger com LEDGER_VERIFY_BALANCE).
     """
     rules = db.query(AutomationRule).filter(
         AutomationRule.user_id == user_id,
         AutomationRule.is_active == True,
         AutomationRule.type == "low_balance_alert",
     ).all()
+    rules = [r for r in rules if (r.conditions or {}).get("account_id") == account_id]
+    if not rules:
+        return
 
-    balance = get_balance_from_ledger(account_id, db)
-    balance_float = float(balance)
+    balance_float = float(get_account_balance(account_id, db))
 
     for rule in rules:
         conditions = rule.conditions or {}
-        rule_account_id = conditions.get("account_id")
-        if rule_account_id != account_id:
-            continue
         # Valor mínimo em centavos (int) ou em reais (float) para compatibilidade
         min_cents = conditions.get("amount_cents")
         min_reais = conditions.get("amount")
@@ -0,0 +1,210 @@
+"""
+Séries históricas de saldo (por conta e patrimônio do usuário).
+Saldo de abertura do período via balances_at (snapshot mensal + delta do ledger, duas queries
+agrupadas por conta para todas as contas); depois um único SELECT agregado por dia no intervalo pedido. Nunca soma o histórico inteiro da conta.
+Cache em processo por (usuário, contas + row_version, granularidade, intervalo): qualquer escrita
+no ledger incrementa row_version da conta, então a invalidação é exata.
+"""
+import os
+from calendar import monthrange
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from typing import Dict, List, Optional, Sequence
+
+from fastapi import HTTPException, status
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from models import Account, LedgerEntry
+from core.amount_parser import serialize_money
+from core.result_cache import LRUResultCache
+from repositories.accounts_repository import AccountsRepository
+from services.balance_snapshot_service import balances_at
+
+GRANULARITIES = ("day", "week", "month")
+
+# Limite de pontos por série (evita respostas gigantes, ex.: 10 anos diários)
+MAX_HISTORY_POINTS = 800
+
+BALANCE_HISTORY_CACHE_SIZE = int(os.getenv("BALANCE_HISTORY_CACHE_SIZE", "2048"))
+_history_cache = LRUResultCache(max_entries=BALANCE_HISTORY_CACHE_SIZE)
+
+
+def _day_bucket(db: Session, column):
+    """Expressão SQL 'YYYY-MM-DD' do dia de uma coluna de data (PostgreSQL: to_char; SQLite: strftime)."""
+    if db.get_bind().dialect.name == "postgresql":
+        return func.to_char(column, "YYYY-MM-DD")
+    return func.strftime("%Y-%m-%d", column)
+
+
+def _period_ends(start: date, end: date, granularity: str) -> List[date]:
+    """
+    Datas dos pontos da série: fim de cada dia/semana (domingo)/mês no intervalo;
+    o último ponto é sempre end (período corrente parcial).
+    """
+    points: List[date] = []
+    if granularity == "day":
+        d = start
+        while d <= end:
+            points.append(d)
+            d += timedelta(days=1)
+    elif granularity == "week":
+        d = start + timedelta(days=6 - start.weekday())
+        while d < end:
+            points.append(d)
+            d += timedelta(days=7)
+        points.append(end)
+    else:
+        y, m = start.year, start.month
+        while True:
+            d = date(y, m, monthrange(y, m)[1])
+            if d >= end:
+                break
+            points.append(d)
+            y, m = (y + 1, 1) if m == 12 else (y, m + 1)
+        points.append(end)
+    return points
+
+
+def _validate_range(start: date, end: date, granularity: str) -> List[date]:
+    """Valida parâmetros e retorna os pontos; HTTP 400 se inválidos."""
+    if granularity not in GRANULARITIES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"granularity deve ser um de {', '.join(GRANULARITIES)}",
+        )
+    if start > end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start_date deve ser anterior ou igual a end_date",
+        )
+    if granularity == "day" and (end - start).days + 1 > MAX_HISTORY_POINTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Intervalo excede o máximo de {MAX_HISTORY_POINTS} pontos para a granularidade informada",
+        )
+    points = _period_ends(start, end, granularity)
+    if len(points) > MAX_HISTORY_POINTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Intervalo excede o máximo de {MAX_HISTORY_POINTS} pontos para a granularidade informada",
+        )
+    return points
+
+
+def _balance_series(
+    db: Session,
+    account_ids: Sequence[str],
+    start: date,
+    end: date,
+    points: List[date],
+) -> List[dict]:
+    """
+    Série de saldo somada para as contas: abertura (balances_at no instante anterior a start)
+    + deltas diários do ledger no intervalo (um GROUP BY dia), acumulados até cada ponto.
+    """
+    opening_ts = datetime.combine(start, time.min) - timedelta(microseconds=1)
+    closing_ts = datetime.combine(end, time.max)
+    running = sum(balances_at(account_ids, opening_ts, db).values(), Decimal("0"))
+    daily: List[tuple] = []
+    if account_ids:
+        day = _day_bucket(db, LedgerEntry.created_at)
+        daily = (
+            db.query(day, func.sum(LedgerEntry.amount))
+            .filter(
+                LedgerEntry.account_id.in_(list(account_ids)),
+                LedgerEntry.created_at > opening_ts,
+                LedgerEntry.created_at <= closing_ts,
+            )
+            .group_by(day)
+            .order_by(day)
+            .all()
+        )
+    series = []
+    i = 0
+    for point in points:
+        point_key = point.isoformat()
+        while i < len(daily) and daily[i][0] <= point_key:
+            running += Decimal(str(daily[i][1] or 0))
+            i += 1
+        series.append({
+            "date": point_key,
+            "balance": float(running),
+            "balance_str": serialize_money(running),
+        })
+    return series
+
+
+def _cached_series(
+    cache_key: tuple,
+    accounts: Sequence[Account],
+    db: Session,
+    start: date,
+    end: date,
+    points: List[date],
+) -> List[dict]:
+    """Série do cache (LRU em processo) ou calculada e gravada."""
+    cached = _history_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    series = _balance_series(db, [a.id for a in accounts], start, end, points)
+    _history_cache.set(cache_key, series)
+    return series
+
+
+def _accounts_version(accounts: Sequence[Account]) -> tuple:
+    """(id, row_version) ordenado: muda a cada escrita no saldo de qualquer conta."""
+    return tuple(sorted((a.id, a.row_version or 0) for a in accounts))
+
+
+def get_account_balance_history(
+    db: Session,
+    user_id: str,
+    account_id: str,
+    start: date,
+    end: date,
+    granularity: str = "month",
+) -> Dict:
+    """Série de saldo de uma conta do usuário. 404 se a conta não pertencer ao usuário."""
+    points = _validate_range(start, end, granularity)
+    account = AccountsRepository(db).get_by_user_and_id(user_id, account_id)
+    if not account:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Conta não encontrada",
+        )
+    key = ("account", user_id, _accounts_version([account]), granularity, start, end)
+    series = _cached_series(key, [account], db, start, end, points)
+    return {
+        "account_id": account.id,
+        "granularity": granularity,
+        "start_date": start,
+        "end_date": end,
+        "points": series,
+    }
+
+
+def get_wealth_history(
+    db: Session,
+    user_id: str,
+    start: date,
+    end: date,
+    granularity: str = "month",
+) -> Dict:
+    """Série do patrimônio (soma das contas ativas do usuário)."""
+    points = _validate_range(start, end, granularity)
+    accounts = AccountsRepository(db).list_by_user_active(user_id)
+    key = ("wealth", user_id, _accounts_version(accounts), granularity, start, end)
+    series = _cached_series(key, accounts, db, start, end, points)
+    return {
+        "granularity": granularity,
+        "start_date": start,
+        "end_date": end,
+        "points": series,
+    }
+
+
+def default_history_range(today: Optional[date] = None) -> tuple:
+    """Intervalo padrão: do 1º dia do mês, 12 meses atrás, até hoje."""
+    end = today or date.today()
+    return date(end.year - 1, end.month, 1), end
@@ -0,0 +1,279 @@
+"""
+Conciliação de saldos de todas as contas (substitui scripts/recalculate_all_balances.py).
+Por lote de contas (faixa de ids), um único SELECT agregado compara:
+  - accounts.balance (armazenado),
+  - SUM(ledger_entries.amount) (fonte da verdade),
+  - saldo derivado das transações não deletadas (income − expense ± pernas de transferência,
+    direção pelo ledger/pareamento: core.ledger_utils.transfer_leg_sign) mais as entradas de
+    abertura do ledger (sem transação: saldo inicial da conta).
+Correção opcional: UPDATE em lote de accounts.balance para o saldo do ledger, condicionado ao
+row_version lido (conta alterada durante a conciliação não é sobrescrita).
+Lotes são independentes: podem rodar em paralelo (pool de processos, sessão própria por lote).
+"""
+import csv
+import json
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, bindparam, case, func, update
+from sqlalchemy.orm import Session, aliased
+
+from models import Account, LedgerEntry, Transaction
+from core.amount_parser import serialize_money
+from core.ledger_utils import transfer_leg_sign
+from core.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Contas por lote (uma query agregada + um UPDATE em lote por lote)
+RECONCILE_BATCH_SIZE = 2000
+
+# Diferença mínima considerada divergência (centavos)
+BALANCE_EPSILON = Decimal("0.01")
+
+REPORT_FIELDS = [
+    "account_id",
+    "user_id",
+    "stored_balance",
+    "ledger_balance",
+    "transactions_balance",
+    "stored_diff",
+    "transactions_diff",
+    "fixed",
+]
+
+
+def account_id_ranges(db: Session, batch_size: int = RECONCILE_BATCH_SIZE) -> List[Tuple[str, str]]:
+    """Faixas [primeiro_id, último_id] de até batch_size contas, em ordem de id."""
+    ids = [row[0] for row in db.query(Account.id).order_by(Account.id).all()]
+    return [
+        (ids[i], ids[min(i + batch_size, len(ids)) - 1])
+        for i in range(0, len(ids), batch_size)
+    ]
+
+
+def _transactions_amount_expr(partner):
+    """
+    Valor signed de cada transação para a conta (income +, expense −, transfer conforme a perna).
+    Transferência sem ledger em nenhuma das pernas e sem ordem no par: direção desconhecida, fica
+    fora (0) — rode scripts/backfill_ledger.py.
+    """
+    return case(
+        (Transaction.type == "income", Transaction.amount),
+        (Transaction.type == "expense", -Transaction.amount),
+        (
+            Transaction.type == "transfer",
+            Transaction.amount * func.coalesce(transfer_leg_sign(Transaction, partner), 0),
+        ),
+        else_=0,
+    )
+
+
+def reconcile_range(
+    db: Session,
+    first_id: str,
+    last_id: str,
+    *,
+    fix: bool = False,
+    epsilon: Decimal = BALANCE_EPSILON,
+) -> Dict:
+    """
+    Concilia as contas com first_id <= id <= last_id (um SELECT agregado).
+    fix=True: corrige accounts.balance das divergentes para o saldo do ledger (UPDATE em lote,
+    WHERE row_version = lido) e faz commit. Retorna {"checked", "discrepancies": [...], "fixed"}.
+    """
+    in_range = and_(Account.id >= first_id, Account.id <= last_id)
+    ledger_totals = (
+        db.query(
+            LedgerEntry.account_id.label("account_id"),
+            func.sum(LedgerEntry.amount).label("total"),
+            # Entradas de abertura (sem transação) também compõem o saldo derivado das transações
+            func.sum(
+                case((LedgerEntry.transaction_id.is_(None), LedgerEntry.amount), else_=0)
+            ).label("opening"),
+        )
+        .filter(LedgerEntry.account_id >= first_id, LedgerEntry.account_id <= last_id)
+        .group_by(LedgerEntry.account_id)
+        .subquery()
+    )
+    partner = aliased(Transaction)
+    tx_totals = (
+        db.query(
+            Transaction.account_id.label("account_id"),
+            func.sum(_transactions_amount_expr(partner)).label("total"),
+        )
+        .outerjoin(partner, partner.id == Transaction.transfer_transaction_id)
+        .filter(
+            Transaction.account_id >= first_id,
+            Transaction.account_id <= last_id,
+            Transaction.deleted_at.is_(None),
+        )
+        .group_by(Transaction.account_id)
+        .subquery()
+    )
+    rows = (
+        db.query(
+            Account.id,
+            Account.user_id,
+            Account.balance,
+            Account.row_version,
+            func.coalesce(ledger_totals.c.total, 0),
+            func.coalesce(tx_totals.c.total, 0) + func.coalesce(ledger_totals.c.opening, 0),
+        )
+        .outerjoin(ledger_totals, ledger_totals.c.account_id == Account.id)
+        .outerjoin(tx_totals, tx_totals.c.account_id == Account.id)
+        .filter(in_range)
+        .order_by(Account.id)
+        .all()
+    )
+
+    discrepancies: List[dict] = []
+    to_fix: List[dict] = []
+    for account_id, user_id, stored, row_version, ledger_total, tx_total in rows:
+        stored = Decimal(str(stored or 0))
+        ledger_total = Decimal(str(ledger_total or 0))
+        tx_total = Decimal(str(tx_total or 0))
+        stored_diff = stored - ledger_total
+        tx_diff = tx_total - ledger_total
+        if abs(stored_diff) < epsilon and abs(tx_diff) < epsilon:
+            continue
+        item = {
+            "account_id": account_id,
+            "user_id": user_id,
+            "stored_balance": stored,
+            "ledger_balance": ledger_total,
+            "transactions_balance": tx_total,
+            "stored_diff": stored_diff,
+            "transactions_diff": tx_diff,
+            "fixed": False,
+        }
+        discrepancies.append(item)
+        if fix and abs(stored_diff) >= epsilon:
+            to_fix.append({
+                "b_id": account_id,
+                "b_row_version": row_version or 0,
+                "b_balance": ledger_total,
+                "_item": item,
+            })
+
+    fixed = 0
+    if to_fix:
+        fixed = _bulk_fix_balances(db, to_fix)
+        db.commit()
+    return {"checked": len(rows), "discrepancies": discrepancies, "fixed": fixed}
+
+
+def _bulk_fix_balances(db: Session, to_fix: List[dict]) -> int:
+    """
+    UPDATE accounts SET balance = ledger, row_version + 1 WHERE id = ? AND row_version = ?
+    em um único executemany. Contas alteradas desde a leitura não são tocadas; o resultado é
+    conferido com um SELECT (rowcount de executemany não é confiável em todos os drivers).
+    """
+    table = Account.__table__
+    stmt = (
+        update(table)
+        .where(and_(table.c.id == bindparam("b_id"), table.c.row_version == bindparam("b_row_version")))
+        .values(
+            balance=bindparam("b_balance"),
+            row_version=table.c.row_version + 1,
+            updated_at=datetime.now(),
+        )
+    )
+    db.execute(stmt, [{k: v for k, v in p.items() if k != "_item"} for p in to_fix])
+
+    expected = {p["b_id"]: (p["b_row_version"] + 1, p["_item"]) for p in to_fix}
+    fixed = 0
+    for account_id, row_version in (
+        db.query(Account.id, Account.row_version).filter(Account.id.in_(list(expected))).all()
+    ):
+        version, item = expected[account_id]
+        if row_version == version:
+            item["fixed"] = True
+            fixed += 1
+    return fixed
+
+
+def _reconcile_range_worker(args: Tuple[str, str, bool, str]) -> Dict:
+    """Executado no pool: sessão própria por lote."""
+    from database import SessionLocal
+
+    first_id, last_id, fix, epsilon = args
+    db = SessionLocal()
+    try:
+        return reconcile_range(db, first_id, last_id, fix=fix, epsilon=Decimal(epsilon))
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def _init_worker() -> None:
+    """Processo filho não reaproveita conexões herdadas do pai (fork)."""
+    from database import engine
+
+    engine.dispose()
+
+
+def reconcile_all_balances(
+    db: Session,
+    *,
+    fix: bool = False,
+    batch_size: int = RECONCILE_BATCH_SIZE,
+    workers: int = 1,
+    epsilon: Decimal = BALANCE_EPSILON,
+) -> Dict:
+    """
+    Concilia todas as contas em lotes por faixa de id.
+    workers > 1: lotes distribuídos em ProcessPoolExecutor (cada processo abre a própria sessão
+    via database.SessionLocal); workers == 1: lotes sequenciais na sessão db.
+    Retorna {"checked", "discrepancies", "fixed", "batches"}.
+    """
+    ranges = account_id_ranges(db, batch_size)
+    totals = {"checked": 0, "discrepancies": [], "fixed": 0, "batches": len(ranges)}
+
+    def _merge(result: Dict) -> None:
+        totals["checked"] += result["checked"]
+        totals["discrepancies"].extend(result["discrepancies"])
+        totals["fixed"] += result["fixed"]
+
+    if workers <= 1 or len(ranges) <= 1:
+        for first_id, last_id in ranges:
+            _merge(reconcile_range(db, first_id, last_id, fix=fix, epsilon=epsilon))
+            logger.info(
+                "Lote de conciliação processado",
+                extra={"last_account_id": last_id, "checked": totals["checked"]},
+            )
+    else:
+        args = [(first_id, last_id, fix, str(epsilon)) for first_id, last_id in ranges]
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            for result in pool.map(_reconcile_range_worker, args):
+                _merge(result)
+    return totals
+
+
+def _report_rows(discrepancies: Sequence[dict]) -> Iterator[dict]:
+    for item in discrepancies:
+        yield {
+            key: serialize_money(value) if isinstance(value, Decimal) else value
+            for key, value in item.items()
+        }
+
+
+def write_report(discrepancies: Sequence[dict], path: str, fmt: Optional[str] = None) -> str:
+    """
+    Grava o relatório de divergências em CSV ou JSON (fmt ou extensão do arquivo).
+    Valores monetários como string com 2 casas. Retorna o formato usado.
+    """
+    fmt = (fmt or ("json" if path.lower().endswith(".json") else "csv")).lower()
+    rows = list(_report_rows(discrepancies))
+    with open(path, "w", encoding="utf-8", newline="") as fh:
+        if fmt == "json":
+            json.dump(rows, fh, ensure_ascii=False, indent=2)
+        else:
+            writer = csv.DictWriter(fh, fieldnames=REPORT_FIELDS)
+            writer.writeheader()
+            writer.writerows(rows)
+    return fmt
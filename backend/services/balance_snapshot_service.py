@@ -2,19 +2,27 @@
 Serviço de snapshots mensais de saldo (Trilha 5.1).
 Ledger é a fonte da verdade; snapshots são cache derivado para performance.
 Saldo no snapshot = soma do ledger até o último instante do mês (snapshot_date).
+Snapshots são checkpoints: saldo em T = snapshot mais recente fechado até T + SUM(ledger entre o
+fim do mês do snapshot e T) — ver balances_at. Nenhum consumidor precisa somar o histórico inteiro.
 """
+import uuid
 from datetime import datetime, date
-from typing import Optional
+from decimal import Decimal
+from typing import Dict, List, Optional, Sequence
 from calendar import monthrange
 
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy import func, and_, or_, select, literal, union_all
 
 from models import LedgerEntry, Account, AccountBalanceSnapshot
+from core.database_utils import bulk_upsert
 from core.logging_config import get_logger
 
 logger = get_logger(__name__)
 
+# Contas por lote no job de snapshots (um SELECT agregado + um upsert por lote)
+SNAPSHOT_BATCH_SIZE = 500
+
 
 def get_balance_from_ledger_until(
     account_id: str,
@@ -47,16 +55,29 @@ def _first_day_of_month_dt(year: int, month: int) -> datetime:
     return datetime(year, month, 1, 0, 0, 0, 0)
 
 
+def _previous_month(year: int, month: int) -> tuple:
+    """(ano, mês) do mês anterior."""
+    return (year - 1, 12) if month == 1 else (year, month - 1)
+
+
 def compute_monthly_snapshots(
     db: Session,
     account_id: Optional[str] = None,
     year: Optional[int] = None,
     month: Optional[int] = None,
+    *,
+    batch_size: int = SNAPSHOT_BATCH_SIZE,
+    after_account_id: Optional[str] = None,
+    commit_per_batch: bool = False,
 ) -> int:
     """
-    Calcula e persiste snapshots mensais de saldo. Idempotente: se já existir
-    (account_id, snapshot_date), faz upsert do balance (recalcula do ledger).
+    Calcula e persiste snapshots mensais de saldo. Idempotente: upsert por (account_id, snapshot_date).
     account_id=None: todas as contas. year/month=None: mês anterior ao atual.
+    Set-based por lote de contas (ordem de id): um SELECT agregado (GROUP BY conta) com saldo =
+    snapshot do mês anterior (checkpoint) + SUM(ledger do mês), ou SUM desde o início sem checkpoint;
+    depois um INSERT ... ON CONFLICT DO UPDATE para o lote.
+    commit_per_batch=True: commit a cada lote (transações curtas); o último account_id concluído é
+    logado e pode ser passado em after_account_id para retomar.
     Retorna quantidade de snapshots criados ou atualizados.
     """
     now = datetime.utcnow()
@@ -68,46 +89,137 @@ def compute_monthly_snapshots(
 
     until_dt = _last_moment_of_month(target_year, target_month)
     snapshot_date = _first_day_of_month_dt(target_year, target_month)
-
-    if account_id:
-        accounts = db.query(Account).filter(Account.id == account_id).all()
-    else:
-        accounts = db.query(Account).all()
+    prev_year, prev_month = _previous_month(target_year, target_month)
+    prev_date = _first_day_of_month_dt(prev_year, prev_month)
+    prev_end = _last_moment_of_month(prev_year, prev_month)
 
     count = 0
-    for account in accounts:
-        balance = get_balance_from_ledger_until(account.id, until_dt, db)
-        existing = (
-            db.query(AccountBalanceSnapshot)
-            .filter(
-                AccountBalanceSnapshot.account_id == account.id,
-                AccountBalanceSnapshot.snapshot_date == snapshot_date,
-            )
-            .first()
-        )
-        if existing:
-            existing.balance = balance
-            db.add(existing)
-            count += 1
-            logger.debug(
-                "Snapshot atualizado",
-                extra={"account_id": account.id, "snapshot_date": snapshot_date.isoformat(), "balance": balance},
-            )
-        else:
-            snap = AccountBalanceSnapshot(
-                account_id=account.id,
-                snapshot_date=snapshot_date,
-                balance=balance,
+    cursor = after_account_id
+    while True:
+        ids_query = db.query(Account.id)
+        if account_id:
+            ids_query = ids_query.filter(Account.id == account_id)
+        if cursor is not None:
+            ids_query = ids_query.filter(Account.id > cursor)
+        chunk_ids = [row[0] for row in ids_query.order_by(Account.id).limit(batch_size).all()]
+        if not chunk_ids:
+            break
+
+        prev = aliased(AccountBalanceSnapshot)
+        aggregates = (
+            db.query(
+                Account.id,
+                prev.balance,
+                func.coalesce(func.sum(LedgerEntry.amount), 0),
             )
-            db.add(snap)
-            count += 1
-            logger.debug(
-                "Snapshot criado",
-                extra={"account_id": account.id, "snapshot_date": snapshot_date.isoformat(), "balance": balance},
+            .outerjoin(prev, and_(prev.account_id == Account.id, prev.snapshot_date == prev_date))
+            .outerjoin(
+                LedgerEntry,
+                and_(
+                    LedgerEntry.account_id == Account.id,
+                    LedgerEntry.created_at <= until_dt,
+                    or_(prev.id.is_(None), LedgerEntry.created_at > prev_end),
+                ),
             )
+            .filter(Account.id.in_(chunk_ids))
+            .group_by(Account.id, prev.balance)
+            .all()
+        )
+        rows = [
+            {
+                "id": str(uuid.uuid4()),
+                "account_id": acc_id,
+                "snapshot_date": snapshot_date,
+                "balance": Decimal(str(prev_balance or 0)) + Decimal(str(delta)),
+            }
+            for acc_id, prev_balance, delta in aggregates
+        ]
+        count += bulk_upsert(
+            db,
+            AccountBalanceSnapshot.__table__,
+            rows,
+            index_elements=["account_id", "snapshot_date"],
+            update_columns=["balance"],
+        )
+        cursor = chunk_ids[-1]
+        if commit_per_batch:
+            db.commit()
+        logger.debug(
+            "Lote de snapshots gravado",
+            extra={"snapshot_date": snapshot_date.isoformat(), "accounts": len(rows), "cursor": cursor},
+        )
+        if len(chunk_ids) < batch_size:
+            break
     return count
 
 
+def _closed_checkpoint_filter(ts: datetime):
+    """Snapshots cujo mês já fechou em ts (fim do mês <= ts)."""
+    month_start = _first_day_of_month_dt(ts.year, ts.month)
+    naive_ts = ts.replace(tzinfo=None) if ts.tzinfo else ts
+    if naive_ts >= _last_moment_of_month(ts.year, ts.month):
+        return AccountBalanceSnapshot.snapshot_date <= month_start
+    return AccountBalanceSnapshot.snapshot_date < month_start
+
+
+def balance_at(account_id: str, ts: datetime, db: Session) -> float:
+    """Saldo histórico de uma conta no instante ts: balances_at com uma conta."""
+    return float(balances_at([account_id], ts, db)[account_id])
+
+
+def balances_at(account_ids: Sequence[str], ts: datetime, db: Session) -> Dict[str, Decimal]:
+    """
+    Saldo histórico das contas no instante ts (entradas com created_at <= ts), duas queries no total:
+    checkpoint mais recente fechado até ts de cada conta (GROUP BY conta) e SUM do ledger desde
+    o fim do mês do respectivo checkpoint (ou desde o início, sem checkpoint), também GROUP BY conta.
+    Limites constantes em created_at restringem as partições lidas (ledger_entries particionada).
+    Retorna {account_id: saldo}; contas sem movimento ficam com 0.
+    """
+    ids = sorted(set(account_ids))
+    if not ids:
+        return {}
+    date_filter = _closed_checkpoint_filter(ts)
+    latest = (
+        db.query(
+            AccountBalanceSnapshot.account_id.label("account_id"),
+            func.max(AccountBalanceSnapshot.snapshot_date).label("snapshot_date"),
+        )
+        .filter(AccountBalanceSnapshot.account_id.in_(ids), date_filter)
+        .group_by(AccountBalanceSnapshot.account_id)
+        .subquery()
+    )
+    checkpoints = db.query(
+        AccountBalanceSnapshot.account_id,
+        AccountBalanceSnapshot.snapshot_date,
+        AccountBalanceSnapshot.balance,
+    ).join(
+        latest,
+        and_(
+            latest.c.account_id == AccountBalanceSnapshot.account_id,
+            latest.c.snapshot_date == AccountBalanceSnapshot.snapshot_date,
+        ),
+    ).all()
+
+    balances = {aid: Decimal("0") for aid in ids}
+    ranges = []
+    for account_id, snapshot_date, balance in checkpoints:
+        balances[account_id] = Decimal(str(balance))
+        checkpoint_end = _last_moment_of_month(snapshot_date.year, snapshot_date.month)
+        ranges.append(and_(LedgerEntry.account_id == account_id, LedgerEntry.created_at > checkpoint_end))
+    with_checkpoint = {c[0] for c in checkpoints}
+    without_checkpoint = [aid for aid in ids if aid not in with_checkpoint]
+    if without_checkpoint:
+        ranges.append(LedgerEntry.account_id.in_(without_checkpoint))
+    for account_id, delta in (
+        db.query(LedgerEntry.account_id, func.sum(LedgerEntry.amount))
+        .filter(LedgerEntry.created_at <= ts, or_(*ranges))
+        .group_by(LedgerEntry.account_id)
+        .all()
+    ):
+        balances[account_id] += Decimal(str(delta or 0))
+    return balances
+
+
 def get_snapshot_balance(account_id: str, snapshot_date: date, db: Session) -> Optional[float]:
     """
     Retorna o saldo do snapshot para (account_id, primeiro dia do mês de snapshot_date).
@@ -129,6 +241,78 @@ def get_snapshot_balance(account_id: str, snapshot_date: date, db: Session) -> O
 RECONCILE_EPSILON = 0.01
 
 
+def _month_bucket(db: Session, column):
+    """Expressão SQL 'YYYY-MM' do mês de uma coluna de data (PostgreSQL: to_char; SQLite: strftime)."""
+    if db.get_bind().dialect.name == "postgresql":
+        return func.to_char(column, "YYYY-MM")
+    return func.strftime("%Y-%m", column)
+
+
+def find_snapshot_divergences(
+    db: Session,
+    epsilon: float = RECONCILE_EPSILON,
+) -> List[dict]:
+    """
+    Snapshots cujo saldo diverge do ledger (|snapshot - ledger| > epsilon), em uma única query:
+    totais mensais do ledger por conta (GROUP BY conta, mês) + meses de snapshot com total 0
+    (garante linha para meses sem movimento) → saldo acumulado com
+    SUM(total) OVER (PARTITION BY account_id ORDER BY mês) → join com snapshots, filtro no SQL.
+    Custo dominado por uma varredura do ledger, independente do número de snapshots.
+    Retorna [{account_id, snapshot_date, snapshot_balance, ledger_balance}].
+    """
+    S = AccountBalanceSnapshot
+    ledger_month = _month_bucket(db, LedgerEntry.created_at)
+    snapshot_month = _month_bucket(db, S.snapshot_date)
+    ledger_monthly = (
+        select(
+            LedgerEntry.account_id.label("account_id"),
+            ledger_month.label("month"),
+            func.sum(LedgerEntry.amount).label("total"),
+        )
+        .group_by(LedgerEntry.account_id, ledger_month)
+    )
+    snapshot_months = select(
+        S.account_id.label("account_id"),
+        snapshot_month.label("month"),
+        literal(0).label("total"),
+    )
+    monthly = union_all(ledger_monthly, snapshot_months).subquery("monthly")
+    grouped = (
+        select(
+            monthly.c.account_id,
+            monthly.c.month,
+            func.sum(monthly.c.total).label("total"),
+        )
+        .group_by(monthly.c.account_id, monthly.c.month)
+        .subquery("grouped")
+    )
+    cumulative = select(
+        grouped.c.account_id,
+        grouped.c.month,
+        func.sum(grouped.c.total)
+        .over(partition_by=grouped.c.account_id, order_by=grouped.c.month)
+        .label("ledger_balance"),
+    ).subquery("cumulative")
+    stmt = (
+        select(S.account_id, S.snapshot_date, S.balance, cumulative.c.ledger_balance)
+        .join(
+            cumulative,
+            and_(cumulative.c.account_id == S.account_id, cumulative.c.month == snapshot_month),
+        )
+        .where(func.abs(S.balance - cumulative.c.ledger_balance) > epsilon)
+        .order_by(S.account_id, S.snapshot_date)
+    )
+    return [
+        {
+            "account_id": row.account_id,
+            "snapshot_date": row.snapshot_date,
+            "snapshot_balance": float(row.balance),
+            "ledger_balance": float(row.ledger_balance),
+        }
+        for row in db.execute(stmt)
+    ]
+
+
 def reconcile_snapshots(
     db: Session,
     epsilon: float = RECONCILE_EPSILON,
@@ -137,27 +321,20 @@ def reconcile_snapshots(
     Conciliação automática (Trilha 5.2): recalcula saldo via ledger para cada snapshot,
     compara com snapshot.balance. Divergência > epsilon → log ERROR (sem dados financeiros
     em mensagem; Sentry pode receber evento genérico). Retorna { "checked": N, "divergences": M }.
+    Comparação feita no banco (find_snapshot_divergences); só as divergências voltam para o Python.
     """
-    snapshots = db.query(AccountBalanceSnapshot).all()
-    checked = 0
-    divergences = 0
-    for snap in snapshots:
-        # snapshot_date é YYYY-MM-01; saldo do ledger até o fim daquele mês
-        y, m = snap.snapshot_date.year, snap.snapshot_date.month
-        until_dt = _last_moment_of_month(y, m)
-        ledger_balance = get_balance_from_ledger_until(snap.account_id, until_dt, db)
-        diff = abs(float(snap.balance) - ledger_balance)
-        checked += 1
-        if diff > epsilon:
-            divergences += 1
-            logger.error(
-                "Divergência de snapshot na conciliação",
-                extra={
-                    "account_id": snap.account_id,
-                    "snapshot_date": snap.snapshot_date.isoformat()[:7],
-                    "diff_abs": round(diff, 4),
-                },
-            )
-    return {"checked": checked, "divergences": divergences}
-
-
+    checked = db.query(func.count(AccountBalanceSnapshot.id)).scalar() or 0
+    divergent = find_snapshot_divergences(db, epsilon=epsilon)
+    for row in divergent:
+        snapshot_date = row["snapshot_date"]
+        logger.error(
+            "Divergência de snapshot na conciliação",
+            extra={
+                "account_id": row["account_id"],
+                "snapshot_date": (
+                    snapshot_date.isoformat() if hasattr(snapshot_date, "isoformat") else str(snapshot_date)
+                )[:7],
+                "diff_abs": round(abs(row["snapshot_balance"] - row["ledger_balance"]), 4),
+            },
+        )
+    return {"checked": checked, "divergences": len(divergent)}
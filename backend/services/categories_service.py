@@ -10,6 +10,7 @@ from sqlalchemy.orm import Session
 
 from models import Category
 from repositories.categories_repository import CategoriesRepository
+from repositories.report_cache_repository import bump_data_version
 
 
 def get_categories(db: Session, user_id: str, type_filter: Optional[str] = None) -> List[Category]:
@@ -42,6 +43,8 @@ def update_category(
     for field, value in update_data.items():
         setattr(db_category, field, value)
     repo.update(db_category)
+    # Nome/tipo da categoria aparecem nos relatórios: invalida o cache do usuário
+    bump_data_version(db, [user_id])
     db.commit()
     db.refresh(db_category)
     return db_category
@@ -57,4 +60,5 @@ def delete_category(db: Session, user_id: str, category_id: str) -> None:
             detail="Categoria não encontrada",
         )
     repo.delete(db_category)
+    bump_data_version(db, [user_id])
     db.commit()
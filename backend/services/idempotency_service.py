@@ -20,6 +20,7 @@ from models import IdempotencyKey
 IDEMPOTENCY_HEADER = "Idempotency-Key"
 IDEMPOTENCY_TTL_HOURS = 24
 ENDPOINT_TRANSACTIONS_CREATE = "POST /api/transactions"
+ENDPOINT_TRANSACTIONS_BATCH = "POST /api/transactions/batch"
 ENDPOINT_GOALS_CREATE = "POST /api/goals"
 
 
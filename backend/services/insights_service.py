@@ -12,7 +12,7 @@ from domain.insight_policies import (
     compute_category_monthly_variation as policy_category_variation,
     compute_goals_at_risk as policy_goals_at_risk,
 )
-from domain.insight_policies.common import month_bounds as _month_bounds
+from domain.insight_policies.common import month_bounds as _month_bounds, month_range
 from domain.insight_policies.goals_at_risk_v1 import _goal_current_monthly_rate
 
 # Versão do payload em InsightCache.data (compatível com caches antigos sem version)
@@ -50,16 +50,14 @@ def get_transactions_max_updated_at(user_id: str, db: Session) -> Optional[datet
     Retorna o maior updated_at (ou created_at) entre transações de despesa do usuário
     nos meses atual e anterior. Usado para cache incremental.
     """
-    curr_first, curr_last = _month_bounds(0)
-    prev_first, prev_last = _month_bounds(1)
+    period = month_range(1).through(month_range(0))
     row = (
         db.query(func.max(func.coalesce(Transaction.updated_at, Transaction.created_at)))
         .filter(
             Transaction.user_id == user_id,
             Transaction.type == "expense",
             Transaction.deleted_at.is_(None),
-            Transaction.date >= prev_first,
-            Transaction.date <= curr_last,
+            period.filter(Transaction.date),
         )
         .scalar()
     )
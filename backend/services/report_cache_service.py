@@ -0,0 +1,96 @@
+"""
+Cache de resultados de relatórios (summary, cashflow, categories/summary).
+
+Chave: (user_id, relatório, parâmetros, versão dos dados do usuário). A versão
+(user_data_versions) é incrementada na transação de cada escrita de transações ou categorias,
+então uma entrada nunca fica desatualizada: depois de uma escrita a chave muda e o próximo
+pedido recalcula. Sem TTL. Parâmetros incluem a data de hoje quando o período é relativo.
+
+Camadas: LRU em processo (REPORT_CACHE_SIZE entradas) e, com REPORT_CACHE_BACKEND=db, a tabela
+report_cache_entries compartilhada entre workers/instâncias. Resultados são guardados já
+convertidos para JSON (jsonable_encoder), iguais nas duas camadas. Falha no backend em banco
+só é logada: o relatório é servido mesmo assim.
+"""
+import json
+import os
+from typing import Any, Callable, Dict, Optional
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.orm import Session
+
+from core.logging_config import get_logger
+from core.prometheus_metrics import report_cache_hits_total, report_cache_misses_total
+from core.result_cache import LRUResultCache
+from repositories.report_cache_repository import ReportCacheRepository, get_data_version
+
+logger = get_logger(__name__)
+
+REPORT_CACHE_SIZE = int(os.getenv("REPORT_CACHE_SIZE", "2048"))
+REPORT_CACHE_BACKEND = os.getenv("REPORT_CACHE_BACKEND", "memory").strip().lower()  # memory | db
+
+
+class ReportCache:
+    """LRU em processo + backend em banco opcional; get_or_compute por relatório."""
+
+    def __init__(self, max_entries: Optional[int] = None, backend: Optional[str] = None):
+        self._memory = LRUResultCache(max_entries=REPORT_CACHE_SIZE if max_entries is None else max_entries)
+        self.backend = backend or REPORT_CACHE_BACKEND
+
+    def get_or_compute(
+        self,
+        db: Session,
+        user_id: str,
+        report: str,
+        params: Dict[str, Any],
+        compute: Callable[[], Any],
+    ) -> Any:
+        """
+        Resultado cacheado para a versão atual dos dados do usuário; senão compute() (gravado
+        nas camadas). A versão é lida antes de calcular: o resultado é no mínimo tão novo quanto ela.
+        """
+        version = get_data_version(db, user_id)
+        cache_key = f"{report}:{json.dumps(params, sort_keys=True, default=str)}"
+        memory_key = (user_id, cache_key, version)
+
+        cached = self._memory.get(memory_key)
+        if cached is not None:
+            report_cache_hits_total.labels(report=report, backend="memory").inc()
+            return cached
+
+        if self.backend == "db":
+            cached = ReportCacheRepository(db).get(user_id, cache_key, version)
+            if cached is not None:
+                report_cache_hits_total.labels(report=report, backend="db").inc()
+                self._memory.set(memory_key, cached)
+                return cached
+
+        report_cache_misses_total.labels(report=report).inc()
+        result = jsonable_encoder(compute())
+        self._memory.set(memory_key, result)
+        if self.backend == "db":
+            self._store(db, user_id, cache_key, version, result)
+        return result
+
+    def clear(self) -> None:
+        """Esvazia a camada em memória (testes / manutenção)."""
+        self._memory.clear()
+
+    def _store(self, db: Session, user_id: str, cache_key: str, version: int, result: Any) -> None:
+        # Sessão própria: a requisição de relatório é somente leitura e não faz commit
+        session = Session(bind=db.get_bind(), autoflush=False)
+        try:
+            ReportCacheRepository(session).put(user_id, cache_key, version, result)
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            logger.warning(
+                "Falha ao gravar cache de relatório %s: %s",
+                cache_key,
+                e,
+                extra={"user_id": user_id},
+            )
+        finally:
+            session.close()
+
+
+report_cache = ReportCache()
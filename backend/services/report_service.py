@@ -8,8 +8,8 @@ from typing import List, Dict, Any
 
 from sqlalchemy.orm import Session
 
-from models import Transaction
 from repositories.report_repository import ReportRepository
+from services.balance_history_service import get_wealth_history
 
 
 # Nomes dos meses para formatação (igual ao router original)
@@ -32,18 +32,15 @@ def get_financial_summary(user_id: str, months: int, db: Session) -> Dict[str, A
     Retorno: dict com total_transactions, total_income, total_expenses, net_balance, period_start, period_end.
     """
     end_date, start_date = _period_dates(months)
-    transactions = db.query(Transaction).filter(
-        Transaction.user_id == user_id,
-        Transaction.date >= start_date,
-        Transaction.date <= end_date,
-    ).all()
-    total_income = sum(t.amount for t in transactions if t.type == "income")
-    total_expenses = sum(abs(t.amount) for t in transactions if t.type == "expense")
+    # Agregação no SQL (COUNT/SUM); período inclui o dia de hoje inteiro
+    totals = ReportRepository(db).get_period_totals(
+        user_id, start_date, end_date + timedelta(days=1)
+    )
     return {
-        "total_transactions": len(transactions),
-        "total_income": total_income,
-        "total_expenses": total_expenses,
-        "net_balance": total_income - total_expenses,
+        "total_transactions": totals.total_transactions,
+        "total_income": totals.total_income,
+        "total_expenses": totals.total_expenses,
+        "net_balance": totals.total_income - totals.total_expenses,
         "period_start": start_date,
         "period_end": end_date,
     }
@@ -63,10 +60,12 @@ def get_cashflow(user_id: str, months: int, db: Session) -> List[Dict[str, Any]]
         month_key = f"{int(item.year)}-{int(item.month):02d}"
         if month_key not in cashflow_dict:
             cashflow_dict[month_key] = {"income": 0, "expense": 0}
+        # Como no router original, tipos que não são income (expense, transfer) contam como saída;
+        # somados, não sobrescritos (a ordem das linhas não muda o resultado)
         if item.type == "income":
-            cashflow_dict[month_key]["income"] = float(item.total)
+            cashflow_dict[month_key]["income"] += float(item.total)
         else:
-            cashflow_dict[month_key]["expense"] = float(item.total)
+            cashflow_dict[month_key]["expense"] += float(item.total)
     cashflow_list = []
     for month_key in sorted(cashflow_dict.keys()):
         data = cashflow_dict[month_key]
@@ -92,7 +91,7 @@ def get_category_summary(
     end_date, start_date = _period_dates(months)
     repo = ReportRepository(db)
     category_data = repo.get_category_summary(user_id, type_filter, start_date)
-    total_amount = sum(item.total_amount for item in category_data)
+    total_amount = float(sum(item.total_amount for item in category_data))
     result = []
     for item in category_data:
         percentage = (
@@ -108,13 +107,28 @@ def get_category_summary(
     return result
 
 
+def get_wealth_evolution(user_id: str, months: int, db: Session) -> List[Dict[str, Any]]:
+    """
+    Evolução do patrimônio total (saldo no fim de cada mês, último ponto = hoje).
+    Calculada por balance_history_service: snapshots mensais + deltas do ledger.
+    """
+    end = date.today()
+    start_index = end.year * 12 + (end.month - 1) - (months - 1)
+    start = date(start_index // 12, start_index % 12 + 1, 1)
+    data = get_wealth_history(db, user_id, start, end, "month")
+    return [
+        {"date": point["date"], "total_balance": point["balance"]}
+        for point in data["points"]
+    ]
+
+
 def get_export_data(user_id: str, months: int, db: Session, user_name: str, user_email: str) -> Dict[str, Any]:
     """
     Dados para exportação. Estrutura idêntica ao router original (export_date, user, period, data).
     """
     end_date, start_date = _period_dates(months)
     repo = ReportRepository(db)
-    transactions = repo.get_transactions_for_export_with_tags(user_id, start_date)
+    transactions, tags_by_transaction = repo.get_transactions_for_export_with_tags(user_id, start_date)
     user_data = repo.get_all_user_data(user_id)
     goals = user_data["goals"]
     envelopes = user_data["envelopes"]
@@ -141,7 +155,7 @@ def get_export_data(user_id: str, months: int, db: Session, user_name: str, user
                     "description": t.description,
                     "account_id": t.account_id,
                     "category_id": t.category_id,
-                    "tags": t.tags,
+                    "tags": tags_by_transaction.get(t.id, []),
                 }
                 for t in transactions
             ],
@@ -4,6 +4,8 @@ calculando a diferença até o próximo múltiplo (R$ 1, R$ 5, R$ 10) e adiciona
 """
 import math
 from datetime import datetime
+from typing import Iterable
+from sqlalchemy import update
 from sqlalchemy.orm import Session
 
 from models import AutomationRule, Envelope
@@ -21,12 +23,29 @@ def apply_round_up_after_expense(
     amount_cents: int,
 ) -> None:
     """
-    Após criar uma despesa, aplica regras round_up ativas do usuário.
-    Para cada regra: round_up = ceil(amount_cents / round_to_cents) * round_to_cents - amount_cents.
-    Se round_up > 0, adiciona ao envelope da regra (balance em centavos).
-    Não levanta exceção; falhas são logadas.
+    Após criar uma despesa, aplica regras round_up ativas do usuário e commita.
+    Ver apply_round_up_after_expenses.
     """
-    if amount_cents <= 0:
+    apply_round_up_after_expenses(db, user_id, [amount_cents])
+    db.commit()
+
+
+def apply_round_up_after_expenses(
+    db: Session,
+    user_id: str,
+    amounts_cents: Iterable[int],
+) -> None:
+    """
+    Aplica regras round_up ativas do usuário a um conjunto de despesas (criação unitária ou lote).
+    Para cada regra e despesa: round_up = ceil(amount_cents / round_to_cents) * round_to_cents - amount_cents;
+    a soma vai para o envelope da regra (balance em centavos).
+    Incremento atômico no banco (UPDATE ... SET balance = balance + :round_up): roda no pool
+    pós-commit e round-ups concorrentes no mesmo envelope não perdem incremento.
+    Uma query de regras e um UPDATE por regra; savepoint por regra (falha em uma não desfaz as outras).
+    Não commita (o chamador commita) e não levanta exceção; falhas são logadas.
+    """
+    amounts = [a for a in amounts_cents if a > 0]
+    if not amounts:
         return
 
     rules = db.query(AutomationRule).filter(
@@ -35,6 +54,7 @@ def apply_round_up_after_expense(
         AutomationRule.type == "round_up",
     ).all()
 
+    planned = []
     for rule in rules:
         try:
             conditions = rule.conditions or {}
@@ -46,22 +66,32 @@ def apply_round_up_after_expense(
             round_to_cents = int(round_to_cents_raw)
             if round_to_cents not in ROUND_UP_OPTIONS_CENTS:
                 round_to_cents = 100
-            round_up = math.ceil(amount_cents / round_to_cents) * round_to_cents - amount_cents
-            if round_up <= 0:
-                continue
+            round_up = sum(math.ceil(a / round_to_cents) * round_to_cents - a for a in amounts)
+            if round_up > 0:
+                planned.append((rule, envelope_id, round_up))
+        except Exception as e:
+            logger.error(
+                "Erro ao avaliar regra round_up %s: %s",
+                rule.id,
+                e,
+                exc_info=True,
+                extra={"rule_id": rule.id},
+            )
+    if not planned:
+        return
 
-            envelope = db.query(Envelope).filter(
-                Envelope.id == envelope_id,
-                Envelope.user_id == user_id,
-            ).first()
-            if not envelope:
+    envelopes = Envelope.__table__
+    for rule, envelope_id, round_up in planned:
+        try:
+            with db.begin_nested():
+                result = db.execute(
+                    update(envelopes)
+                    .where(envelopes.c.id == envelope_id, envelopes.c.user_id == user_id)
+                    .values(balance=envelopes.c.balance + round_up, updated_at=datetime.now())
+                )
+            if result.rowcount == 0:
                 logger.warning("Envelope não encontrado para round_up: %s", envelope_id, extra={"rule_id": rule.id})
                 continue
-
-            envelope.balance = int(envelope.balance) + round_up
-            envelope.updated_at = datetime.now()
-            db.add(envelope)
-            db.commit()
             logger.info(
                 "Round up aplicado: +%s centavos no envelope %s (regra %s)",
                 round_up,
@@ -77,4 +107,3 @@ def apply_round_up_after_expense(
                 exc_info=True,
                 extra={"rule_id": rule.id},
             )
-            db.rollback()
@@ -0,0 +1,383 @@
+"""
+Importação de extratos (CSV/OFX) em lote.
+Arquivo lido em streaming (linha a linha / bloco <STMTTRN> a bloco); linhas agrupadas em lotes.
+Por lote: categorias resolvidas em uma query (IN por nome), duplicatas OFX (FITID) em uma query,
+e gravação via TransactionService.create_transactions_bulk (lock da conta uma vez, INSERT
+multi-linha de transações e ledger, um delta de saldo). Resultado por linha do arquivo.
+"""
+import csv
+import hashlib
+import os
+import re
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO
+
+from fastapi import HTTPException, status
+from sqlalchemy import func
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from models import Account, Category, Transaction
+from core.amount_parser import parse_brazilian_amount
+from core.database_utils import run_with_conflict_retry
+from core.logging_config import get_logger
+from services.transaction_service import TransactionService
+
+logger = get_logger(__name__)
+
+IMPORT_BATCH_SIZE = int(os.getenv("TRANSACTION_IMPORT_BATCH_SIZE", "500"))
+IMPORT_MAX_ROWS = int(os.getenv("TRANSACTION_IMPORT_MAX_ROWS", "20000"))
+
+IMPORT_FORMATS = ("csv", "ofx")
+
+# Cabeçalhos aceitos no CSV (pt-BR e inglês) -> campo interno
+CSV_HEADER_ALIASES = {
+    "data": "date",
+    "date": "date",
+    "descricao": "description",
+    "descrição": "description",
+    "description": "description",
+    "historico": "description",
+    "histórico": "description",
+    "valor": "amount",
+    "amount": "amount",
+    "tipo": "type",
+    "type": "type",
+    "categoria": "category",
+    "category": "category",
+    "tags": "tags",
+}
+
+TYPE_ALIASES = {
+    "income": "income",
+    "receita": "income",
+    "entrada": "income",
+    "credito": "income",
+    "crédito": "income",
+    "expense": "expense",
+    "despesa": "expense",
+    "saida": "expense",
+    "saída": "expense",
+    "debito": "expense",
+    "débito": "expense",
+}
+
+DATE_FORMATS = ("%d/%m/%Y", "%Y-%m-%d", "%d/%m/%y", "%Y-%m-%dT%H:%M:%S", "%Y-%m-%d %H:%M:%S")
+
+DESCRIPTION_MAX_LENGTH = 200
+
+_OFX_BLOCK = re.compile(r"<STMTTRN>(.*?)</STMTTRN>", re.IGNORECASE | re.DOTALL)
+_OFX_FIELD = re.compile(r"<([A-Z0-9.]+)>([^<\r\n]*)", re.IGNORECASE)
+
+
+class ImportRowError(ValueError):
+    """Linha do arquivo inválida (vira resultado 'error' daquela linha, sem abortar o lote)."""
+
+
+def _parse_date(raw: str) -> datetime:
+    raw = (raw or "").strip()
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(raw, fmt)
+        except ValueError:
+            continue
+    raise ImportRowError(f"Data inválida: {raw!r}")
+
+
+def _parse_ofx_date(raw: str) -> datetime:
+    digits = re.sub(r"\D", "", (raw or "")[:14])
+    try:
+        if len(digits) >= 14:
+            return datetime.strptime(digits[:14], "%Y%m%d%H%M%S")
+        return datetime.strptime(digits[:8], "%Y%m%d")
+    except ValueError:
+        raise ImportRowError(f"Data inválida: {raw!r}")
+
+
+def _parse_signed_amount(raw: str) -> Decimal:
+    """Valor com sinal: '-10,50', '(10,50)', '10,50-' ou '10.50' (OFX)."""
+    text = (raw or "").strip()
+    negative = text.startswith("-") or text.endswith("-") or (text.startswith("(") and text.endswith(")"))
+    value = parse_brazilian_amount(text.strip("-()+ "))
+    if value is None or value == 0:
+        raise ImportRowError(f"Valor inválido: {raw!r}")
+    return -value if negative else value
+
+
+def _normalize(row: dict) -> dict:
+    """Campos já separados -> linha interna (amount > 0 + type)."""
+    amount = _parse_signed_amount(row.get("amount"))
+    raw_type = (row.get("type") or "").strip().lower()
+    if raw_type:
+        tx_type = TYPE_ALIASES.get(raw_type)
+        if tx_type is None:
+            raise ImportRowError(f"Tipo inválido: {raw_type!r}")
+    else:
+        tx_type = "expense" if amount < 0 else "income"
+    description = (row.get("description") or "").strip()[:DESCRIPTION_MAX_LENGTH]
+    if not description:
+        raise ImportRowError("Descrição vazia")
+    tags = [t.strip() for t in re.split(r"[;|]", row.get("tags") or "") if t.strip()]
+    return {
+        "date": row["date"],
+        "type": tx_type,
+        "amount": abs(amount),
+        "description": description,
+        "category": (row.get("category") or "").strip() or None,
+        "tags": tags,
+        "fitid": row.get("fitid"),
+    }
+
+
+def iter_csv_rows(stream: TextIO) -> Iterator[dict]:
+    """
+    Lê CSV em streaming. Delimitador ';' ou ',' (detectado no cabeçalho).
+    Gera {"line", "row"} ou {"line", "error"} por linha de dados.
+    """
+    header_line = stream.readline()
+    if not header_line:
+        return
+    delimiter = ";" if header_line.count(";") > header_line.count(",") else ","
+    header = next(csv.reader([header_line], delimiter=delimiter))
+    fields = [CSV_HEADER_ALIASES.get(h.strip().lower().lstrip("\ufeff")) for h in header]
+    missing = {"date", "description", "amount"} - set(fields)
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Colunas obrigatórias ausentes no CSV: {', '.join(sorted(missing))}",
+        )
+    for line_no, values in enumerate(csv.reader(stream, delimiter=delimiter), start=2):
+        if not any(v.strip() for v in values):
+            continue
+        raw = {f: v for f, v in zip(fields, values) if f}
+        try:
+            raw["date"] = _parse_date(raw.get("date"))
+            yield {"line": line_no, "row": _normalize(raw)}
+        except ImportRowError as e:
+            yield {"line": line_no, "error": str(e)}
+
+
+def iter_ofx_rows(stream: TextIO, chunk_size: int = 64 * 1024) -> Iterator[dict]:
+    """
+    Lê OFX (SGML ou XML) em streaming, bloco <STMTTRN> a bloco.
+    "line" = posição da transação no arquivo (1, 2, ...).
+    """
+    buffer = ""
+    index = 0
+    while True:
+        chunk = stream.read(chunk_size)
+        buffer += chunk
+        last_end = 0
+        for match in _OFX_BLOCK.finditer(buffer):
+            index += 1
+            last_end = match.end()
+            fields = {k.upper(): v.strip() for k, v in _OFX_FIELD.findall(match.group(1))}
+            try:
+                raw = {
+                    "date": _parse_ofx_date(fields.get("DTPOSTED")),
+                    "amount": fields.get("TRNAMT"),
+                    "description": fields.get("MEMO") or fields.get("NAME"),
+                    "fitid": fields.get("FITID") or None,
+                }
+                yield {"line": index, "row": _normalize(raw)}
+            except ImportRowError as e:
+                yield {"line": index, "error": str(e)}
+        buffer = buffer[last_end:]
+        if not chunk:
+            break
+
+
+def detect_format(filename: Optional[str], explicit: Optional[str] = None) -> str:
+    """Formato pelo parâmetro ou extensão do arquivo; HTTP 400 se não suportado."""
+    fmt = (explicit or os.path.splitext(filename or "")[1].lstrip(".")).lower()
+    if fmt not in IMPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Formato não suportado; use um de {', '.join(IMPORT_FORMATS)}",
+        )
+    return fmt
+
+
+def _fitid_key(account_id: str, fitid: str) -> str:
+    """idempotency_key da transação importada de OFX (reimportar o mesmo extrato não duplica)."""
+    return "ofx:" + hashlib.sha256(f"{account_id}:{fitid}".encode("utf-8")).hexdigest()[:56]
+
+
+def _batched(items: Iterable[dict], size: int) -> Iterator[List[dict]]:
+    batch: List[dict] = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def iter_import_batches(
+    parsed: Iterable[dict],
+    batch_size: int = IMPORT_BATCH_SIZE,
+) -> Iterator[List[dict]]:
+    """Agrupa as linhas lidas em lotes de batch_size."""
+    return _batched(parsed, batch_size)
+
+
+def check_row_limit(parsed: Iterable[dict], max_rows: int = IMPORT_MAX_ROWS) -> int:
+    """
+    Conta as linhas lidas (streaming, sem guardá-las); HTTP 413 ao passar de max_rows.
+    Chamado antes de gravar qualquer lote: arquivo grande demais não deixa importação parcial.
+    Retorna o total de linhas.
+    """
+    count = 0
+    for _ in parsed:
+        count += 1
+        if count > max_rows:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"Arquivo excede o máximo de {max_rows} linhas por importação",
+            )
+    return count
+
+
+def validate_default_category(db: Session, user_id: str, category_id: Optional[str]) -> None:
+    """Categoria padrão da importação deve ser do usuário; HTTP 404 se não for."""
+    if category_id and not db.query(Category.id).filter(
+        Category.id == category_id,
+        Category.user_id == user_id,
+    ).first():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Categoria não encontrada"
+        )
+
+
+def import_batches(
+    db: Session,
+    user_id: str,
+    account: Account,
+    batches: Iterable[List[dict]],
+    default_category_id: Optional[str] = None,
+) -> List[dict]:
+    """
+    Grava os lotes da importação, um commit por lote (run_with_conflict_retry). Falha de um
+    lote (HTTPException ou erro do banco, ex.: IntegrityError de uma reimportação concorrente
+    na mesma chave de idempotência) desfaz só esse lote e marca as linhas dele como erro;
+    lotes anteriores continuam gravados e os seguintes são processados.
+    """
+    results: List[dict] = []
+    tag_memo: Dict[str, str] = {}
+    for batch in batches:
+        memo_before = dict(tag_memo)
+
+        def _import():
+            # Retentativa após rollback: tags criadas na tentativa anterior não existem mais
+            tag_memo.clear()
+            tag_memo.update(memo_before)
+            return import_batch(db, user_id, account, batch, default_category_id, tag_memo)
+
+        try:
+            results.extend(run_with_conflict_retry(db, _import, operation_name="transaction_import"))
+        except HTTPException as e:
+            tag_memo.clear()
+            detail = e.detail if isinstance(e.detail, str) else (e.detail or {}).get("message", str(e.detail))
+            results.extend(_batch_errors(batch, detail))
+        except SQLAlchemyError as e:
+            # atomic_transaction já fez rollback do lote
+            tag_memo.clear()
+            logger.warning(
+                "Lote da importação descartado (linhas %s-%s): %s",
+                batch[0]["line"],
+                batch[-1]["line"],
+                e.__class__.__name__,
+                extra={"user_id": user_id, "account_id": account.id},
+            )
+            results.extend(_batch_errors(batch, "Erro ao gravar o lote; linhas não importadas"))
+    return results
+
+
+def _batch_errors(batch: List[dict], detail: str) -> List[dict]:
+    return [
+        {"line": item["line"], "status": "error", "error": item.get("error") or detail}
+        for item in batch
+    ]
+
+
+def import_batch(
+    db: Session,
+    user_id: str,
+    account: Account,
+    batch: List[dict],
+    default_category_id: Optional[str] = None,
+    tag_memo: Optional[Dict[str, str]] = None,
+) -> List[dict]:
+    """
+    Grava um lote de linhas lidas (na transação do chamador). Retorna resultado por linha:
+    {"line", "status": "created" | "duplicate" | "error", "transaction_id"?, "error"?}.
+    tag_memo: mapa nome -> tag_id reaproveitado entre os lotes da importação; o chamador
+    deve esvaziá-lo se o lote sofrer rollback (tags criadas nele deixam de existir).
+    """
+    results: Dict[int, dict] = {}
+    rows = []
+    for item in batch:
+        if "error" in item:
+            results[item["line"]] = {"line": item["line"], "status": "error", "error": item["error"]}
+        else:
+            rows.append(item)
+
+    # Categorias do lote: uma query por nome (case-insensitive)
+    names = {r["row"]["category"].lower() for r in rows if r["row"]["category"]}
+    categories: Dict[str, str] = {}
+    if names:
+        for cat_id, name in db.query(Category.id, Category.name).filter(
+            Category.user_id == user_id,
+            func.lower(Category.name).in_(names),
+        ):
+            categories.setdefault(name.lower(), cat_id)
+
+    # Duplicatas OFX: FITID já importado nesta conta (ou repetido no próprio lote)
+    keys = {r["line"]: _fitid_key(account.id, r["row"]["fitid"]) for r in rows if r["row"]["fitid"]}
+    existing_keys = set()
+    if keys:
+        existing_keys = {
+            k for (k,) in db.query(Transaction.idempotency_key).filter(
+                Transaction.user_id == user_id,
+                Transaction.idempotency_key.in_(set(keys.values())),
+            )
+        }
+
+    items = []
+    lines = []
+    for r in rows:
+        line, row = r["line"], r["row"]
+        key = keys.get(line)
+        if key and key in existing_keys:
+            results[line] = {"line": line, "status": "duplicate"}
+            continue
+        category_id = categories.get(row["category"].lower()) if row["category"] else None
+        category_id = category_id or default_category_id
+        if not category_id:
+            results[line] = {
+                "line": line,
+                "status": "error",
+                "error": f"Categoria não encontrada: {row['category']!r}",
+            }
+            continue
+        if key:
+            existing_keys.add(key)
+        items.append({
+            "account_id": account.id,
+            "date": row["date"],
+            "category_id": category_id,
+            "type": row["type"],
+            "amount": row["amount"],
+            "description": row["description"],
+            "tags": row["tags"],
+            "idempotency_key": key,
+        })
+        lines.append(line)
+
+    ids = TransactionService.create_transactions_bulk(items, user_id, db, tag_memo=tag_memo)
+    for line, tx_id in zip(lines, ids):
+        results[line] = {"line": line, "status": "created", "transaction_id": tx_id}
+    return [results[item["line"]] for item in batch]
@@ -1,30 +1,42 @@
 """
 Serviço de negócio para transações
 Centraliza lógica de criação, atualização e deleção de transações.
-Saldo é registrado no ledger (append-only); não atualiza account.balance diretamente.
-Trilha 6: advisory locks (pg_advisory_xact_lock) + SELECT FOR UPDATE; ordem determinística.
+Saldo é registrado no ledger (append-only); account.balance recebe apenas o delta das
+entradas anexadas (apply_balance_deltas), sem SUM do histórico a cada escrita.
+Trilha 6: advisory locks (pg_advisory_xact_lock) + SELECT FOR UPDATE; ordem determinística
+(db.locks.lock_accounts_for_write: dois statements para qualquer quantidade de contas).
+Rollup monthly_category_totals e versão dos dados do usuário (chave do cache de relatórios)
+atualizados na mesma transação de cada escrita (_apply_monthly_totals).
+Group commit opcional (TX_GROUP_COMMIT): create_transaction_coalesced agrupa criações
+concorrentes na mesma conta (core.write_coalescer).
 """
+import uuid
 from decimal import Decimal
+from sqlalchemy import bindparam, delete, insert, or_, update
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 
-from models import Transaction, Account, Category, Tag, TransactionTag
+from models import Transaction, Account, Category, TransactionTag
 from repositories.tag_repository import TagRepository
 from core.security import validate_ownership
 from core.amount_parser import from_cents
 from core.ledger_utils import (
-    sync_account_balance_from_ledger,
-    get_balance_from_ledger,
+    LEDGER_VERIFY_BALANCE,
+    apply_balance_deltas,
+    get_account_balance,
     ConcurrencyConflictError,
 )
 from repositories.ledger_repository import LedgerRepository
+from repositories.monthly_totals_repository import MonthlyTotalsRepository
+from repositories.report_cache_repository import bump_data_version
 from repositories.transaction_repository import TransactionRepository
 from repositories.account_repository import AccountRepository
 from core.logging_config import get_logger
 from fastapi import HTTPException, status
-from db.locks import lock_account, lock_accounts_ordered
+from db.locks import lock_accounts_for_write
+from core.write_coalescer import AccountWriteCoalescer, TX_GROUP_COMMIT_ENABLED
 
 logger = get_logger(__name__)
 
@@ -98,11 +110,13 @@ def _validate_transaction_payload(
     user_id: str,
     db: Session,
     is_transfer: bool = False,
+    user_category_ids: Optional[set] = None,
 ) -> None:
     """
     Valida payload antes de gravar no banco.
     Aceita amount_cents (int) como padrão; fallback para amount (legado).
     Verifica: campos obrigatórios, tipo, valor > 0, description, categoria existente.
+    user_category_ids: ids de categorias do usuário já carregados (lote) — evita a query por item.
     Levanta HTTPException com detail padronizado em caso de falha.
     """
     # Log detalhado para debug (keys + tipos; evita vazar valores sensíveis)
@@ -162,11 +176,14 @@ def _validate_transaction_payload(
             code=CODE_TX_VALIDATION_DESCRIPTION,
         )
     category_id = transaction_data.get("category_id")
-    category = db.query(Category).filter(
-        Category.id == category_id,
-        Category.user_id == user_id,
-    ).first()
-    if not category:
+    if user_category_ids is not None:
+        category_found = category_id in user_category_ids
+    else:
+        category_found = db.query(Category.id).filter(
+            Category.id == category_id,
+            Category.user_id == user_id,
+        ).first() is not None
+    if not category_found:
         _raise_tx_not_found(
             message="Categoria não encontrada",
             details=f"Nenhuma categoria com id '{category_id}' pertence ao usuário.",
@@ -175,10 +192,60 @@ def _validate_transaction_payload(
     # Nota: compatibilidade categoria.type x transaction_type não validada para manter regras existentes.
 
 
-def _lock_accounts_for_update(account_ids: List[str], db: Session) -> None:
-    """Bloqueia contas com SELECT ... FOR UPDATE em ordem de id (evita deadlock)."""
-    for aid in sorted(account_ids):
-        db.query(Account).filter(Account.id == aid).with_for_update().first()
+def _normalize_tag_names(tag_names: Optional[List[str]], max_items: int = 10) -> List[str]:
+    """Nomes sem espaços nas pontas, sem vazios nem repetidos; no máximo max_items."""
+    return list(dict.fromkeys(
+        n.strip() for n in (tag_names or []) if n and str(n).strip()
+    ))[:max_items]
+
+
+def _sync_tags_for_transactions(
+    db: Session,
+    user_id: str,
+    tags_by_transaction: Dict[str, List[str]],
+    max_items: int = 10,
+    tag_memo: Optional[Dict[str, str]] = None,
+) -> None:
+    """
+    Sincroniza as tags de uma ou mais transações com transaction_tags (N:N), em lote:
+    nomes resolvidos/criados de uma vez (TagRepository.resolve_ids), vínculos atuais em um
+    SELECT, diff aplicado com um INSERT multi-linha e um DELETE ... IN.
+    """
+    names_by_tx = {
+        tx_id: _normalize_tag_names(names, max_items)
+        for tx_id, names in tags_by_transaction.items()
+    }
+    if not names_by_tx:
+        return
+    all_names = [n for names in names_by_tx.values() for n in names]
+    tag_ids = TagRepository(db).resolve_ids(user_id, all_names, tag_memo) if all_names else {}
+
+    current: Dict[str, set] = {tx_id: set() for tx_id in names_by_tx}
+    for tx_id, tag_id in db.query(TransactionTag.transaction_id, TransactionTag.tag_id).filter(
+        TransactionTag.transaction_id.in_(list(names_by_tx))
+    ):
+        current[tx_id].add(tag_id)
+
+    links = []
+    stale = []
+    for tx_id, names in names_by_tx.items():
+        desired = {tag_ids[n] for n in names}
+        links.extend(
+            {"id": str(uuid.uuid4()), "transaction_id": tx_id, "tag_id": tag_id}
+            for tag_id in desired - current[tx_id]
+        )
+        stale.extend((tx_id, tag_id) for tag_id in current[tx_id] - desired)
+    if links:
+        db.execute(insert(TransactionTag.__table__), links)
+    if stale:
+        db.execute(
+            delete(TransactionTag.__table__).where(
+                or_(*[
+                    (TransactionTag.transaction_id == tx_id) & (TransactionTag.tag_id == tag_id)
+                    for tx_id, tag_id in stale
+                ])
+            )
+        )
 
 
 def _sync_tags_for_transaction(
@@ -192,25 +259,163 @@ def _sync_tags_for_transaction(
     Sincroniza tags da transação com a tabela transaction_tags (N:N).
     Cria tags por nome se não existirem; adiciona/remove vínculos conforme tag_names.
     """
-    tag_names = [n.strip() for n in (tag_names or []) if n and str(n).strip()][:max_items]
-    tag_repo = TagRepository(db)
-    current_tts = db.query(TransactionTag).filter(
-        TransactionTag.transaction_id == transaction_id
-    ).all()
-    current_tag_ids = {tt.tag_id for tt in current_tts}
-    desired_tag_ids = set()
-    for name in tag_names:
-        tag = tag_repo.get_by_user_and_name(user_id, name)
-        if not tag:
-            tag = Tag(name=name, user_id=user_id)
-            db.add(tag)
-            db.flush()
-        desired_tag_ids.add(tag.id)
-        if tag.id not in current_tag_ids:
-            db.add(TransactionTag(transaction_id=transaction_id, tag_id=tag.id))
-    for tt in current_tts:
-        if tt.tag_id not in desired_tag_ids:
-            db.delete(tt)
+    _sync_tags_for_transactions(db, user_id, {transaction_id: tag_names}, max_items)
+
+
+def _apply_monthly_totals(db: Session, added: Iterable = (), removed: Iterable = ()) -> None:
+    """
+    Atualiza o rollup monthly_category_totals na transação corrente (um upsert) e incrementa a
+    versão dos dados dos usuários afetados (invalida o cache de relatórios):
+    added/removed: Transaction ou dicts (user_id, date, category_id, type, amount).
+    Em update, removed recebe os valores antigos e added os novos.
+    """
+    totals = MonthlyTotalsRepository(db)
+    user_ids = set()
+    for tx, sign in [(tx, -1) for tx in removed] + [(tx, 1) for tx in added]:
+        totals.add_transaction(tx, sign=sign)
+        user_ids.add(tx["user_id"] if isinstance(tx, dict) else tx.user_id)
+    totals.flush()
+    bump_data_version(db, user_ids)
+
+
+def _attach_tags_bulk(
+    db: Session,
+    user_id: str,
+    tags_by_transaction: Dict[str, List[str]],
+    max_items: int = 10,
+    tag_memo: Optional[Dict[str, str]] = None,
+) -> None:
+    """
+    Vincula tags a transações recém-criadas (sem vínculos prévios), em lote:
+    nomes resolvidos/criados de uma vez (TagRepository.resolve_ids) e um INSERT dos vínculos.
+    tag_memo: mapa nome -> id reaproveitado entre lotes da mesma requisição.
+    """
+    names_by_tx = {
+        tx_id: _normalize_tag_names(names, max_items)
+        for tx_id, names in tags_by_transaction.items()
+    }
+    all_names = [n for names in names_by_tx.values() for n in names]
+    if not all_names:
+        return
+    tag_ids = TagRepository(db).resolve_ids(user_id, all_names, tag_memo)
+    links = [
+        {"id": str(uuid.uuid4()), "transaction_id": tx_id, "tag_id": tag_ids[name]}
+        for tx_id, names in names_by_tx.items()
+        for name in names
+    ]
+    db.execute(insert(TransactionTag.__table__), links)
+
+
+def _simple_transaction_rows(item: dict, user_id: str) -> Tuple[dict, dict]:
+    """Linha de transactions e entrada do ledger de um item income/expense já validado."""
+    tx_id = str(uuid.uuid4())
+    amount = item["amount"]
+    row = {
+        "id": tx_id,
+        "date": item["date"],
+        "account_id": item["account_id"],
+        "category_id": item["category_id"],
+        "type": item["type"],
+        "amount": amount,
+        "description": item["description"],
+        "user_id": user_id,
+        "transfer_transaction_id": None,
+        "shared_expense_id": item.get("shared_expense_id"),
+        "idempotency_key": item.get("idempotency_key"),
+    }
+    entry = {
+        "user_id": user_id,
+        "account_id": item["account_id"],
+        "amount": amount if item["type"] == "income" else -amount,
+        "entry_type": "credit" if item["type"] == "income" else "debit",
+        "transaction_id": tx_id,
+    }
+    return row, entry
+
+
+def _transfer_transaction_rows(
+    transaction_data: dict, account: Account, to_account: Account, user_id: str
+) -> Tuple[dict, dict, List[dict]]:
+    """
+    Linhas das duas pernas de uma transferência já validada e suas entradas do ledger.
+    A perna de entrada aponta a de saída; a saída recebe transfer_transaction_id depois,
+    num UPDATE (updated_at preenchido só na saída, como em _write_transfer).
+    """
+    amount = transaction_data["amount"]
+    description = transaction_data.get("description", "Transferência")
+    out_id, in_id = str(uuid.uuid4()), str(uuid.uuid4())
+    common = {
+        "date": transaction_data["date"],
+        "category_id": transaction_data["category_id"],
+        "type": "transfer",
+        "amount": amount,
+        "user_id": user_id,
+        "shared_expense_id": None,
+        "idempotency_key": None,
+    }
+    out_row = {
+        **common,
+        "id": out_id,
+        "account_id": account.id,
+        "description": f"{description} → {to_account.name}",
+        "transfer_transaction_id": None,
+    }
+    in_row = {
+        **common,
+        "id": in_id,
+        "account_id": to_account.id,
+        "description": f"{description} ← {account.name}",
+        "transfer_transaction_id": out_id,
+    }
+    entries = [
+        {
+            "user_id": user_id,
+            "account_id": account.id,
+            "amount": -amount,
+            "entry_type": "debit",
+            "transaction_id": out_id,
+        },
+        {
+            "user_id": user_id,
+            "account_id": to_account.id,
+            "amount": amount,
+            "entry_type": "credit",
+            "transaction_id": in_id,
+        },
+    ]
+    return out_row, in_row, entries
+
+
+def _insert_transaction_rows(
+    db: Session,
+    user_id: str,
+    rows: List[dict],
+    entries: List[dict],
+    tags_by_transaction: Dict[str, List[str]],
+    *,
+    transfer_links: Iterable[Tuple[str, str]] = (),
+    tag_memo: Optional[Dict[str, str]] = None,
+) -> None:
+    """
+    Grava transações já montadas (contas bloqueadas pelo chamador): INSERT multi-linha em
+    transactions, UPDATE das pernas de saída (transfer_links: pares saída/entrada), ledger,
+    um delta de saldo por conta, rollup mensal e tags.
+    """
+    db.execute(insert(Transaction.__table__), rows)
+    links = [{"out_id": out_id, "in_id": in_id} for out_id, in_id in transfer_links]
+    if links:
+        table = Transaction.__table__
+        db.execute(
+            update(table)
+            .where(table.c.id == bindparam("out_id"))
+            .values(transfer_transaction_id=bindparam("in_id")),
+            links,
+        )
+    ledger = LedgerRepository(db)
+    ledger.append_many(entries)
+    apply_balance_deltas(ledger.pop_balance_deltas(), db)
+    _apply_monthly_totals(db, added=rows)
+    _attach_tags_bulk(db, user_id, tags_by_transaction, tag_memo=tag_memo)
 
 
 class TransactionService:
@@ -296,8 +501,7 @@ class TransactionService:
                 return existing
 
         try:
-            lock_account(account.id, db)
-            _lock_accounts_for_update([account.id], db)
+            lock_accounts_for_write([account.id], db)
             amount = transaction_data["amount"]
             db_transaction = Transaction(
                 date=transaction_data["date"],
@@ -332,7 +536,8 @@ class TransactionService:
                     transaction_id=db_transaction.id,
                 )
             db.flush()
-            sync_account_balance_from_ledger(account.id, db)
+            apply_balance_deltas(ledger.pop_balance_deltas(), db)
+            _apply_monthly_totals(db, added=[db_transaction])
             _sync_tags_for_transaction(
                 db, db_transaction.id, user_id,
                 transaction_data.get("tags") or [],
@@ -362,6 +567,217 @@ class TransactionService:
             logger.exception("Erro inesperado em create_transaction: %s", e)
             _raise_tx_internal(details="Erro interno ao processar transação.")
     
+    @staticmethod
+    def create_transaction_coalesced(
+        transaction_data: dict,
+        account: Account,
+        user_id: str,
+        db: Session,
+    ) -> Transaction:
+        """
+        create_transaction (income/expense) via group commit: valida na sessão do chamador e
+        entrega a escrita ao coalescer da conta, que a aplica junto com as concorrentes numa
+        transação própria (já commitada ao retornar). Transferências usam create_transaction.
+        Retorna a transação criada, lida na sessão do chamador.
+        """
+        validate_ownership(account.user_id, user_id, "conta")
+        _validate_transaction_payload(transaction_data, account, user_id, db)
+        if transaction_data["type"] == "transfer":
+            _raise_tx_validation(
+                message="Tipo de transação inválido",
+                details="Transferências não passam pelo group commit.",
+                code=CODE_TX_VALIDATION_INVALID_TYPE,
+            )
+        idempotency_key = transaction_data.get("idempotency_key")
+        if idempotency_key:
+            existing = TransactionRepository(db).get_by_user_and_idempotency_key(user_id, idempotency_key)
+            if existing:
+                return existing
+        item = {
+            "account_id": account.id,
+            "date": transaction_data["date"],
+            "category_id": transaction_data["category_id"],
+            "type": transaction_data["type"],
+            "amount": transaction_data["amount"],
+            "description": transaction_data["description"],
+            "tags": transaction_data.get("tags") or [],
+            "shared_expense_id": transaction_data.get("shared_expense_id"),
+            "idempotency_key": idempotency_key,
+        }
+        tx_id = _write_coalescer.submit(db.get_bind(), (user_id, account.id), item)
+        db.expire(account)
+        return db.query(Transaction).filter(Transaction.id == tx_id).one()
+
+    @staticmethod
+    def create_transactions_bulk(
+        items: List[dict],
+        user_id: str,
+        db: Session,
+        *,
+        lock: bool = True,
+        tag_memo: Optional[Dict[str, str]] = None,
+    ) -> List[str]:
+        """
+        Cria várias transações income/expense em lote (importação de extrato, criação em lote).
+        items já validados pelo chamador (contas e categorias do usuário): account_id, date,
+        category_id, type, amount (Decimal > 0), description, tags e idempotency_key opcionais.
+        Locks das contas uma única vez, em ordem de id; INSERT multi-linha em transactions e
+        ledger_entries; um delta de saldo por conta. Retorna os ids na ordem de items.
+        lock=False: chamador já bloqueou as contas (ex.: create_transactions_batch).
+        tag_memo: mapa nome -> tag_id do usuário compartilhado entre lotes da mesma requisição.
+        """
+        if not items:
+            return []
+        for item in items:
+            if item["type"] not in ("income", "expense"):
+                _raise_tx_validation(
+                    message="Tipo de transação inválido",
+                    details=f"type deve ser 'income' ou 'expense' em lote. Recebido: {item['type']!r}",
+                    code=CODE_TX_VALIDATION_INVALID_TYPE,
+                )
+        account_ids = sorted({item["account_id"] for item in items})
+        rows = []
+        entries = []
+        tags_by_transaction: Dict[str, List[str]] = {}
+        for item in items:
+            row, entry = _simple_transaction_rows(item, user_id)
+            rows.append(row)
+            entries.append(entry)
+            if item.get("tags"):
+                tags_by_transaction[row["id"]] = item["tags"]
+
+        try:
+            if lock:
+                lock_accounts_for_write(account_ids, db)
+            _insert_transaction_rows(db, user_id, rows, entries, tags_by_transaction, tag_memo=tag_memo)
+        except ConcurrencyConflictError as e:
+            _raise_tx_conflict(
+                message=str(e) or "Conta alterada por outra transação; refaça a operação.",
+                details="Conflito de concorrência no ledger/saldo.",
+            )
+        logger.info(
+            "Transações criadas em lote: %s",
+            len(rows),
+            extra={"user_id": user_id, "count": len(rows), "account_ids": account_ids},
+        )
+        return [row["id"] for row in rows]
+
+    @staticmethod
+    def create_transactions_batch(
+        items: List[dict],
+        user_id: str,
+        db: Session,
+    ) -> List[Transaction]:
+        """
+        Cria várias transações (income/expense/transfer) na transação do chamador (tudo ou nada).
+        Posse das contas (origem e destino) conferida antes do lock; só contas do usuário são
+        bloqueadas, de uma vez (lock_accounts_for_write). Categorias em uma query IN.
+        Saldos validados na ordem de items (saldo corrente por conta: cada transferência vê só
+        os itens anteriores); linhas de todos os itens, pares de transferência incluídos,
+        gravadas em lote (_insert_transaction_rows). Retorna as transações na ordem de items.
+        """
+        if not items:
+            return []
+        account_ids = {item["account_id"] for item in items}
+        account_ids.update(item["to_account_id"] for item in items if item.get("to_account_id"))
+        # Posse antes de qualquer lock: ids de contas de outros usuários não chegam aos locks
+        owned_ids = [
+            aid for (aid,) in db.query(Account.id).filter(
+                Account.id.in_(account_ids), Account.user_id == user_id
+            )
+        ]
+        accounts = lock_accounts_for_write(owned_ids, db, user_id=user_id)
+        category_ids = {
+            cid for (cid,) in db.query(Category.id).filter(
+                Category.id.in_({item.get("category_id") for item in items}),
+                Category.user_id == user_id,
+            )
+        }
+        for index, item in enumerate(items):
+            account = accounts.get(item["account_id"])
+            if account is None:
+                _raise_tx_not_found(
+                    message="Conta não encontrada",
+                    details=f"Item {index}: nenhuma conta com id '{item['account_id']}' pertence ao usuário.",
+                    code=CODE_TX_VALIDATION_MISSING,
+                )
+            _validate_transaction_payload(
+                item,
+                account,
+                user_id,
+                db,
+                is_transfer=(item.get("type") == "transfer"),
+                user_category_ids=category_ids,
+            )
+            if item["type"] == "transfer":
+                to_account = accounts.get(item["to_account_id"])
+                if to_account is None:
+                    _raise_tx_not_found(
+                        message="Conta de destino não encontrada",
+                        details=f"Item {index}: nenhuma conta com id '{item['to_account_id']}' pertence ao usuário.",
+                        code=CODE_TX_TRANSFER_TO_ACCOUNT,
+                    )
+                if to_account.id == account.id:
+                    _raise_tx_validation(
+                        message="Transferência para a mesma conta não é permitida",
+                        details=f"Item {index}: origem e destino não podem ser a mesma conta.",
+                        code=CODE_TX_TRANSFER_SAME_ACCOUNT,
+                    )
+
+        # Saldo corrente por conta (linhas recém-bloqueadas; SUM(ledger) só em modo verify)
+        balances = {
+            aid: get_account_balance(aid, db) if LEDGER_VERIFY_BALANCE else Decimal(str(account.balance or 0))
+            for aid, account in accounts.items()
+        }
+        ids: List[str] = []
+        rows: List[dict] = []
+        entries: List[dict] = []
+        transfer_links: List[Tuple[str, str]] = []
+        tags_by_transaction: Dict[str, List[str]] = {}
+        for index, item in enumerate(items):
+            amount = Decimal(str(item["amount"]))
+            if item["type"] == "transfer":
+                account, to_account = accounts[item["account_id"]], accounts[item["to_account_id"]]
+                if balances[account.id] < amount:
+                    _raise_tx_business(
+                        message="Saldo insuficiente para esta transferência.",
+                        details=f"Item {index}: saldo atual: {balances[account.id]}; valor: {item['amount']}.",
+                        code=CODE_TX_INSUFFICIENT_BALANCE,
+                    )
+                out_row, in_row, item_entries = _transfer_transaction_rows(item, account, to_account, user_id)
+                item_rows = [out_row, in_row]
+                transfer_links.append((out_row["id"], in_row["id"]))
+            else:
+                row, entry = _simple_transaction_rows(item, user_id)
+                item_rows, item_entries = [row], [entry]
+            for entry in item_entries:
+                balances[entry["account_id"]] += Decimal(str(entry["amount"]))
+            rows.extend(item_rows)
+            entries.extend(item_entries)
+            ids.append(item_rows[0]["id"])
+            if item.get("tags"):
+                tags_by_transaction.update((row["id"], item["tags"]) for row in item_rows)
+
+        try:
+            _insert_transaction_rows(
+                db, user_id, rows, entries, tags_by_transaction, transfer_links=transfer_links
+            )
+        except ConcurrencyConflictError as e:
+            _raise_tx_conflict(
+                message=str(e) or "Conta alterada por outra transação; refaça a operação.",
+                details="Conflito de concorrência no ledger/saldo.",
+            )
+        logger.info(
+            "Transações criadas em lote: %s (%s transferências)",
+            len(items),
+            len(transfer_links),
+            extra={"user_id": user_id, "count": len(items), "account_ids": sorted(accounts)},
+        )
+
+        db.flush()
+        by_id = {t.id: t for t in db.query(Transaction).filter(Transaction.id.in_(ids))}
+        return [by_id[tx_id] for tx_id in ids]
+
     @staticmethod
     def _create_transfer(
         transaction_data: dict,
@@ -408,68 +824,66 @@ class TransactionService:
             )
         validate_ownership(to_account.user_id, user_id, "conta de destino")
 
+        locked = lock_accounts_for_write([account.id, to_account.id], db)
+        # Linha recém-bloqueada (FOR UPDATE) já traz o saldo corrente; SUM(ledger) só em modo verify
+        current_balance = None if LEDGER_VERIFY_BALANCE else Decimal(str(locked[account.id].balance or 0))
+        transaction_out = TransactionService._write_transfer(
+            transaction_data, account, to_account, user_id, db, current_balance=current_balance
+        )
+        db.refresh(transaction_out)
+        db.refresh(account)
+        db.refresh(to_account)
+        return transaction_out
+
+    @staticmethod
+    def _write_transfer(
+        transaction_data: dict,
+        account: Account,
+        to_account: Account,
+        user_id: str,
+        db: Session,
+        *,
+        current_balance: Optional[Decimal] = None,
+    ) -> Transaction:
+        """
+        Grava as duas pernas, o ledger e o delta de saldo de uma transferência já validada.
+        Origem e destino devem estar bloqueadas pelo chamador (lock_accounts_for_write); aqui não
+        há novo lock. current_balance: saldo da origem já lido do lock; None → get_account_balance.
+        Retorna a perna de origem.
+        """
         amount = transaction_data["amount"]
-        date = transaction_data["date"]
-        description = transaction_data.get("description", "Transferência")
 
         try:
-            lock_accounts_ordered([account.id, to_account.id], db)
-            _lock_accounts_for_update([account.id, to_account.id], db)
-            current_balance = get_balance_from_ledger(account.id, db)
+            if current_balance is None:
+                current_balance = get_account_balance(account.id, db)
             if current_balance < Decimal(str(amount)):
                 _raise_tx_business(
                     message="Saldo insuficiente para esta transferência.",
                     details=f"Saldo atual: {current_balance}; valor: {amount}.",
                     code=CODE_TX_INSUFFICIENT_BALANCE,
                 )
-            transaction_out = Transaction(
-                date=date,
-                account_id=account.id,
-                category_id=transaction_data["category_id"],
-                type="transfer",
-                amount=amount,
-                description=f"{description} → {to_account.name}",
-                user_id=user_id,
-                transfer_transaction_id=None,
+            out_row, in_row, entries = _transfer_transaction_rows(
+                transaction_data, account, to_account, user_id
             )
+            transaction_out = Transaction(**out_row)
             db.add(transaction_out)
             db.flush()
 
-            transaction_in = Transaction(
-                date=date,
-                account_id=to_account.id,
-                category_id=transaction_data["category_id"],
-                type="transfer",
-                amount=amount,
-                description=f"{description} ← {account.name}",
-                user_id=user_id,
-                transfer_transaction_id=transaction_out.id,
-            )
+            transaction_in = Transaction(**in_row)
             db.add(transaction_in)
             db.flush()
             transaction_out.transfer_transaction_id = transaction_in.id
 
-            ledger = LedgerRepository(db)
-            ledger.append(
-                user_id=user_id,
-                account_id=account.id,
-                amount=-amount,
-                entry_type="debit",
-                transaction_id=transaction_out.id,
-            )
-            ledger.append(
-                user_id=user_id,
-                account_id=to_account.id,
-                amount=amount,
-                entry_type="credit",
-                transaction_id=transaction_in.id,
-            )
             db.flush()
-            sync_account_balance_from_ledger(account.id, db)
-            sync_account_balance_from_ledger(to_account.id, db)
+
+            ledger = LedgerRepository(db)
+            ledger.append_many(entries)
+            apply_balance_deltas(ledger.pop_balance_deltas(), db)
+            _apply_monthly_totals(db, added=[transaction_out, transaction_in])
             tag_names = transaction_data.get("tags") or []
-            _sync_tags_for_transaction(db, transaction_out.id, user_id, tag_names)
-            _sync_tags_for_transaction(db, transaction_in.id, user_id, tag_names)
+            _sync_tags_for_transactions(
+                db, user_id, {transaction_out.id: tag_names, transaction_in.id: tag_names}
+            )
 
             logger.info(
                 "Transferência criada: %s → %s Valor=%s IDs=%s/%s",
@@ -480,9 +894,6 @@ class TransactionService:
                 transaction_in.id,
                 extra={"user_id": user_id, "transaction_id": transaction_out.id},
             )
-            db.refresh(transaction_out)
-            db.refresh(account)
-            db.refresh(to_account)
             return transaction_out
         except HTTPException:
             raise
@@ -492,7 +903,7 @@ class TransactionService:
                 details="Conflito de concorrência no ledger/saldo.",
             )
         except Exception as e:
-            logger.exception("Erro inesperado em _create_transfer: %s", e)
+            logger.exception("Erro inesperado em _write_transfer: %s", e)
             _raise_tx_internal(details="Erro interno ao processar transferência.")
     
     @staticmethod
@@ -542,30 +953,25 @@ class TransactionService:
         ledger = LedgerRepository(db)
         old_amount = db_transaction.amount
         old_type = db_transaction.type
+        old_totals = {
+            "user_id": db_transaction.user_id,
+            "date": db_transaction.date,
+            "category_id": db_transaction.category_id,
+            "type": old_type,
+            "amount": old_amount,
+        }
 
         account_ids = [old_account.id, new_account.id]
         if old_account.id == new_account.id:
             account_ids = [old_account.id]
         try:
-            lock_accounts_ordered(account_ids, db)
-            _lock_accounts_for_update(account_ids, db)
-            # Reversão no ledger (entrada de sinal oposto na conta antiga)
+            lock_accounts_for_write(account_ids, db)
+            # Reversão no ledger (entrada de sinal oposto na conta antiga); gravada junto com a nova entrada
             if old_type == 'income':
-                ledger.append(
-                    user_id=user_id,
-                    account_id=old_account.id,
-                    amount=-old_amount,
-                    entry_type='debit',
-                    transaction_id=db_transaction.id,
-                )
+                reversal = {"amount": -old_amount, "entry_type": "debit"}
             else:
-                ledger.append(
-                    user_id=user_id,
-                    account_id=old_account.id,
-                    amount=old_amount,
-                    entry_type='credit',
-                    transaction_id=db_transaction.id,
-                )
+                reversal = {"amount": old_amount, "entry_type": "credit"}
+            reversal.update(user_id=user_id, account_id=old_account.id, transaction_id=db_transaction.id)
 
             if 'date' in update_data:
                 db_transaction.date = update_data['date']
@@ -591,25 +997,15 @@ class TransactionService:
             new_amount = update_data.get('amount', db_transaction.amount)
 
             if new_type == 'income':
-                ledger.append(
-                    user_id=user_id,
-                    account_id=new_account.id,
-                    amount=new_amount,
-                    entry_type='credit',
-                    transaction_id=db_transaction.id,
-                )
+                new_entry = {"amount": new_amount, "entry_type": "credit"}
             else:
-                ledger.append(
-                    user_id=user_id,
-                    account_id=new_account.id,
-                    amount=-new_amount,
-                    entry_type='debit',
-                    transaction_id=db_transaction.id,
-                )
+                new_entry = {"amount": -new_amount, "entry_type": "debit"}
+            new_entry.update(user_id=user_id, account_id=new_account.id, transaction_id=db_transaction.id)
 
             db.flush()
-            sync_account_balance_from_ledger(old_account.id, db)
-            sync_account_balance_from_ledger(new_account.id, db)
+            ledger.append_many([reversal, new_entry])
+            apply_balance_deltas(ledger.pop_balance_deltas(), db)
+            _apply_monthly_totals(db, added=[db_transaction], removed=[old_totals])
 
             logger.info(
                 f"Transação atualizada: ID={db_transaction.id}, "
@@ -660,27 +1056,26 @@ class TransactionService:
         if partner_transaction and partner_account:
             account_ids_to_lock = sorted(set([account.id, partner_account.id]))
         try:
-            lock_accounts_ordered(account_ids_to_lock, db)
-            _lock_accounts_for_update(account_ids_to_lock, db)
+            lock_accounts_for_write(account_ids_to_lock, db)
             # Reverter todas as entradas do ledger associadas a esta transação (e à parceira se transfer)
             transaction_ids_to_revert = [db_transaction.id]
             if partner_transaction:
                 transaction_ids_to_revert.append(partner_transaction.id)
-            for tid in transaction_ids_to_revert:
-                entries = ledger_repo.get_entries_by_transaction(tid)
-                for entry in entries:
-                    rev_type = "credit" if entry.entry_type == "debit" else "debit"
-                    rev_amount = -entry.amount
-                    ledger_repo.append(
-                        user_id=user_id,
-                        account_id=entry.account_id,
-                        amount=rev_amount,
-                        entry_type=rev_type,
-                        transaction_id=entry.transaction_id,
-                    )
-                db.flush()
-                for entry in entries:
-                    sync_account_balance_from_ledger(entry.account_id, db)
+            entries = ledger_repo.get_entries_by_transactions(transaction_ids_to_revert)
+            ledger_repo.append_many(
+                {
+                    "user_id": user_id,
+                    "account_id": entry.account_id,
+                    "amount": -entry.amount,
+                    "entry_type": "credit" if entry.entry_type == "debit" else "debit",
+                    "transaction_id": entry.transaction_id,
+                }
+                for entry in entries
+            )
+            apply_balance_deltas(ledger_repo.pop_balance_deltas(), db)
+            _apply_monthly_totals(
+                db, removed=[db_transaction] + ([partner_transaction] if partner_transaction else [])
+            )
 
             if not hard and partner_transaction:
                 partner_transaction.deleted_at = datetime.now()
@@ -706,6 +1101,113 @@ class TransactionService:
                 detail=str(e) or "Conta alterada por outra transação; refaça a operação.",
             ) from e
 
+    @staticmethod
+    def delete_transactions_batch(
+        transaction_ids: List[str],
+        user_id: str,
+        db: Session,
+        hard: bool = True,
+    ) -> Tuple[List[str], List[dict]]:
+        """
+        Exclusão em lote, set-based (número constante de round trips, independente do tamanho):
+        uma query para transações + pernas parceiras de transferência, locks das contas em ordem
+        uma vez (o SELECT FOR UPDATE valida a posse), uma query das entradas do ledger, um INSERT multi-linha de estornos,
+        um UPDATE de saldo por conta afetada e um DELETE/UPDATE em lote.
+        Retorna (ids excluídos, erros [{"id", "reason"}]) na ordem pedida.
+        """
+        requested = list(dict.fromkeys(transaction_ids))
+        if not requested:
+            return [], []
+        rows = db.query(Transaction).filter(
+            Transaction.user_id == user_id,
+            Transaction.deleted_at.is_(None),
+            or_(
+                Transaction.id.in_(requested),
+                Transaction.transfer_transaction_id.in_(requested),
+            ),
+        ).all()
+        by_id = {t.id: t for t in rows}
+        account_ids = {t.account_id for t in rows}
+        # Contas das transações bloqueadas já aqui; o resultado (só as do usuário) valida a posse
+        owned_accounts = set(lock_accounts_for_write(account_ids, db, user_id=user_id))
+
+        deleted_ids: List[str] = []
+        errors: List[dict] = []
+        to_delete: Dict[str, Transaction] = {}
+        for tx_id in requested:
+            tx = by_id.get(tx_id)
+            if tx is None:
+                errors.append({"id": tx_id, "reason": "not_found"})
+                continue
+            if tx.account_id not in owned_accounts:
+                errors.append({"id": tx_id, "reason": "account_not_found"})
+                continue
+            to_delete[tx.id] = tx
+            partner = by_id.get(tx.transfer_transaction_id) if tx.type == "transfer" else None
+            if partner is not None and partner.account_id in owned_accounts:
+                to_delete[partner.id] = partner
+            deleted_ids.append(tx_id)
+        if not to_delete:
+            return deleted_ids, errors
+
+        locked = sorted({t.account_id for t in to_delete.values()})
+        ids = list(to_delete)
+        ledger_repo = LedgerRepository(db)
+        try:
+            entries = ledger_repo.get_entries_by_transactions(ids)
+            ledger_repo.append_many(
+                {
+                    "user_id": user_id,
+                    "account_id": entry.account_id,
+                    "amount": -entry.amount,
+                    "entry_type": "credit" if entry.entry_type == "debit" else "debit",
+                    "transaction_id": entry.transaction_id,
+                }
+                for entry in entries
+            )
+            apply_balance_deltas(ledger_repo.pop_balance_deltas(), db)
+            _apply_monthly_totals(db, removed=to_delete.values())
+        except ConcurrencyConflictError as e:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=str(e) or "Conta alterada por outra transação; refaça a operação.",
+            ) from e
+
+        if hard:
+            for tx in to_delete.values():
+                db.expunge(tx)
+            db.execute(delete(TransactionTag.__table__).where(TransactionTag.__table__.c.transaction_id.in_(ids)))
+            db.execute(delete(Transaction.__table__).where(Transaction.__table__.c.id.in_(ids)))
+        else:
+            now = datetime.now()
+            db.execute(
+                update(Transaction.__table__)
+                .where(Transaction.__table__.c.id.in_(ids))
+                .values(deleted_at=now)
+            )
+            for tx in to_delete.values():
+                db.expire(tx)
+        logger.info(
+            "Transações excluídas em lote: %s (hard=%s)",
+            len(ids),
+            hard,
+            extra={"user_id": user_id, "count": len(ids), "account_ids": locked},
+        )
+        return deleted_ids, errors
+
+
+# Coalescer único do processo: grupo = escritas do mesmo usuário na mesma conta
+_write_coalescer = AccountWriteCoalescer(
+    apply_batch=lambda session, key, items: TransactionService.create_transactions_bulk(
+        items, key[0], session
+    ),
+)
+
+
+def group_commit_enabled() -> bool:
+    """True se POST /api/transactions deve usar o group commit (TX_GROUP_COMMIT=1)."""
+    return TX_GROUP_COMMIT_ENABLED
+
 
 # --- Funções de acesso para o router (sem ORM no router) ---
 
@@ -728,6 +1230,12 @@ def get_monthly_summary(db: Session, user_id: str, year: int, month: int) -> dic
     return repo.get_monthly_summary_aggregates(user_id, year, month)
 
 
+def get_monthly_summaries(db: Session, user_id: str, months: List[Tuple[int, int]]) -> Dict[Tuple[int, int], dict]:
+    """Resumos de vários meses [(ano, mês)] numa única query; mesmo formato de get_monthly_summary."""
+    repo = TransactionRepository(db)
+    return repo.get_monthly_summaries_aggregates(user_id, months)
+
+
 def get_existing_by_idempotency_key(db: Session, user_id: str, idempotency_key: str):
     """Retorna Transaction existente com mesma idempotency_key e user_id; senão None."""
     repo = TransactionRepository(db)
@@ -0,0 +1,45 @@
+"""
+Efeitos pós-commit das escritas de transação (ver core.side_effects).
+Handlers registrados no import do módulo; os routers publicam TRANSACTIONS_CREATED depois do
+commit principal e respondem sem esperar alerta de saldo baixo e round-up.
+"""
+from typing import Iterable
+
+from sqlalchemy.orm import Session
+
+from core.side_effects import TRANSACTIONS_CREATED, TransactionEvent, post_commit_dispatcher
+from services.automation_checks import check_low_balance_after_transaction
+from services.round_up_service import apply_round_up_after_expenses
+
+
+@post_commit_dispatcher.handler(TRANSACTIONS_CREATED)
+def low_balance_alerts(db: Session, event: TransactionEvent) -> None:
+    """Regras low_balance_alert das contas afetadas."""
+    for account_id in event.account_ids:
+        check_low_balance_after_transaction(db, account_id, event.user_id)
+
+
+@post_commit_dispatcher.handler(TRANSACTIONS_CREATED)
+def round_up_expenses(db: Session, event: TransactionEvent) -> None:
+    """Regras round_up sobre as despesas criadas."""
+    apply_round_up_after_expenses(db, event.user_id, event.expense_amounts_cents)
+
+
+def publish_transactions_created(
+    db: Session,
+    user_id: str,
+    account_ids: Iterable[str],
+    expense_amounts_cents: Iterable[int] = (),
+    transaction_ids: Iterable[str] = (),
+) -> None:
+    """Enfileira os efeitos de transações já commitadas (não bloqueia a requisição)."""
+    post_commit_dispatcher.dispatch(
+        db.get_bind(),
+        TransactionEvent(
+            name=TRANSACTIONS_CREATED,
+            user_id=user_id,
+            account_ids=tuple(sorted(set(account_ids))),
+            expense_amounts_cents=tuple(expense_amounts_cents),
+            transaction_ids=tuple(transaction_ids),
+        ),
+    )
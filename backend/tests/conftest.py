@@ -5,8 +5,9 @@ Garante que todos os modelos estão registrados em Base antes de create_all.
 import os
 import uuid
 import pytest
+from contextlib import contextmanager
 from decimal import Decimal
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from fastapi.testclient import TestClient
 
@@ -121,6 +122,45 @@ def db():
             pass
 
 
+class StatementLog(list):
+    """SQL enviado ao banco, na ordem; parameters[i] são os parâmetros de self[i]."""
+
+    def __init__(self):
+        super().__init__()
+        self.parameters = []
+
+
+@pytest.fixture
+def count_statements():
+    """
+    Context manager que registra os statements enviados ao banco no bloco (before_cursor_execute):
+
+        with count_statements(db) as statements:
+            repo.get_by_user(user_id)
+        assert len(statements) == 2
+
+    Aceita Session ou Engine; selects_only=True registra só SELECTs.
+    """
+    @contextmanager
+    def _capture(bind, selects_only: bool = False):
+        engine = bind.get_bind() if hasattr(bind, "get_bind") else bind
+        log = StatementLog()
+
+        def _on_execute(conn, cursor, statement, parameters, context, executemany):
+            if selects_only and not statement.lstrip().upper().startswith("SELECT"):
+                return
+            log.append(statement)
+            log.parameters.append(parameters)
+
+        event.listen(engine, "before_cursor_execute", _on_execute)
+        try:
+            yield log
+        finally:
+            event.remove(engine, "before_cursor_execute", _on_execute)
+
+    return _capture
+
+
 @pytest.fixture
 def client(db):
     """Cliente de teste FastAPI. Idempotency usa o mesmo engine do teste para evitar 'no such table'."""
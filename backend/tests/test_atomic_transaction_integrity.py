@@ -49,12 +49,12 @@ class TestTransactionServiceRollbackOnFailure:
     def test_create_transaction_rollback_when_sync_raises(
         self, db, test_user, test_account, test_category
     ):
-        """Se sync_account_balance_from_ledger levantar após ledger.append, rollback total."""
+        """Se apply_balance_deltas levantar após ledger.append, rollback total."""
         count_t_before = db.query(Transaction).count()
         count_l_before = db.query(LedgerEntry).count()
 
         with patch(
-            "services.transaction_service.sync_account_balance_from_ledger",
+            "services.transaction_service.apply_balance_deltas",
             side_effect=RuntimeError("Simulando falha no sync"),
         ):
             from fastapi import HTTPException
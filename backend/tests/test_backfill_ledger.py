@@ -0,0 +1,185 @@
+"""
+Backfill do ledger em streaming (scripts/backfill_ledger.py).
+Lotes por keyset (created_at, id), anti-join no SQL, INSERT por lote, cursor de retomada em arquivo
+e sincronização de saldo uma vez por conta tocada.
+"""
+import json
+from datetime import datetime
+
+import pytest
+
+from models import Account, LedgerEntry, Transaction
+from core.ledger_utils import get_balance_from_ledger
+from scripts.backfill_ledger import backfill_ledger
+
+
+def _tx(
+    db, user_id, account_id, category_id, tx_type, amount, description="Legado", created_at=None,
+    transfer_transaction_id=None,
+):
+    t = Transaction(
+        date=datetime(2024, 1, 10),
+        account_id=account_id,
+        category_id=category_id,
+        type=tx_type,
+        amount=amount,
+        description=description,
+        user_id=user_id,
+        created_at=created_at,
+        transfer_transaction_id=transfer_transaction_id,
+    )
+    db.add(t)
+    db.flush()
+    return t
+
+
+@pytest.fixture
+def legacy_data(db, test_user, test_category):
+    """Transações sem entradas no ledger (ex.: dados anteriores ao ledger)."""
+    a = Account(name="Corrente", type="checking", balance=0, user_id=test_user.id)
+    b = Account(name="Poupança", type="savings", balance=0, user_id=test_user.id)
+    db.add_all([a, b])
+    db.flush()
+    uid, cid = test_user.id, test_category.id
+    txs = [
+        _tx(db, uid, a.id, cid, "income", 500, created_at=datetime(2024, 1, 1, 10)),
+        _tx(db, uid, a.id, cid, "expense", 120, created_at=datetime(2024, 1, 2, 10)),
+        _tx(db, uid, a.id, cid, "expense", 30, created_at=datetime(2024, 1, 2, 10)),
+    ]
+    # Como em TransactionService._create_transfer: saída inserida, entrada já pareada, saída atualizada
+    # Descrições sem marcador de direção: a direção sai só do pareamento
+    out = _tx(db, uid, a.id, cid, "transfer", 100, "Reserva", datetime(2024, 1, 3, 10))
+    inc = _tx(
+        db, uid, b.id, cid, "transfer", 100, "Reserva", datetime(2024, 1, 3, 10),
+        transfer_transaction_id=out.id,
+    )
+    out.transfer_transaction_id = inc.id
+    db.commit()
+    return a, b, txs + [out, inc]
+
+
+class TestBackfillLedger:
+    def test_backfill_in_batches_and_sync_once(self, db, legacy_data, tmp_path):
+        """Lotes pequenos: todas as transações entram no ledger; saldos sincronizados."""
+        a, b, txs = legacy_data
+        cursor_file = str(tmp_path / "cursor.json")
+        stats = backfill_ledger(batch_size=2, cursor_file=cursor_file, db=db)
+
+        assert stats["created"] == len(txs)
+        assert stats["batches"] == 3
+        assert stats["synced"] == 2
+        assert get_balance_from_ledger(a.id, db) == pytest.approx(250.0)
+        assert get_balance_from_ledger(b.id, db) == pytest.approx(100.0)
+        db.expire_all()
+        assert float(db.query(Account).get(a.id).balance) == pytest.approx(250.0)
+        with open(cursor_file, encoding="utf-8") as fh:
+            cursor = json.load(fh)
+        assert cursor["last_id"] == max(txs[-2:], key=lambda t: t.id).id
+        assert cursor["pending_sync"] == []
+
+    def test_rerun_is_idempotent(self, db, legacy_data, tmp_path):
+        """Anti-join: segunda execução (mesmo do zero) não duplica entradas."""
+        _, _, txs = legacy_data
+        backfill_ledger(batch_size=10, cursor_file=None, db=db)
+        stats = backfill_ledger(batch_size=10, cursor_file=None, db=db)
+        assert stats["processed"] == 0
+        assert db.query(LedgerEntry).count() == len(txs)
+
+    def test_resume_from_cursor(self, db, legacy_data, tmp_path):
+        """Cursor salvo: transações até o cursor (created_at, id) não são reprocessadas."""
+        _, _, txs = legacy_data
+        first = txs[0]
+        cursor_file = tmp_path / "cursor.json"
+        cursor_file.write_text(json.dumps({
+            "last_id": first.id,
+            "last_created_at": first.created_at.isoformat(),
+            "pending_sync": [],
+        }))
+        stats = backfill_ledger(batch_size=2, cursor_file=str(cursor_file), db=db)
+        assert stats["created"] == len(txs) - 1
+        assert db.query(LedgerEntry).filter(LedgerEntry.transaction_id == first.id).count() == 0
+
+        stats = backfill_ledger(batch_size=2, cursor_file=str(cursor_file), reset=True, db=db)
+        assert stats["created"] == 1
+
+    def test_pending_sync_survives_interruption(self, db, legacy_data, tmp_path, monkeypatch):
+        """Falha na sincronização final: contas tocadas ficam no cursor e são sincronizadas na próxima execução."""
+        import scripts.backfill_ledger as backfill
+
+        a, b, _ = legacy_data
+        cursor_file = str(tmp_path / "cursor.json")
+
+        def _boom(account_id, db):
+            raise RuntimeError("interrompido")
+
+        monkeypatch.setattr(backfill, "sync_account_balance_from_ledger", _boom)
+        with pytest.raises(RuntimeError):
+            backfill_ledger(batch_size=2, cursor_file=cursor_file, db=db)
+        with open(cursor_file, encoding="utf-8") as fh:
+            assert sorted(json.load(fh)["pending_sync"]) == sorted([a.id, b.id])
+
+        monkeypatch.undo()
+        stats = backfill_ledger(batch_size=2, cursor_file=cursor_file, db=db)
+        assert stats["created"] == 0
+        assert stats["synced"] == 2
+        db.expire_all()
+        assert float(db.query(Account).get(b.id).balance) == pytest.approx(100.0)
+
+    def test_transfer_direction_from_paired_ledger_entry(self, db, test_user, legacy_data):
+        """
+        Perna já no ledger (ex.: backfill parcial): a outra recebe o sinal oposto, mesmo com
+        descrições editadas que sugerem o contrário.
+        """
+        a, b, txs = legacy_data
+        out, inc = txs[-2:]
+        db.query(Transaction).filter(Transaction.id == out.id).update(
+            {"description": "Reserva ← editada"}, synchronize_session=False
+        )
+        db.query(Transaction).filter(Transaction.id == inc.id).update(
+            {"description": "Reserva → editada"}, synchronize_session=False
+        )
+        db.add(LedgerEntry(
+            user_id=test_user.id, account_id=a.id, transaction_id=out.id, amount=-100, entry_type="debit",
+        ))
+        db.commit()
+        backfill_ledger(batch_size=10, cursor_file=None, db=db)
+        assert float(get_balance_from_ledger(a.id, db)) == pytest.approx(250.0)
+        assert float(get_balance_from_ledger(b.id, db)) == pytest.approx(100.0)
+
+    def test_failed_batch_is_not_skipped_on_resume(self, db, legacy_data, tmp_path, monkeypatch):
+        """Lote com erro: o cursor gravado fica antes dele e a próxima execução o processa."""
+        import scripts.backfill_ledger as backfill
+
+        a, b, txs = legacy_data
+        cursor_file = str(tmp_path / "cursor.json")
+        original = backfill.LedgerRepository.append_many
+        calls = []
+
+        def _fail_second(self, entries):
+            calls.append(1)
+            if len(calls) == 2:
+                raise ValueError("lote inválido")
+            return original(self, entries)
+
+        monkeypatch.setattr(backfill.LedgerRepository, "append_many", _fail_second)
+        stats = backfill_ledger(batch_size=2, cursor_file=cursor_file, db=db)
+        assert stats["errors"] == 2
+        assert stats["created"] == len(txs) - 2
+        with open(cursor_file, encoding="utf-8") as fh:
+            # Só o primeiro lote (keyset created_at, id) foi gravado antes da falha
+            first_batch = sorted(txs, key=lambda t: (t.created_at, t.id))[:2]
+            assert json.load(fh)["last_id"] == first_batch[-1].id
+
+        monkeypatch.undo()
+        stats = backfill_ledger(batch_size=2, cursor_file=cursor_file, db=db)
+        assert stats["created"] == 2
+        assert db.query(LedgerEntry).count() == len(txs)
+        assert float(get_balance_from_ledger(a.id, db)) == pytest.approx(250.0)
+
+    def test_dry_run_writes_nothing(self, db, legacy_data, tmp_path):
+        _, _, txs = legacy_data
+        cursor_file = tmp_path / "cursor.json"
+        stats = backfill_ledger(dry_run=True, batch_size=2, cursor_file=str(cursor_file), db=db)
+        assert stats["created"] == len(txs)
+        assert db.query(LedgerEntry).count() == 0
+        assert not cursor_file.exists()
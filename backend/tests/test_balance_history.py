@@ -0,0 +1,188 @@
+"""
+Séries históricas de saldo: GET /api/accounts/{id}/balance-history e GET /api/reports/wealth-history.
+Garante: pontos batem com o SUM do ledger até cada data; snapshots usados como checkpoint;
+cache invalidado por escrita (row_version).
+"""
+import pytest
+from datetime import date, datetime
+
+from models import Account, LedgerEntry
+from services.balance_snapshot_service import (
+    balance_at,
+    balances_at,
+    compute_monthly_snapshots,
+    get_balance_from_ledger_until,
+)
+from services.balance_history_service import (
+    get_account_balance_history,
+    get_wealth_history,
+    _history_cache,
+)
+from services.report_service import get_wealth_evolution
+from services.transaction_service import TransactionService
+
+
+@pytest.fixture(autouse=True)
+def _clear_history_cache():
+    _history_cache.clear()
+    yield
+    _history_cache.clear()
+
+
+def _entry(db, user_id, account_id, amount, created_at):
+    db.add(LedgerEntry(
+        user_id=user_id,
+        account_id=account_id,
+        amount=amount,
+        entry_type="credit" if amount > 0 else "debit",
+        created_at=created_at,
+    ))
+
+
+class TestAccountBalanceHistory:
+    """Série por conta a partir de snapshots + deltas."""
+
+    def test_monthly_points_match_ledger(self, db, test_user, test_account):
+        """Cada ponto mensal == SUM do ledger até o fim do dia do ponto."""
+        _entry(db, test_user.id, test_account.id, 100.0, datetime(2020, 1, 10))
+        _entry(db, test_user.id, test_account.id, -40.0, datetime(2020, 2, 15))
+        _entry(db, test_user.id, test_account.id, 15.0, datetime(2020, 4, 1, 8, 0))
+        db.commit()
+        compute_monthly_snapshots(db, account_id=test_account.id, year=2020, month=1)
+        db.commit()
+
+        data = get_account_balance_history(
+            db, test_user.id, test_account.id, date(2020, 1, 1), date(2020, 4, 15), "month"
+        )
+        dates = [p["date"] for p in data["points"]]
+        assert dates == ["2020-01-31", "2020-02-29", "2020-03-31", "2020-04-15"]
+        for point in data["points"]:
+            until = datetime.fromisoformat(point["date"]).replace(hour=23, minute=59, second=59, microsecond=999999)
+            assert point["balance"] == pytest.approx(
+                get_balance_from_ledger_until(test_account.id, until, db)
+            )
+        assert [p["balance"] for p in data["points"]] == pytest.approx([100.0, 60.0, 60.0, 75.0])
+
+    def test_daily_and_weekly_granularity(self, db, test_user, test_account):
+        """Granularidade diária e semanal: último ponto é sempre end_date."""
+        _entry(db, test_user.id, test_account.id, 10.0, datetime(2020, 3, 2, 12, 0))
+        db.commit()
+        daily = get_account_balance_history(
+            db, test_user.id, test_account.id, date(2020, 3, 1), date(2020, 3, 3), "day"
+        )
+        assert [p["balance"] for p in daily["points"]] == pytest.approx([0.0, 10.0, 10.0])
+        weekly = get_account_balance_history(
+            db, test_user.id, test_account.id, date(2020, 3, 1), date(2020, 3, 12), "week"
+        )
+        assert [p["date"] for p in weekly["points"]] == ["2020-03-01", "2020-03-08", "2020-03-12"]
+
+    def test_cache_invalidated_by_write(self, db, test_user, test_account, test_category):
+        """Nova transação incrementa row_version → série recalculada (não serve valor antigo)."""
+        today = date.today()
+        first = get_account_balance_history(db, test_user.id, test_account.id, today, today, "day")
+        TransactionService.create_transaction(
+            transaction_data={
+                "date": datetime.now(),
+                "category_id": test_category.id,
+                "type": "income",
+                "amount_cents": 5000,
+                "description": "Receita",
+                "tags": [],
+            },
+            account=test_account,
+            user_id=test_user.id,
+            db=db,
+        )
+        db.commit()
+        second = get_account_balance_history(db, test_user.id, test_account.id, today, today, "day")
+        assert second["points"][-1]["balance"] == pytest.approx(first["points"][-1]["balance"] + 50.0)
+
+
+class TestWealthHistory:
+    """Patrimônio = soma das contas ativas."""
+
+    def test_wealth_sums_active_accounts(self, db, test_user, test_account):
+        """Contas ativas somadas; conta inativa ignorada."""
+        other = Account(name="Poupança", type="savings", balance=0, user_id=test_user.id)
+        inactive = Account(name="Antiga", type="cash", balance=0, user_id=test_user.id, is_active=False)
+        db.add_all([other, inactive])
+        db.flush()
+        _entry(db, test_user.id, test_account.id, 100.0, datetime(2020, 1, 10))
+        _entry(db, test_user.id, other.id, 30.0, datetime(2020, 1, 20))
+        _entry(db, test_user.id, inactive.id, 999.0, datetime(2020, 1, 20))
+        db.commit()
+        data = get_wealth_history(db, test_user.id, date(2020, 1, 1), date(2020, 2, 10), "month")
+        assert [p["balance"] for p in data["points"]] == pytest.approx([130.0, 130.0])
+
+    def test_opening_balance_queries_do_not_grow_with_accounts(self, db, test_user, count_statements):
+        """
+        Abertura de todas as contas via balances_at (checkpoint + delta agrupados por conta):
+        mesmo resultado de balance_at por conta e o mesmo número de statements para 2 ou 6 contas.
+        """
+        accounts = [
+            Account(name=f"Conta {i}", type="checking", balance=0, user_id=test_user.id)
+            for i in range(6)
+        ]
+        db.add_all(accounts)
+        db.flush()
+        for i, account in enumerate(accounts):
+            _entry(db, test_user.id, account.id, 10.0 * (i + 1), datetime(2020, 1, 10))
+            _entry(db, test_user.id, account.id, -1.0, datetime(2020, 3, 5))
+        db.commit()
+        # Checkpoint só para metade das contas: as outras somam o ledger desde o início
+        for account in accounts[:3]:
+            compute_monthly_snapshots(db, account_id=account.id, year=2020, month=1)
+        db.commit()
+
+        ts = datetime(2020, 3, 31, 23, 59, 59)
+        expected = {a.id: pytest.approx(balance_at(a.id, ts, db)) for a in accounts}
+        assert {aid: float(v) for aid, v in balances_at([a.id for a in accounts], ts, db).items()} == expected
+
+        def opening_statements(account_ids):
+            with count_statements(db) as statements:
+                balances_at(account_ids, ts, db)
+            return len(statements)
+
+        assert opening_statements([a.id for a in accounts[2:4]]) == opening_statements([a.id for a in accounts]) == 2
+
+    def test_report_service_wealth_evolution(self, db, test_user, test_account):
+        """report_service.get_wealth_evolution: um ponto por mês, último = hoje com o saldo atual."""
+        points = get_wealth_evolution(test_user.id, 3, db)
+        assert len(points) == 3
+        assert points[-1] == {"date": date.today().isoformat(), "total_balance": pytest.approx(1000.0)}
+
+
+class TestBalanceHistoryApi:
+    """Endpoints HTTP."""
+
+    def test_account_balance_history_endpoint(self, client, auth_headers, test_account):
+        response = client.get(
+            f"/api/accounts/{test_account.id}/balance-history",
+            params={"granularity": "month"},
+            headers=auth_headers,
+        )
+        assert response.status_code == 200
+        body = response.json()
+        assert body["account_id"] == test_account.id
+        assert body["points"][-1]["balance_str"] == "1000.00"
+
+    def test_account_balance_history_not_found(self, client, auth_headers):
+        response = client.get("/api/accounts/nao-existe/balance-history", headers=auth_headers)
+        assert response.status_code == 404
+
+    def test_wealth_history_endpoint(self, client, auth_headers, test_account):
+        response = client.get(
+            "/api/reports/wealth-history",
+            params={"granularity": "week", "start_date": date.today().isoformat()},
+            headers=auth_headers,
+        )
+        assert response.status_code == 200
+        assert response.json()["points"][-1]["balance"] == pytest.approx(1000.0)
+
+    def test_invalid_range_returns_400(self, client, auth_headers):
+        response = client.get(
+            "/api/reports/wealth-history",
+            params={"granularity": "day", "start_date": "2000-01-01", "end_date": "2020-01-01"},
+            headers=auth_headers,
+        )
+        assert response.status_code == 400
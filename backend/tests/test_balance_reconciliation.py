@@ -0,0 +1,141 @@
+"""
+Conciliação de saldos (services/balance_reconciliation_service.py, scripts/reconcile_balances.py).
+Armazenado x ledger x transações por SQL agregado; correção em lote condicionada ao row_version.
+"""
+import csv
+import json
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import update
+
+from models import Account, LedgerEntry, Transaction
+from services.transaction_service import TransactionService
+from services.balance_reconciliation_service import (
+    reconcile_all_balances,
+    write_report,
+)
+
+
+def _new_account(db, user_id, name):
+    account = Account(name=name, type="checking", balance=0, user_id=user_id)
+    db.add(account)
+    db.commit()
+    db.refresh(account)
+    return account
+
+
+def _create(db, account, user_id, category_id, tx_type, cents, to_account_id=None):
+    data = {
+        "date": datetime.now(),
+        "category_id": category_id,
+        "type": tx_type,
+        "amount_cents": cents,
+        "description": "Movimento",
+        "tags": [],
+    }
+    if to_account_id:
+        data["to_account_id"] = to_account_id
+    TransactionService.create_transaction(
+        transaction_data=data, account=account, user_id=user_id, db=db
+    )
+    db.commit()
+
+
+@pytest.fixture
+def funded_accounts(db, test_user, test_category):
+    """Duas contas movimentadas só via TransactionService (ledger = transações = armazenado)."""
+    a = _new_account(db, test_user.id, "Corrente")
+    b = _new_account(db, test_user.id, "Poupança")
+    _create(db, a, test_user.id, test_category.id, "income", 50000)
+    _create(db, a, test_user.id, test_category.id, "expense", 12050)
+    _create(db, a, test_user.id, test_category.id, "transfer", 10000, to_account_id=b.id)
+    return a, b
+
+
+class TestReconcileBalances:
+    def test_consistent_accounts_have_no_discrepancy(self, db, test_account, funded_accounts):
+        """
+        Saldo armazenado, ledger e transações (pernas de transferência e entrada de abertura da
+        test_account) batem: nenhuma divergência.
+        """
+        result = reconcile_all_balances(db)
+        assert result["discrepancies"] == []
+        assert result["checked"] == 3
+
+    def test_transfer_direction_ignores_edited_description(self, db, funded_accounts):
+        """Descrições das pernas trocadas pelo usuário não invertem a direção da transferência."""
+        a, b = funded_accounts
+        legs = db.query(Transaction).filter(Transaction.type == "transfer").all()
+        for leg in legs:
+            leg.description = "Transferência ← editada" if leg.account_id == a.id else "Transferência → editada"
+        db.commit()
+        assert reconcile_all_balances(db)["discrepancies"] == []
+
+    def test_transaction_without_ledger_entry_is_reported(self, db, funded_accounts):
+        """Ledger sem a entrada de uma perna: armazenado = ledger, transações divergem."""
+        a, b = funded_accounts
+        leg_in = db.query(Transaction).filter(
+            Transaction.type == "transfer", Transaction.account_id == b.id
+        ).one()
+        db.query(LedgerEntry).filter(LedgerEntry.transaction_id == leg_in.id).delete()
+        db.execute(update(Account.__table__).where(Account.__table__.c.id == b.id).values(balance=0))
+        db.commit()
+
+        [item] = reconcile_all_balances(db)["discrepancies"]
+        assert item["account_id"] == b.id
+        assert item["stored_diff"] == Decimal("0")
+        assert item["transactions_diff"] == Decimal("100.00")
+
+    def test_reports_and_fixes_stored_divergence(self, db, funded_accounts):
+        """Saldo armazenado corrompido: reportado; --fix grava o saldo do ledger e incrementa row_version."""
+        a, _ = funded_accounts
+        version = a.row_version
+        db.execute(update(Account.__table__).where(Account.__table__.c.id == a.id).values(balance=1.0))
+        db.commit()
+
+        report = reconcile_all_balances(db)
+        [item] = [d for d in report["discrepancies"] if d["account_id"] == a.id]
+        assert item["ledger_balance"] == Decimal("279.50")
+        assert item["stored_diff"] == Decimal("1.00") - Decimal("279.50")
+        assert item["fixed"] is False
+
+        fixed = reconcile_all_balances(db, fix=True, batch_size=1)
+        assert fixed["fixed"] == 1
+        assert fixed["batches"] == 2
+        db.expire_all()
+        account = db.query(Account).filter(Account.id == a.id).one()
+        assert Decimal(str(account.balance)) == Decimal("279.50")
+        assert account.row_version == version + 1
+        assert reconcile_all_balances(db)["discrepancies"] == []
+
+
+class TestReconcileReport:
+    @pytest.fixture
+    def discrepancies(self):
+        return [{
+            "account_id": "acc-1",
+            "user_id": "user-1",
+            "stored_balance": Decimal("10"),
+            "ledger_balance": Decimal("12.5"),
+            "transactions_balance": Decimal("12.5"),
+            "stored_diff": Decimal("-2.5"),
+            "transactions_diff": Decimal("0"),
+            "fixed": False,
+        }]
+
+    def test_csv_report(self, tmp_path, discrepancies):
+        path = tmp_path / "report.csv"
+        assert write_report(discrepancies, str(path)) == "csv"
+        with open(path, encoding="utf-8") as fh:
+            rows = list(csv.DictReader(fh))
+        assert rows[0]["ledger_balance"] == "12.50"
+        assert rows[0]["stored_diff"] == "-2.50"
+
+    def test_json_report(self, tmp_path, discrepancies):
+        path = tmp_path / "report.json"
+        assert write_report(discrepancies, str(path)) == "json"
+        data = json.loads(path.read_text(encoding="utf-8"))
+        assert data[0]["account_id"] == "acc-1"
+        assert data[0]["stored_balance"] == "10.00"
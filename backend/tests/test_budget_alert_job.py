@@ -10,6 +10,7 @@ from database import SessionLocal
 from models import User, Category, Transaction, AutomationRule, Notification, Account
 from auth_utils import get_password_hash
 from core.recurring_job import execute_budget_alerts
+from repositories.monthly_totals_repository import rebuild_monthly_totals
 
 
 def test_execute_budget_alerts_runs_without_error():
@@ -73,6 +74,8 @@ def test_budget_alert_creates_notification_when_over_limit():
         )
         db.add(t)
         db.commit()
+        rebuild_monthly_totals(db, user.id)
+        db.commit()
 
         count_before = (
             db.query(Notification)
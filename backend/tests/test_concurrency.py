@@ -69,7 +69,7 @@ class TestServiceReturns409OnConflict:
     def test_create_transaction_returns_409_on_concurrency_conflict(self, db, test_user, test_account, test_category):
         """Se sync levantar ConcurrencyConflictError, create_transaction retorna HTTP 409."""
         # Patchar no módulo que usa (transaction_service importa de core.ledger_utils)
-        with patch("services.transaction_service.sync_account_balance_from_ledger", side_effect=ConcurrencyConflictError("Conflito")):
+        with patch("services.transaction_service.apply_balance_deltas", side_effect=ConcurrencyConflictError("Conflito")):
             with pytest.raises(HTTPException) as exc_info:
                 TransactionService.create_transaction(
                     transaction_data={
@@ -4,7 +4,9 @@ Requer PostgreSQL real (DATABASE_URL). Valida:
 - Não duplicar dinheiro em criação concorrente
 - Saldo limitado: apenas uma transferência concorrente deve vencer
 - Update vs Delete concorrente: estado final consistente
+- Group commit na mesma conta vs caminho atual (consistência + tempo total)
 """
+import time
 from decimal import Decimal
 
 import pytest
@@ -16,6 +18,7 @@ from sqlalchemy.orm import Session
 from models import Transaction, LedgerEntry, Account
 from services.transaction_service import TransactionService
 from core.ledger_utils import get_balance_from_ledger
+from core.database_utils import run_with_conflict_retry
 
 from tests.helpers_postgres import (
     create_test_user_account_category,
@@ -425,3 +428,65 @@ def test_concurrent_update_vs_delete_consistent_final_state(
         ) < Decimal("0.000001"), "Invariante: account.balance == SUM(ledger_entries.amount)"
     finally:
         cleanup_test_user(postgres_db, user.id)
+
+
+# --- 1.4 Group commit (TX_GROUP_COMMIT) vs caminho atual na mesma conta ---
+
+
+def _worker_create_expense(session_factory, user_id, account_id, category_id, coalesced, index):
+    """Worker: uma despesa de 1,00 na conta quente, pelo caminho direto ou pelo group commit."""
+    db: Session = session_factory()
+    try:
+        account = db.query(Account).filter(Account.id == account_id).first()
+        transaction_data = {
+            "date": datetime.now(),
+            "category_id": category_id,
+            "type": "expense",
+            "amount_cents": 100,
+            "description": f"Conta quente {index}",
+            "tags": [],
+        }
+        if coalesced:
+            return TransactionService.create_transaction_coalesced(transaction_data, account, user_id, db).id
+        return run_with_conflict_retry(
+            db,
+            lambda: TransactionService.create_transaction(
+                transaction_data=transaction_data, account=account, user_id=user_id, db=db
+            ).id,
+        )
+    finally:
+        db.close()
+
+
+@pytest.mark.requires_postgres
+@pytest.mark.parametrize("coalesced", [False, True], ids=["direct", "group_commit"])
+def test_concurrent_creates_on_hot_account(postgres_db, postgres_session_factory, coalesced):
+    """
+    1.4 24 despesas concorrentes na mesma conta: cada chamador recebe a própria transação e
+    account.balance == SUM(ledger). Imprime o tempo total dos dois caminhos (benchmark:
+    pytest -s -k hot_account com DATABASE_URL de PostgreSQL).
+    """
+    n = 24
+    user, account, category = create_test_user_account_category(postgres_db, account_balance=1000.0)
+    try:
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=n) as executor:
+            futures = [
+                executor.submit(
+                    _worker_create_expense,
+                    postgres_session_factory, user.id, account.id, category.id, coalesced, i,
+                )
+                for i in range(n)
+            ]
+            ids = [f.result() for f in futures]
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        print(f"\n{'group_commit' if coalesced else 'direct'}: {n} escritas em {elapsed_ms:.1f} ms")
+
+        assert len(set(ids)) == n
+        postgres_db.expire_all()
+        account_refresh = postgres_db.query(Account).filter(Account.id == account.id).first()
+        ledger_balance = get_balance_from_ledger(account.id, postgres_db)
+        assert Decimal(str(ledger_balance)) == Decimal("976.00")
+        assert account_refresh.balance == Decimal(str(ledger_balance))
+    finally:
+        cleanup_test_user(postgres_db, user.id)
@@ -0,0 +1,130 @@
+"""
+Retentativa em conflito de concorrência (run_with_conflict_retry): a escrita é refeita do zero
+após rollback (backoff com jitter) e só vira HTTP 409 quando as tentativas se esgotam.
+"""
+import asyncio
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+import core.database_utils as database_utils
+import services.transaction_service as transaction_service
+from core.ledger_utils import ConcurrencyConflictError, get_balance_from_ledger
+from models import Account, LedgerEntry, Transaction
+
+
+@pytest.fixture(autouse=True)
+def _no_backoff(monkeypatch):
+    monkeypatch.setattr(database_utils, "TX_CONFLICT_BACKOFF_BASE_MS", 0)
+
+
+def _conflict_first(monkeypatch, failures):
+    """apply_balance_deltas falha com ConcurrencyConflictError nas `failures` primeiras chamadas."""
+    original = transaction_service.apply_balance_deltas
+    calls = {"n": 0}
+
+    def flaky(deltas, db):
+        calls["n"] += 1
+        if calls["n"] <= failures:
+            raise ConcurrencyConflictError("row_version mudou")
+        return original(deltas, db)
+
+    monkeypatch.setattr(transaction_service, "apply_balance_deltas", flaky)
+    return calls
+
+
+def _payload(account_id, category_id, cents=2500):
+    return {
+        "date": datetime(2024, 5, 10, 9, 0).isoformat(),
+        "account_id": account_id,
+        "category_id": category_id,
+        "type": "expense",
+        "amount_cents": cents,
+        "description": "Padaria",
+        "tags": ["cafe"],
+    }
+
+
+class TestConflictRetry:
+    def test_create_succeeds_after_transient_conflict(
+        self, client, auth_headers, db, test_account, test_category, monkeypatch
+    ):
+        calls = _conflict_first(monkeypatch, failures=1)
+        response = client.post(
+            "/api/transactions/", json=_payload(test_account.id, test_category.id), headers=auth_headers
+        )
+        assert response.status_code == 200, response.text
+        assert calls["n"] == 2
+
+        db.expire_all()
+        assert db.query(Transaction).filter(Transaction.account_id == test_account.id).count() == 1
+        assert db.query(LedgerEntry).filter(LedgerEntry.account_id == test_account.id).count() == 2  # abertura + despesa
+        assert Decimal(str(get_balance_from_ledger(test_account.id, db))) == Decimal("975.00")
+        assert Decimal(str(db.query(Account).get(test_account.id).balance)) == Decimal("975.00")
+
+    def test_exhausted_attempts_return_409_without_writes(
+        self, client, auth_headers, db, test_account, test_category, monkeypatch
+    ):
+        monkeypatch.setattr(database_utils, "TX_CONFLICT_MAX_ATTEMPTS", 2)
+        calls = _conflict_first(monkeypatch, failures=10)
+        response = client.post(
+            "/api/transactions/", json=_payload(test_account.id, test_category.id), headers=auth_headers
+        )
+        assert response.status_code == 409
+        assert calls["n"] == 2
+
+        db.expire_all()
+        assert db.query(Transaction).filter(Transaction.account_id == test_account.id).count() == 0
+        assert Decimal(str(db.query(Account).get(test_account.id).balance)) == Decimal("1000.00")
+
+    def test_delete_retries_and_reverts_once(
+        self, client, auth_headers, db, test_account, test_category, monkeypatch
+    ):
+        created = client.post(
+            "/api/transactions/", json=_payload(test_account.id, test_category.id), headers=auth_headers
+        ).json()
+        _conflict_first(monkeypatch, failures=1)
+        response = client.delete(f"/api/transactions/{created['id']}", headers=auth_headers)
+        assert response.status_code == 200, response.text
+
+        db.expire_all()
+        assert Decimal(str(get_balance_from_ledger(test_account.id, db))) == Decimal("1000.00")
+        assert Decimal(str(db.query(Account).get(test_account.id).balance)) == Decimal("1000.00")
+
+    def test_backoff_runs_outside_the_event_loop(
+        self, client, auth_headers, db, test_account, test_category, monkeypatch
+    ):
+        """Retentativa (e o time.sleep do backoff) roda no threadpool: não bloqueia o event loop."""
+        sleeps = []
+
+        def recording_sleep(seconds):
+            try:
+                asyncio.get_running_loop()
+                sleeps.append("event_loop")
+            except RuntimeError:
+                sleeps.append("thread")
+
+        monkeypatch.setattr(database_utils.time, "sleep", recording_sleep)
+        _conflict_first(monkeypatch, failures=1)
+        created = client.post(
+            "/api/transactions/", json=_payload(test_account.id, test_category.id), headers=auth_headers
+        )
+        assert created.status_code == 200, created.text
+        _conflict_first(monkeypatch, failures=1)
+        response = client.request(
+            "DELETE", "/api/transactions/", json={"ids": [created.json()["id"]]}, headers=auth_headers
+        )
+        assert response.status_code == 200, response.text
+        assert sleeps == ["thread", "thread"]
+
+    def test_non_conflict_errors_are_not_retried(self, db, monkeypatch):
+        calls = {"n": 0}
+
+        def boom():
+            calls["n"] += 1
+            raise ValueError("erro de negócio")
+
+        with pytest.raises(ValueError):
+            database_utils.run_with_conflict_retry(db, boom, max_attempts=3)
+        assert calls["n"] == 1
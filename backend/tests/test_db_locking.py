@@ -312,3 +312,42 @@ def test_lock_prolonged_concurrent_request_gets_409_or_waits(
         assert count <= 1
     finally:
         cleanup_test_user(postgres_db, user.id)
+
+
+@pytest.mark.requires_postgres
+def test_lock_accounts_for_write_two_statements(postgres_db, count_statements):
+    """Advisory locks de N contas em um statement + FOR UPDATE em outro; contas devolvidas recarregadas."""
+    from sqlalchemy import text
+    from db.locks import lock_accounts_for_write
+
+    user, account_a, _ = create_test_user_account_category(postgres_db, account_balance=100.0)
+    account_b = create_second_account(postgres_db, user.id, balance=0.0)
+    try:
+        with count_statements(postgres_db) as statements:
+            locked = lock_accounts_for_write([account_b.id, account_a.id, account_a.id], postgres_db)
+        assert len(statements) == 2
+        assert set(locked) == {account_a.id, account_b.id}
+
+        held = postgres_db.execute(text(
+            "SELECT count(*) FROM pg_locks WHERE locktype = 'advisory' AND pid = pg_backend_pid()"
+        )).scalar()
+        assert held == 2
+        postgres_db.rollback()
+    finally:
+        cleanup_test_user(postgres_db, user.id)
+
+
+def test_lock_accounts_for_write_sqlite_returns_owned_fresh_rows(db, test_user, test_account, second_user):
+    """SQLite: sem advisory lock; um SELECT devolve as contas (filtro por usuário) com valores atuais."""
+    from sqlalchemy import update
+    from db.locks import lock_accounts_for_write
+
+    other = Account(name="Outra", type="checking", balance=0, user_id=second_user.id)
+    db.add(other)
+    db.commit()
+    db.execute(update(Account.__table__).where(Account.__table__.c.id == test_account.id).values(balance=42))
+
+    locked = lock_accounts_for_write([other.id, test_account.id], db, user_id=test_user.id)
+    assert list(locked) == [test_account.id]
+    assert locked[test_account.id] is test_account
+    assert float(test_account.balance) == 42.0
@@ -56,6 +56,58 @@ class TestLedgerBalanceInvariant:
         assert abs(float(ledger_balance) - float(test_account.balance)) < 1e-6
 
 
+class TestIncrementalBalanceInvariant:
+    """Saldo incremental (delta) mantém account.balance == SUM(ledger) sem recalcular o histórico."""
+
+    def test_delta_path_matches_ledger_after_create_update_delete(self, db, test_user, test_account, test_category):
+        """Criar, editar e excluir transação: balance incremental sempre igual ao SUM do ledger."""
+        tx = TransactionService.create_transaction(
+            transaction_data={
+                "date": datetime.now(),
+                "category_id": test_category.id,
+                "type": "expense",
+                "amount_cents": 12345,
+                "description": "Despesa delta",
+                "tags": [],
+            },
+            account=test_account,
+            user_id=test_user.id,
+            db=db,
+        )
+        db.commit()
+        db.refresh(test_account)
+        assert test_account.balance == get_balance_from_ledger(test_account.id, db)
+
+        TransactionService.update_transaction(
+            db_transaction=tx,
+            update_data={"type": "income", "amount_cents": 5000},
+            old_account=test_account,
+            new_account=test_account,
+            user_id=test_user.id,
+            db=db,
+        )
+        db.commit()
+        db.refresh(test_account)
+        assert test_account.balance == get_balance_from_ledger(test_account.id, db)
+
+        TransactionService.delete_transaction(tx, test_account, test_user.id, db, hard=True)
+        db.commit()
+        db.refresh(test_account)
+        assert test_account.balance == get_balance_from_ledger(test_account.id, db)
+        assert float(test_account.balance) == pytest.approx(1000.0)
+
+    def test_verify_mode_resyncs_divergent_balance(self, db, test_user, test_account):
+        """Com verify=True, divergência entre balance e ledger é corrigida para o SUM do ledger."""
+        from core.ledger_utils import apply_balance_delta
+        test_account.balance = Decimal("999999.00")  # drift artificial
+        db.commit()
+        balance = apply_balance_delta(test_account.id, Decimal("0"), db, verify=True)
+        db.commit()
+        db.refresh(test_account)
+        assert balance == get_balance_from_ledger(test_account.id, db)
+        assert test_account.balance == balance
+
+
 class TestTransferNetZeroInvariant:
     """Invariante: transferência não cria dinheiro — soma das duas entradas de ledger = 0."""
 
@@ -236,3 +288,36 @@ class TestLedgerAppendOnly:
         assert "update" not in repo_methods and "delete" not in repo_methods
         assert "append" in repo_methods
         assert "get_entries_by_account" in repo_methods or "get_entries_by_transaction" in repo_methods
+
+
+class TestLedgerAppendMany:
+    """append_many: lote validado em memória; tudo ou nada."""
+
+    def test_append_many_inserts_all_and_tracks_deltas(self, db, test_user, test_account):
+        """Lote válido: todas as entradas gravadas e delta por conta acumulado."""
+        from repositories.ledger_repository import LedgerRepository
+        before = db.query(LedgerEntry).filter(LedgerEntry.account_id == test_account.id).count()
+        ledger = LedgerRepository(db)
+        rows = ledger.append_many([
+            {"user_id": test_user.id, "account_id": test_account.id, "amount": Decimal("10.00"), "entry_type": "credit"},
+            {"user_id": test_user.id, "account_id": test_account.id, "amount": Decimal("-3.50"), "entry_type": "debit"},
+        ])
+        db.commit()
+        assert len(rows) == 2 and all(r["id"] for r in rows)
+        after = db.query(LedgerEntry).filter(LedgerEntry.account_id == test_account.id).count()
+        assert after == before + 2
+        assert ledger.pop_balance_deltas() == {test_account.id: Decimal("6.50")}
+        assert ledger.pop_balance_deltas() == {}
+
+    def test_append_many_invalid_sign_inserts_nothing(self, db, test_user, test_account):
+        """Uma entrada com sinal inválido rejeita o lote inteiro antes de gravar."""
+        from repositories.ledger_repository import LedgerRepository
+        before = db.query(LedgerEntry).count()
+        ledger = LedgerRepository(db)
+        with pytest.raises(ValueError):
+            ledger.append_many([
+                {"user_id": test_user.id, "account_id": test_account.id, "amount": Decimal("10.00"), "entry_type": "credit"},
+                {"user_id": test_user.id, "account_id": test_account.id, "amount": Decimal("5.00"), "entry_type": "debit"},
+            ])
+        assert db.query(LedgerEntry).count() == before
+        assert ledger.pop_balance_deltas() == {}
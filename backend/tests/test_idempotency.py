@@ -125,7 +125,7 @@ def test_retry_after_simulated_failure_no_duplicate_ledger_or_transaction(
         # Primeira chamada: falha após ledger.append (sync levanta); service converte em HTTP 500
         from fastapi import HTTPException
         with patch(
-            "services.transaction_service.sync_account_balance_from_ledger",
+            "services.transaction_service.apply_balance_deltas",
             side_effect=RuntimeError("Simulando falha após ledger.append"),
         ):
             with pytest.raises(HTTPException) as exc_info:
@@ -211,12 +211,12 @@ def test_timeout_retry_no_duplication_commit_once(
             call_count[0] += 1
             if call_count[0] == 1:
                 raise RuntimeError("Simulando timeout após flush")
-            from core.ledger_utils import sync_account_balance_from_ledger as real_sync
+            from core.ledger_utils import apply_balance_deltas as real_sync
             return real_sync(*args, **kwargs)
 
         from fastapi import HTTPException
         with patch(
-            "services.transaction_service.sync_account_balance_from_ledger",
+            "services.transaction_service.apply_balance_deltas",
             side_effect=sync_raise_once,
         ):
             with pytest.raises(HTTPException) as exc_info:
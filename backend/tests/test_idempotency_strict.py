@@ -130,7 +130,7 @@ def test_retry_after_simulated_exception_fail_before_commit_then_success_one_tra
         # Primeira chamada: falha no sync (antes do commit da transação real)
         from fastapi import HTTPException
         with patch(
-            "services.transaction_service.sync_account_balance_from_ledger",
+            "services.transaction_service.apply_balance_deltas",
             side_effect=RuntimeError("Falha simulada antes do commit"),
         ):
             with pytest.raises(HTTPException) as exc_info:
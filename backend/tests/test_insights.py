@@ -7,6 +7,7 @@ from datetime import date, datetime, timedelta
 import pytest
 
 from models import Transaction, Category, Goal, User, InsightFeedback, UserInsightPreferences
+from repositories.monthly_totals_repository import rebuild_monthly_totals
 from services.insights_service import (
     compute_category_monthly_variation,
     compute_goals_at_risk,
@@ -52,6 +53,9 @@ def _add_expense(db, user_id, account_id, category_id, amount, on_date: date):
     )
     db.add(t)
     db.commit()
+    # Inserção direta no ORM (sem TransactionService): recalcula o rollup mensal
+    rebuild_monthly_totals(db, user_id)
+    db.commit()
 
 
 class TestMonthBounds:
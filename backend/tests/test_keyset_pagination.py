@@ -0,0 +1,106 @@
+"""
+Paginação por cursor (after=<cursor>, header X-Next-Cursor) em transações, notificações e activity feed.
+Páginas sem repetição/salto mesmo com empates de timestamp e inserções no topo; skip continua aceito.
+"""
+from datetime import datetime, timedelta
+
+from models import ActivityFeedItem, Notification, Transaction
+from repositories.activity_feed_repository import list_feed_by_user
+from core.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
+
+
+def _transactions(db, user_id, account_id, category_id, n, base=datetime(2024, 5, 1, 12)):
+    # Pares com a mesma data: o desempate é pelo id
+    for i in range(n):
+        db.add(Transaction(
+            date=base - timedelta(days=i // 2),
+            account_id=account_id,
+            category_id=category_id,
+            type="expense",
+            amount=1,
+            description=f"T{i}",
+            user_id=user_id,
+        ))
+    db.commit()
+
+
+def _walk(client, url, headers, limit):
+    seen, cursor, pages = [], None, 0
+    while True:
+        params = {"limit": limit}
+        if cursor:
+            params["after"] = cursor
+        response = client.get(url, params=params, headers=headers)
+        assert response.status_code == 200, response.text
+        seen.extend(item["id"] for item in response.json())
+        pages += 1
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if not cursor:
+            return seen, pages
+
+
+class TestKeysetPagination:
+    def test_transactions_cursor_walk(self, client, auth_headers, db, test_user, test_account, test_category):
+        _transactions(db, test_user.id, test_account.id, test_category.id, 7)
+        seen, pages = _walk(client, "/api/transactions/", auth_headers, limit=3)
+        assert pages == 3
+        assert len(seen) == len(set(seen)) == 7
+
+        by_offset = client.get("/api/transactions/", params={"limit": 100}, headers=auth_headers).json()
+        assert seen == [t["id"] for t in by_offset]
+
+    def test_new_rows_do_not_shift_pages(self, client, auth_headers, db, test_user, test_account, test_category):
+        """Transação nova no topo entre páginas: a página seguinte continua de onde parou."""
+        _transactions(db, test_user.id, test_account.id, test_category.id, 4)
+        first = client.get("/api/transactions/", params={"limit": 2}, headers=auth_headers)
+        _transactions(db, test_user.id, test_account.id, test_category.id, 1, base=datetime(2024, 6, 1))
+        second = client.get(
+            "/api/transactions/",
+            params={"limit": 2, "after": first.headers[NEXT_CURSOR_HEADER]},
+            headers=auth_headers,
+        )
+        first_ids = [t["id"] for t in first.json()]
+        second_ids = [t["id"] for t in second.json()]
+        assert not set(first_ids) & set(second_ids)
+        assert {t["description"] for t in second.json()} == {"T2", "T3"}
+
+    def test_notifications_and_feed_cursor(self, client, auth_headers, db, test_user):
+        for i in range(5):
+            db.add(Notification(user_id=test_user.id, type="summary", title=f"N{i}"))
+            db.add(ActivityFeedItem(user_id=test_user.id, type="event", title=f"F{i}"))
+        db.commit()
+        seen, pages = _walk(client, "/api/notifications/", auth_headers, limit=2)
+        assert len(seen) == len(set(seen)) == 5
+        assert pages == 3
+
+        feed, after = [], None
+        while True:
+            page = list_feed_by_user(db, test_user.id, limit=2, after=after)
+            feed.extend(i.id for i in page)
+            if len(page) < 2:
+                break
+            after = encode_cursor(page[-1].created_at, page[-1].id)
+        assert len(feed) == len(set(feed)) == 5
+
+    def test_cursor_header_exposed_to_credentialed_cors(
+        self, client, auth_headers, db, test_user, test_account, test_category
+    ):
+        """Com allow_credentials, o navegador ignora expose "*": X-Next-Cursor vai listado."""
+        _transactions(db, test_user.id, test_account.id, test_category.id, 3)
+        response = client.get(
+            "/api/transactions/",
+            params={"limit": 2},
+            headers={**auth_headers, "Origin": "http://localhost:3000"},
+        )
+        assert response.headers["access-control-allow-credentials"] == "true"
+        exposed = [h.strip() for h in response.headers["access-control-expose-headers"].split(",")]
+        assert NEXT_CURSOR_HEADER in exposed
+        assert response.headers[NEXT_CURSOR_HEADER]
+
+    def test_invalid_cursor(self, client, auth_headers):
+        response = client.get("/api/transactions/", params={"after": "nao-e-cursor"}, headers=auth_headers)
+        assert response.status_code == 400
+
+    def test_cursor_roundtrip(self):
+        ts = datetime(2024, 1, 2, 3, 4, 5)
+        assert decode_cursor(encode_cursor(ts, "abc")) == (ts, "abc")
@@ -0,0 +1,54 @@
+"""
+Migração add_tags_user_name_unique sobre dados com tags duplicadas, incluindo transação
+vinculada à tag canônica e à duplicada (colidiria com UNIQUE (transaction_id, tag_id)).
+"""
+import importlib.util
+from pathlib import Path
+
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+from sqlalchemy import create_engine, text
+
+_MIGRATION = Path(__file__).resolve().parent.parent / "alembic" / "versions" / "add_tags_user_name_unique.py"
+
+
+def _load_migration():
+    spec = importlib.util.spec_from_file_location("add_tags_user_name_unique", _MIGRATION)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_merges_duplicate_tags_when_transaction_has_canonical_and_duplicate(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'migration.db'}")
+    with engine.begin() as conn:
+        # Esquema anterior à migração (só o que ela toca)
+        conn.execute(text("CREATE TABLE tags (id VARCHAR PRIMARY KEY, user_id VARCHAR NOT NULL, name VARCHAR(50) NOT NULL)"))
+        conn.execute(text("CREATE INDEX idx_tags_user_name ON tags (user_id, name)"))
+        conn.execute(text(
+            "CREATE TABLE transaction_tags (id VARCHAR PRIMARY KEY, transaction_id VARCHAR NOT NULL, "
+            "tag_id VARCHAR NOT NULL, CONSTRAINT idx_transaction_tags_unique UNIQUE (transaction_id, tag_id))"
+        ))
+        conn.execute(text(
+            "INSERT INTO tags (id, user_id, name) VALUES "
+            "('t1', 'u1', 'casa'), ('t2', 'u1', 'casa'), ('t3', 'u1', 'casa'), ('t4', 'u1', 'lazer')"
+        ))
+        conn.execute(text(
+            "INSERT INTO transaction_tags (id, transaction_id, tag_id) VALUES "
+            "('l1', 'tx1', 't1'), ('l2', 'tx1', 't2'), "  # canônica + duplicada
+            "('l3', 'tx2', 't2'), ('l4', 'tx2', 't3'), "  # duas duplicadas
+            "('l5', 'tx3', 't3'), ('l6', 'tx3', 't4')"
+        ))
+
+        with Operations.context(MigrationContext.configure(conn)):
+            _load_migration().upgrade()
+
+        tags = conn.execute(text("SELECT id FROM tags ORDER BY id")).scalars().all()
+        links = conn.execute(
+            text("SELECT transaction_id, tag_id FROM transaction_tags ORDER BY transaction_id, tag_id")
+        ).all()
+        indexes = {row[1] for row in conn.execute(text("PRAGMA index_list('tags')"))}
+
+    assert tags == ["t1", "t4"]
+    assert [tuple(link) for link in links] == [("tx1", "t1"), ("tx2", "t1"), ("tx3", "t1"), ("tx3", "t4")]
+    assert "uq_tags_user_name" in indexes and "idx_tags_user_name" not in indexes
@@ -0,0 +1,97 @@
+"""
+Leitores mensais com intervalo semiaberto [início, início do mês seguinte) (core.month_range):
+bordas do mês corretas e, no PostgreSQL, planos com index scan (sem Seq Scan) para resumo
+mensal, cashflow e resumo por categoria.
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import text
+
+from core.month_range import MonthRange
+from models import Transaction
+from repositories.monthly_totals_repository import rebuild_monthly_totals
+from repositories.report_repository import ReportRepository
+from repositories.transaction_repository import TransactionRepository
+
+from tests.helpers_postgres import cleanup_test_user, create_test_user_account_category
+
+
+def _add(db, user_id, account_id, category_id, when, amount=10.0, tx_type="expense"):
+    db.add(Transaction(
+        date=when,
+        account_id=account_id,
+        category_id=category_id,
+        type=tx_type,
+        amount=amount,
+        description="Mês",
+        user_id=user_id,
+    ))
+
+
+class TestMonthRange:
+    def test_bounds_and_shift(self):
+        assert MonthRange.of(2024, 12) == (datetime(2024, 12, 1), datetime(2025, 1, 1))
+        assert MonthRange.of(2024, 1).shift(-1) == MonthRange.of(2023, 12)
+        assert MonthRange.containing(datetime(2024, 2, 29, 23, 59)).shift(11) == MonthRange.of(2025, 1)
+        assert MonthRange.of(2024, 4).through(MonthRange.of(2024, 5)).end == datetime(2024, 6, 1)
+
+    def test_monthly_summary_includes_last_day_and_excludes_next_month(
+        self, db, test_user, test_account, test_category
+    ):
+        for when in (
+            datetime(2024, 3, 1, 0, 0),
+            datetime(2024, 3, 31, 23, 30),  # antes: perdida por date <= 31/03
+            datetime(2024, 4, 1, 0, 0),
+            datetime(2024, 2, 29, 23, 59),
+        ):
+            _add(db, test_user.id, test_account.id, test_category.id, when)
+        db.commit()
+
+        rows = TransactionRepository(db).get_monthly_summary(test_user.id, 2024, 3)
+        assert sorted(t.date.day for t in rows) == [1, 31]
+
+
+def _plan(db, statement, parameters) -> str:
+    rows = db.connection().exec_driver_sql("EXPLAIN " + statement, parameters).fetchall()
+    return "\n".join(row[0] for row in rows)
+
+
+@pytest.mark.requires_postgres
+def test_monthly_readers_use_index_scans(postgres_db, count_statements):
+    """
+    Com enable_seqscan desligado o planner só escolhe Seq Scan se nenhum índice serve ao
+    predicado: cada leitor mensal deve chegar à tabela por índice.
+    """
+    db = postgres_db
+    user, account, category = create_test_user_account_category(db)
+    try:
+        start = datetime(2024, 1, 15, 12, 0)
+        for i in range(40):
+            _add(db, user.id, account.id, category.id, start + timedelta(days=9 * i))
+        db.commit()
+        rebuild_monthly_totals(db, user.id)
+        db.commit()
+
+        db.execute(text("SET LOCAL enable_seqscan = off"))
+        tx_repo, report_repo = TransactionRepository(db), ReportRepository(db)
+        readers = {
+            "monthly_summary": lambda: tx_repo.get_monthly_summary_aggregates(user.id, 2024, 3),
+            "monthly_transactions": lambda: tx_repo.get_monthly_summary(user.id, 2024, 3),
+            "cashflow": lambda: report_repo.get_cashflow_data(user.id, datetime(2024, 2, 1)),
+            "category_summary": lambda: report_repo.get_category_summary(
+                user.id, "expense", datetime(2024, 2, 1).date()
+            ),
+        }
+        for name, call in readers.items():
+            with count_statements(db, selects_only=True) as statements:
+                call()
+            assert statements, name
+            for statement, parameters in zip(statements, statements.parameters):
+                plan = _plan(db, statement, parameters)
+                assert "Seq Scan on transactions" not in plan, (name, plan)
+                assert "Seq Scan on monthly_category_totals" not in plan, (name, plan)
+                assert "Index" in plan, (name, plan)
+    finally:
+        db.rollback()
+        cleanup_test_user(db, user.id)
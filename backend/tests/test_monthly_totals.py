@@ -0,0 +1,230 @@
+"""
+Rollup monthly_category_totals: mantido por TransactionService em cada escrita (criação, lote,
+edição, exclusão) e sempre igual ao recalculado a partir de transactions (rebuild).
+"""
+from datetime import datetime, timedelta
+
+from core.recurring_job import budget_spent
+from models import Category, MonthlyCategoryTotal, Transaction
+from repositories.report_repository import ReportRepository
+from repositories.transaction_repository import TransactionRepository
+from repositories.monthly_totals_repository import (
+    MonthlyTotalsRepository,
+    rebuild_monthly_totals,
+    shift_year_month,
+    year_month,
+)
+
+
+def _payload(account_id, category_id, cents, when, tx_type="expense", description="Rollup"):
+    return {
+        "date": when.isoformat(),
+        "account_id": account_id,
+        "category_id": category_id,
+        "type": tx_type,
+        "amount_cents": cents,
+        "description": description,
+        "tags": [],
+    }
+
+
+def _add_rows(db, user_id, account_id, category_id, rows):
+    """Insere (data, tipo, valor[, deleted_at]) direto no ORM e recalcula o rollup."""
+    for when, tx_type, amount, *deleted_at in rows:
+        db.add(Transaction(
+            date=when, account_id=account_id, category_id=category_id, type=tx_type,
+            amount=amount, description="Rollup", user_id=user_id,
+            deleted_at=deleted_at[0] if deleted_at else None,
+        ))
+    db.commit()
+    rebuild_monthly_totals(db, user_id)
+    db.commit()
+
+
+def _snapshot(db, user_id):
+    db.expire_all()
+    return sorted(
+        (r.year_month, r.category_id, r.type, r.total_cents, r.count)
+        for r in db.query(MonthlyCategoryTotal).filter(MonthlyCategoryTotal.user_id == user_id)
+    )
+
+
+def _assert_matches_rebuild(db, user_id):
+    maintained = _snapshot(db, user_id)
+    rebuild_monthly_totals(db, user_id)
+    db.commit()
+    assert maintained == _snapshot(db, user_id)
+    return maintained
+
+
+class TestMonthlyTotalsHelpers:
+    def test_year_month_and_shift(self):
+        assert year_month(datetime(2024, 5, 31, 23, 59)) == 202405
+        assert shift_year_month(202401, -1) == 202312
+        assert shift_year_month(202411, 3) == 202502
+
+
+class TestMonthlyTotalsMaintenance:
+    def test_writes_keep_rollup_equal_to_rebuild(
+        self, client, auth_headers, db, test_user, test_account, test_category
+    ):
+        other = Category(name="Salário", type="income", color="#22c55e", icon="💵", user_id=test_user.id)
+        db.add(other)
+        db.commit()
+        may, june = datetime(2024, 5, 10, 12, 0), datetime(2024, 6, 3, 12, 0)
+
+        ids = []
+        for cents, when in ((1000, may), (2550, may), (700, june)):
+            r = client.post(
+                "/api/transactions/",
+                json=_payload(test_account.id, test_category.id, cents, when),
+                headers=auth_headers,
+            )
+            assert r.status_code == 200, r.text
+            ids.append(r.json()["id"])
+        r = client.post(
+            "/api/transactions/batch",
+            json={"items": [
+                _payload(test_account.id, other.id, 500000, may, tx_type="income"),
+                _payload(test_account.id, test_category.id, 300, june),
+            ]},
+            headers=auth_headers,
+        )
+        assert r.status_code == 200, r.text
+
+        assert _assert_matches_rebuild(db, test_user.id) == sorted([
+            (202405, test_category.id, "expense", 3550, 2),
+            (202405, other.id, "income", 500000, 1),
+            (202406, test_category.id, "expense", 1000, 2),
+        ])
+
+        # Edição move a despesa de maio para junho
+        r = client.put(
+            f"/api/transactions/{ids[0]}",
+            json={"date": june.isoformat()},
+            headers=auth_headers,
+        )
+        assert r.status_code == 200, r.text
+        rows = _assert_matches_rebuild(db, test_user.id)
+        assert (202405, test_category.id, "expense", 2550, 1) in rows
+        assert (202406, test_category.id, "expense", 2000, 3) in rows
+
+        # Exclusões: unitária e em lote; linhas zeradas somem do rollup
+        assert client.delete(f"/api/transactions/{ids[1]}", headers=auth_headers).status_code == 200
+        r = client.request("DELETE", "/api/transactions/", json={"ids": ids[2:]}, headers=auth_headers)
+        assert r.status_code == 200, r.text
+        rows = _assert_matches_rebuild(db, test_user.id)
+        assert all(row[0] != 202405 or row[2] == "income" for row in rows)
+
+    def test_monthly_summary_reads_rollup(
+        self, client, auth_headers, db, test_user, test_account, test_category
+    ):
+        r = client.post(
+            "/api/transactions/",
+            json=_payload(test_account.id, test_category.id, 4200, datetime(2024, 7, 15, 9, 0)),
+            headers=auth_headers,
+        )
+        assert r.status_code == 200, r.text
+        # O resumo vem do rollup: alterá-lo direto aparece na resposta
+        db.query(MonthlyCategoryTotal).filter(
+            MonthlyCategoryTotal.user_id == test_user.id
+        ).update({"total_cents": 9900})
+        db.commit()
+
+        r = client.get("/api/transactions/summary/monthly?year=2024&month=7", headers=auth_headers)
+        assert r.status_code == 200, r.text
+        body = r.json()
+        assert body["total_transactions"] == 1
+        assert body["total_expenses"] == 99.0
+        assert MonthlyTotalsRepository(db).rows(test_user.id, 202407, 202407)[0].total_cents == 9900
+
+
+class TestMonthlySummariesBatch:
+    def test_year_summary_in_one_request(
+        self, client, auth_headers, db, test_user, test_account, test_category
+    ):
+        for cents, when in ((1000, datetime(2024, 2, 5, 10, 0)), (2500, datetime(2024, 11, 20, 10, 0))):
+            r = client.post(
+                "/api/transactions/",
+                json=_payload(test_account.id, test_category.id, cents, when),
+                headers=auth_headers,
+            )
+            assert r.status_code == 200, r.text
+
+        r = client.get("/api/transactions/summary/monthly/batch?year=2024", headers=auth_headers)
+        assert r.status_code == 200, r.text
+        months = r.json()["months"]
+        assert [(m["year"], m["month"]) for m in months] == [(2024, i) for i in range(1, 13)]
+        by_month = {m["month"]: m for m in months}
+        assert by_month[2]["total_expenses"] == 10.0
+        assert by_month[11]["category_breakdown"] == {test_category.id: {"income": 0, "expense": 25.0}}
+        assert by_month[3]["total_transactions"] == 0
+
+        # Mesmo formato do endpoint de um mês
+        single = client.get(
+            "/api/transactions/summary/monthly?year=2024&month=11", headers=auth_headers
+        ).json()
+        assert {k: single[k] for k in by_month[11]} == by_month[11]
+
+    def test_month_list_and_validation(self, client, auth_headers):
+        r = client.get(
+            "/api/transactions/summary/monthly/batch?months=2024-12&months=2025-01&months=2024-12",
+            headers=auth_headers,
+        )
+        assert r.status_code == 200, r.text
+        assert [(m["year"], m["month"]) for m in r.json()["months"]] == [(2024, 12), (2025, 1)]
+
+        assert client.get(
+            "/api/transactions/summary/monthly/batch?months=2024-13", headers=auth_headers
+        ).status_code == 400
+        assert client.get(
+            "/api/transactions/summary/monthly/batch", headers=auth_headers
+        ).status_code == 400
+
+
+class TestRollupReadersKeepSemantics:
+    def test_report_window_starts_mid_month(self, db, test_user, test_account, test_category):
+        # Janela de months*30 dias: o primeiro mês conta só a partir de start_date
+        _add_rows(db, test_user.id, test_account.id, test_category.id, [
+            (datetime(2024, 5, 10, 12, 0), "expense", 100.0),
+            (datetime(2024, 5, 20, 12, 0), "expense", 20.0),
+            (datetime(2024, 5, 21, 12, 0), "expense", 5.0, datetime(2024, 5, 22)),
+            (datetime(2024, 6, 3, 12, 0), "expense", 7.0),
+        ])
+        repo = ReportRepository(db)
+        start = datetime(2024, 5, 15)
+
+        cashflow = {(r.year, r.month, r.type): float(r.total) for r in repo.get_cashflow_data(test_user.id, start)}
+        assert cashflow == {(2024, 5, "expense"): 20.0, (2024, 6, "expense"): 7.0}
+
+        [summary] = repo.get_category_summary(test_user.id, "expense", start.date())
+        assert (summary.category_id, float(summary.total_amount), summary.transaction_count) == (
+            test_category.id, 27.0, 2,
+        )
+
+    def test_transfers_count_as_expense_outside_totals(
+        self, client, auth_headers, db, test_user, test_account, test_category
+    ):
+        now = datetime.now().replace(microsecond=0)
+        _add_rows(db, test_user.id, test_account.id, test_category.id, [
+            (now, "expense", 10.0),
+            (now, "transfer", 4.0),
+        ])
+
+        summary = TransactionRepository(db).get_monthly_summary_aggregates(test_user.id, now.year, now.month)
+        assert summary["total_expenses"] == 10.0
+        assert summary["total_transactions"] == 2
+        assert summary["category_breakdown"] == {test_category.id: {"income": 0.0, "expense": 14.0}}
+
+        r = client.get("/api/reports/cashflow?months=1", headers=auth_headers)
+        assert r.status_code == 200, r.text
+        assert r.json()[-1]["expense"] == 14.0
+
+    def test_budget_spent_ignores_future_dated_expenses(self, db, test_user, test_account, test_category):
+        now = datetime(2024, 8, 10, 12, 0)
+        _add_rows(db, test_user.id, test_account.id, test_category.id, [
+            (datetime(2024, 8, 2, 9, 0), "expense", 30.0),
+            (now + timedelta(days=5), "expense", 500.0),
+            (datetime(2024, 9, 1, 9, 0), "expense", 800.0),
+        ])
+        assert budget_spent(db, test_user.id, test_category.id, now) == 30.0
@@ -0,0 +1,84 @@
+"""
+Particionamento mensal (db/partitions.py) e job de partições futuras.
+Nomes/limites das partições; no-op fora do PostgreSQL particionado.
+"""
+import pytest
+from datetime import date
+
+from sqlalchemy import text
+
+from db.partitions import (
+    PARTITIONED_TABLES,
+    default_partition_name,
+    ensure_all_partitions,
+    ensure_month_partitions,
+    is_partitioned,
+    month_partition_bounds,
+    month_partition_name,
+)
+
+
+class TestPartitionNaming:
+    def test_partition_name(self):
+        assert month_partition_name("ledger_entries", 2026, 3) == "ledger_entries_y2026m03"
+
+    def test_bounds_half_open(self):
+        """[1º dia do mês, 1º dia do mês seguinte), inclusive na virada do ano."""
+        assert month_partition_bounds(2026, 3) == (date(2026, 3, 1), date(2026, 4, 1))
+        assert month_partition_bounds(2026, 12) == (date(2026, 12, 1), date(2027, 1, 1))
+
+
+class TestEnsurePartitions:
+    def test_sqlite_is_noop(self, db):
+        """SQLite: tabela não particionada → nada criado."""
+        assert is_partitioned(db, "ledger_entries") is False
+        assert ensure_month_partitions(db, "ledger_entries", today=date(2026, 1, 15)) == []
+        assert ensure_all_partitions(db) == {t: [] for t in PARTITIONED_TABLES}
+
+    def test_unknown_table_raises(self, db):
+        with pytest.raises(ValueError):
+            ensure_month_partitions(db, "transactions")
+
+    def test_scheduler_job_runs_without_partitioning(self, db, monkeypatch):
+        """Job diário não falha em banco sem particionamento."""
+        import core.recurring_job as recurring_job
+
+        monkeypatch.setattr(recurring_job, "SessionLocal", lambda: db)
+        recurring_job.execute_ensure_partitions()
+
+
+@pytest.mark.requires_postgres
+def test_new_partition_takes_rows_from_default(postgres_db, monkeypatch):
+    """Linhas do mês já na DEFAULT (job parado) vão para a partição nova, sem erro no CREATE."""
+    db = postgres_db
+    monkeypatch.setitem(PARTITIONED_TABLES, "partition_probe", "created_at")
+    db.execute(text("DROP TABLE IF EXISTS partition_probe CASCADE"))
+    db.execute(text(
+        "CREATE TABLE partition_probe (id int NOT NULL, created_at timestamptz NOT NULL) "
+        "PARTITION BY RANGE (created_at)"
+    ))
+    db.execute(text("CREATE TABLE partition_probe_default PARTITION OF partition_probe DEFAULT"))
+    db.execute(text(
+        "INSERT INTO partition_probe VALUES "
+        "(1, '2026-02-03 10:00+00'), (2, '2026-02-27 23:00+00'), (3, '2026-05-01 00:00+00')"
+    ))
+    db.commit()
+    try:
+        assert default_partition_name(db, "partition_probe") == "partition_probe_default"
+        created = ensure_month_partitions(db, "partition_probe", months_ahead=1, today=date(2026, 2, 10))
+        db.commit()
+        assert created == ["partition_probe_y2026m02", "partition_probe_y2026m03"]
+
+        def ids(relation):
+            return sorted(r[0] for r in db.execute(text(f"SELECT id FROM {relation}")))
+
+        assert ids("partition_probe_y2026m02") == [1, 2]
+        assert ids("partition_probe_y2026m03") == []
+        assert ids("partition_probe_default") == [3]
+        assert ids("partition_probe") == [1, 2, 3]
+        # Idempotente
+        assert ensure_month_partitions(db, "partition_probe", months_ahead=1, today=date(2026, 2, 10)) == []
+    finally:
+        db.rollback()
+        db.execute(text("DROP TABLE IF EXISTS partition_probe CASCADE"))
+        db.commit()
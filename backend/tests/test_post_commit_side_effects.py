@@ -0,0 +1,160 @@
+"""
+Efeitos pós-commit (core.side_effects): alerta de saldo baixo e round-up rodam fora da
+requisição, em workers com sessão própria; falhas não afetam a resposta nem os outros handlers.
+"""
+import threading
+from datetime import datetime
+
+from sqlalchemy.orm import Session
+
+from core.side_effects import PostCommitDispatcher, TransactionEvent, post_commit_dispatcher
+from models import AutomationRule, Envelope, Notification
+from services.round_up_service import apply_round_up_after_expense
+
+
+def _event(user_id="u1", **extra):
+    return TransactionEvent(name="transactions.created", user_id=user_id, **extra)
+
+
+class TestPostCommitDispatcher:
+    def test_handlers_run_in_own_session_and_failures_are_isolated(self, db, test_user):
+        dispatcher = PostCommitDispatcher(workers=2, max_queue=10)
+        seen = []
+
+        @dispatcher.handler("transactions.created")
+        def failing(session, event):
+            raise RuntimeError("falha no handler")
+
+        @dispatcher.handler("transactions.created")
+        def notify(session, event):
+            seen.append(session is not db)
+            session.add(Notification(user_id=event.user_id, type="info", title="Pós-commit", body="ok"))
+
+        dispatcher.dispatch(db.get_bind(), _event(user_id=test_user.id))
+        dispatcher.wait_idle()
+        dispatcher.shutdown()
+
+        assert seen == [True]
+        assert db.query(Notification).filter(Notification.title == "Pós-commit").count() == 1
+
+    def test_full_queue_drops_instead_of_blocking(self, db):
+        dispatcher = PostCommitDispatcher(workers=1, max_queue=1)
+        started, release = threading.Event(), threading.Event()
+        calls = []
+
+        @dispatcher.handler("transactions.created")
+        def slow(session, event):
+            calls.append(event.user_id)
+            started.set()
+            release.wait(5)
+
+        dispatcher.dispatch(db.get_bind(), _event("a"))
+        assert started.wait(5)
+        dispatcher.dispatch(db.get_bind(), _event("b"))  # fica na fila
+        dispatcher.dispatch(db.get_bind(), _event("c"))  # fila cheia: descartado
+        release.set()
+        dispatcher.wait_idle()
+        dispatcher.shutdown()
+        assert calls == ["a", "b"]
+
+
+class TestTransactionSideEffects:
+    def test_create_expense_triggers_low_balance_and_round_up(
+        self, client, auth_headers, db, test_user, test_account, test_category
+    ):
+        envelope = Envelope(name="Caixinha", balance=0, color="#00FF00", user_id=test_user.id)
+        db.add(envelope)
+        db.flush()
+        db.add_all([
+            AutomationRule(
+                name="Saldo mínimo", type="low_balance_alert", user_id=test_user.id,
+                conditions={"account_id": test_account.id, "amount_cents": 99000}, actions={},
+            ),
+            AutomationRule(
+                name="Arredondar", type="round_up", user_id=test_user.id,
+                conditions={"envelope_id": envelope.id, "round_to_cents": 500}, actions={},
+            ),
+        ])
+        db.commit()
+        envelope_id = envelope.id
+
+        response = client.post(
+            "/api/transactions/",
+            json={
+                "date": datetime(2024, 7, 1, 12, 0).isoformat(),
+                "account_id": test_account.id,
+                "category_id": test_category.id,
+                "type": "expense",
+                "amount_cents": 1234,
+                "description": "Farmácia",
+                "tags": [],
+            },
+            headers=auth_headers,
+        )
+        assert response.status_code == 200, response.text
+        post_commit_dispatcher.wait_idle()
+
+        db.expire_all()
+        alerts = db.query(Notification).filter(
+            Notification.user_id == test_user.id, Notification.type == "low_balance_alert"
+        ).all()
+        assert len(alerts) == 1
+        # 12,34 -> 15,00
+        assert db.query(Envelope).get(envelope_id).balance == 266
+
+    def test_batch_applies_round_up_for_every_expense(
+        self, client, auth_headers, db, test_user, test_account, test_category
+    ):
+        envelope = Envelope(name="Caixinha", balance=0, color="#00FF00", user_id=test_user.id)
+        db.add(envelope)
+        db.flush()
+        db.add(AutomationRule(
+            name="Arredondar", type="round_up", user_id=test_user.id,
+            conditions={"envelope_id": envelope.id, "round_to_cents": 100}, actions={},
+        ))
+        db.commit()
+        envelope_id = envelope.id
+
+        items = [
+            {
+                "date": datetime(2024, 7, 2, 12, 0).isoformat(),
+                "account_id": test_account.id,
+                "category_id": test_category.id,
+                "type": tx_type,
+                "amount_cents": cents,
+                "description": "Lote",
+                "tags": [],
+            }
+            for tx_type, cents in (("expense", 250), ("expense", 990), ("income", 1010))
+        ]
+        response = client.post("/api/transactions/batch", json={"items": items}, headers=auth_headers)
+        assert response.status_code == 200, response.text
+        post_commit_dispatcher.wait_idle()
+
+        db.expire_all()
+        # 2,50 -> 3,00 (+50) e 9,90 -> 10,00 (+10); receita não arredonda
+        assert db.query(Envelope).get(envelope_id).balance == 60
+
+    def test_round_up_increments_atomically(self, db, test_user):
+        """
+        Outro worker credita o envelope depois desta sessão tê-lo carregado: o round-up soma no
+        banco (balance = balance + x) e não sobrescreve o valor com o saldo em memória.
+        """
+        envelope = Envelope(name="Caixinha", balance=0, color="#00FF00", user_id=test_user.id)
+        db.add(envelope)
+        db.flush()
+        db.add(AutomationRule(
+            name="Arredondar", type="round_up", user_id=test_user.id,
+            conditions={"envelope_id": envelope.id, "round_to_cents": 100}, actions={},
+        ))
+        db.commit()
+        assert envelope.balance == 0
+
+        other = Session(bind=db.get_bind())
+        other.query(Envelope).filter(Envelope.id == envelope.id).update({"balance": 500})
+        other.commit()
+        other.close()
+
+        apply_round_up_after_expense(db, test_user.id, 1230)
+        db.expire_all()
+        assert db.query(Envelope).get(envelope.id).balance == 570
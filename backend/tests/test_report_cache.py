@@ -0,0 +1,124 @@
+"""
+Cache de relatórios versionado (services.report_cache_service): acerto enquanto os dados do
+usuário não mudam; escrita de transação/categoria incrementa a versão e força recálculo.
+"""
+from datetime import datetime
+
+import routers.reports as reports_router
+from models import MonthlyCategoryTotal, ReportCacheEntry
+from repositories.monthly_totals_repository import rebuild_monthly_totals
+from repositories.report_cache_repository import bump_data_version, get_data_version
+from services.report_cache_service import ReportCache
+
+
+def _counting(monkeypatch, name):
+    """Conta chamadas da função de serviço usada pelo router."""
+    calls = []
+    original = getattr(reports_router, name)
+
+    def wrapper(*args, **kwargs):
+        calls.append(args)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(reports_router, name, wrapper)
+    return calls
+
+
+def _create_expense(client, auth_headers, account_id, category_id, cents):
+    r = client.post(
+        "/api/transactions/",
+        json={
+            "date": datetime.now().isoformat(),
+            "account_id": account_id,
+            "category_id": category_id,
+            "type": "expense",
+            "amount_cents": cents,
+            "description": "Cache",
+            "tags": [],
+        },
+        headers=auth_headers,
+    )
+    assert r.status_code == 200, r.text
+
+
+class TestReportCache:
+    def test_summary_is_cached_until_a_transaction_write(
+        self, client, auth_headers, test_account, test_category, monkeypatch
+    ):
+        monkeypatch.setattr(reports_router, "report_cache", ReportCache(max_entries=16, backend="memory"))
+        calls = _counting(monkeypatch, "get_financial_summary_data")
+
+        first = client.get("/api/reports/summary?months=3", headers=auth_headers)
+        second = client.get("/api/reports/summary?months=3", headers=auth_headers)
+        assert first.status_code == second.status_code == 200
+        assert first.json() == second.json()
+        assert len(calls) == 1
+        # Parâmetros diferentes: outra entrada
+        client.get("/api/reports/summary?months=6", headers=auth_headers)
+        assert len(calls) == 2
+
+        _create_expense(client, auth_headers, test_account.id, test_category.id, 1500)
+        after = client.get("/api/reports/summary?months=3", headers=auth_headers).json()
+        assert len(calls) == 3
+        assert after["total_expenses"] == first.json()["total_expenses"] + 15.0
+
+    def test_category_rename_invalidates_category_summary(
+        self, client, auth_headers, test_account, test_category, monkeypatch
+    ):
+        monkeypatch.setattr(reports_router, "report_cache", ReportCache(max_entries=16, backend="memory"))
+        _create_expense(client, auth_headers, test_account.id, test_category.id, 990)
+        url = "/api/reports/categories/summary?type_filter=expense&months=1"
+        assert client.get(url, headers=auth_headers).json()[0]["category_name"] == "Test Category"
+
+        r = client.put(f"/api/categories/{test_category.id}", json={"name": "Mercado"}, headers=auth_headers)
+        assert r.status_code == 200, r.text
+        assert client.get(url, headers=auth_headers).json()[0]["category_name"] == "Mercado"
+
+    def test_rollup_rebuild_invalidates_cached_reports(
+        self, client, auth_headers, db, test_user, test_account, test_category, monkeypatch
+    ):
+        """Rebuild do rollup (ex.: após correção manual) incrementa a versão: relatório recalculado."""
+        monkeypatch.setattr(reports_router, "report_cache", ReportCache(max_entries=16, backend="memory"))
+        _create_expense(client, auth_headers, test_account.id, test_category.id, 1500)
+        url = "/api/reports/categories/summary?type_filter=expense&months=1"
+        # Rollup divergente (correção manual pendente) já foi para o cache
+        db.query(MonthlyCategoryTotal).filter(
+            MonthlyCategoryTotal.user_id == test_user.id
+        ).update({"total_cents": 1})
+        db.commit()
+        assert client.get(url, headers=auth_headers).json()[0]["total_amount"] == 0.01
+
+        version = get_data_version(db, test_user.id)
+        rebuild_monthly_totals(db)
+        db.commit()
+        assert get_data_version(db, test_user.id) == version + 1
+        assert client.get(url, headers=auth_headers).json()[0]["total_amount"] == 15.0
+
+        rebuild_monthly_totals(db, test_user.id)
+        db.commit()
+        assert get_data_version(db, test_user.id) == version + 2
+
+    def test_db_backend_is_shared_between_processes(self, db, test_user):
+        """Dois caches (ex.: dois workers) com backend em banco: o segundo lê o que o primeiro gravou."""
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return {"total": 10, "when": datetime(2024, 1, 1)}
+
+        worker_a, worker_b = ReportCache(max_entries=4, backend="db"), ReportCache(max_entries=4, backend="db")
+        params = {"months": 3}
+        first = worker_a.get_or_compute(db, test_user.id, "summary", params, compute)
+        assert worker_b.get_or_compute(db, test_user.id, "summary", params, compute) == first
+        assert first == {"total": 10, "when": "2024-01-01T00:00:00"}
+        assert len(calls) == 1
+
+        # Nova versão: recalcula e a entrada da versão anterior é substituída
+        bump_data_version(db, [test_user.id])
+        db.commit()
+        assert get_data_version(db, test_user.id) == 1
+        worker_b.get_or_compute(db, test_user.id, "summary", params, compute)
+        assert len(calls) == 2
+        db.expire_all()
+        entries = db.query(ReportCacheEntry).filter(ReportCacheEntry.user_id == test_user.id).all()
+        assert [e.data_version for e in entries] == [1]
@@ -5,6 +5,7 @@ import pytest
 from datetime import datetime, date, timedelta
 
 from models import Transaction, Account, Category, User
+from repositories.monthly_totals_repository import rebuild_monthly_totals
 from repositories.report_repository import ReportRepository
 from repositories.transaction_repository import TransactionRepository
 from repositories.account_repository import AccountRepository
@@ -55,6 +56,9 @@ class TestReportRepository:
             )
             db.add(transaction)
         db.commit()
+        # Transações inseridas direto no ORM: recalcula o rollup mensal
+        rebuild_monthly_totals(db, test_user.id)
+        db.commit()
         
         repo = ReportRepository(db)
         start_date = now - timedelta(days=90)
@@ -78,6 +82,8 @@ class TestReportRepository:
             )
             db.add(transaction)
         db.commit()
+        rebuild_monthly_totals(db, test_user.id)
+        db.commit()
         
         repo = ReportRepository(db)
         start_date = date.today() - timedelta(days=30)
@@ -98,3 +104,45 @@ class TestReportRepository:
         assert isinstance(result['accounts'], list)
         assert any(acc.id == test_account.id for acc in result['accounts'])
 
+    
+    def test_period_totals_and_monthly_comparison_aggregate_in_sql(
+        self, db, test_user, test_account, test_category, count_statements
+    ):
+        """Totais via COUNT/SUM no banco: uma query, sem excluídas, sem carregar transações."""
+        from decimal import Decimal
+        
+        rows = [
+            (datetime(2024, 5, 3, 10, 0), "income", 1000.0, None),
+            (datetime(2024, 5, 31, 22, 0), "expense", 250.5, None),
+            (datetime(2024, 4, 10, 10, 0), "expense", 100.0, None),
+            (datetime(2024, 5, 4, 10, 0), "expense", 999.0, datetime(2024, 5, 5)),  # excluída
+        ]
+        for when, tx_type, amount, deleted_at in rows:
+            db.add(Transaction(
+                date=when,
+                account_id=test_account.id,
+                category_id=test_category.id,
+                type=tx_type,
+                amount=amount,
+                description="Período",
+                user_id=test_user.id,
+                deleted_at=deleted_at,
+            ))
+        db.commit()
+        user_id = test_user.id
+        db.expunge_all()
+        
+        with count_statements(db) as statements:
+            repo = ReportRepository(db)
+            totals = repo.get_period_totals(user_id, date(2024, 5, 1), date(2024, 6, 1))
+            comparison = repo.get_monthly_comparison(user_id, 2024, 5)
+        
+        assert len(statements) == 2
+        assert len(db.identity_map) == 0
+        assert totals.total_transactions == 2
+        assert totals.total_income == Decimal("1000.00")
+        assert totals.total_expenses == Decimal("250.50")
+        assert comparison["current_month"] == {"income": 1000.0, "expense": 250.5, "balance": 749.5}
+        assert comparison["previous_month"] == {"income": 0.0, "expense": 100.0, "balance": -100.0}
+        assert comparison["expense_change"] == 150.5
+        assert float(comparison["expense_percentage_change"]) == 150.5
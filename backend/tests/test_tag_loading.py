@@ -0,0 +1,73 @@
+"""
+Carga de tags das transações: selectinload na listagem (sem multiplicar linhas por tag),
+include_tags=false e mapa {transaction_id: [nomes]} em uma query para exportações.
+"""
+from datetime import datetime
+
+from models import Tag, Transaction, TransactionTag
+from repositories.transaction_tag_repository import tag_names_by_transaction, tag_names_by_user
+
+
+def _tagged(db, user_id, account_id, category_id, n=3, tags=("casa", "fixo", "mensal")):
+    tag_rows = [Tag(user_id=user_id, name=name) for name in tags]
+    db.add_all(tag_rows)
+    db.flush()
+    txs = []
+    for i in range(n):
+        t = Transaction(
+            date=datetime.now(), account_id=account_id, category_id=category_id,
+            type="expense", amount=10 + i, description=f"Conta {i}", user_id=user_id,
+        )
+        db.add(t)
+        db.flush()
+        db.add_all([TransactionTag(transaction_id=t.id, tag_id=tag.id) for tag in tag_rows])
+        txs.append(t)
+    db.commit()
+    return txs
+
+
+class TestTagLoading:
+    def test_list_with_and_without_tags(self, client, auth_headers, db, test_user, test_account, test_category):
+        _tagged(db, test_user.id, test_account.id, test_category.id)
+        with_tags = client.get("/api/transactions/", params={"limit": 2}, headers=auth_headers).json()
+        assert len(with_tags) == 2
+        assert all(sorted(t["tags"]) == ["casa", "fixo", "mensal"] for t in with_tags)
+
+        without = client.get(
+            "/api/transactions/", params={"limit": 2, "include_tags": "false"}, headers=auth_headers
+        ).json()
+        assert len(without) == 2
+        assert all(t["tags"] is None for t in without)
+
+    def test_repository_uses_selectin_not_join(self, db, test_user, test_account, test_category, count_statements):
+        """Página com limit não é multiplicada pelas tags: 1 query da página + 1 do selectinload."""
+        from repositories.transaction_repository import TransactionRepository
+
+        user_id = test_user.id
+        _tagged(db, user_id, test_account.id, test_category.id)
+        db.expire_all()
+        repo = TransactionRepository(db)
+        with count_statements(db, selects_only=True) as statements:
+            page = repo.get_by_user(user_id, limit=2)
+        assert len(page) == 2
+        assert len(statements) == 2
+        assert "JOIN transaction_tags" not in statements[0]
+        assert sorted(page[0].tags) == ["casa", "fixo", "mensal"]
+
+        db.expire_all()
+        with count_statements(db, selects_only=True) as statements:
+            repo.get_by_user(user_id, include_tags=False)
+        assert len(statements) == 1
+
+    def test_tag_names_maps(self, db, test_user, test_account, test_category):
+        txs = _tagged(db, test_user.id, test_account.id, test_category.id, n=2, tags=("b", "a"))
+        by_ids = tag_names_by_transaction(db, [t.id for t in txs] + ["sem-tags"])
+        assert by_ids == {t.id: ["a", "b"] for t in txs}
+        assert tag_names_by_user(db, test_user.id) == by_ids
+
+    def test_exports_use_tag_map(self, client, auth_headers, db, test_user, test_account, test_category):
+        _tagged(db, test_user.id, test_account.id, test_category.id, n=1)
+        privacy = client.get("/api/privacy/export", headers=auth_headers).json()
+        assert privacy["transactions"][0]["tags"] == ["casa", "fixo", "mensal"]
+        report = client.get("/api/reports/export", headers=auth_headers).json()
+        assert report["data"]["transactions"][0]["tags"] == ["casa", "fixo", "mensal"]
@@ -0,0 +1,86 @@
+"""
+Sincronização de tags em lote: TagRepository.resolve_ids (SELECT IN + INSERT ON CONFLICT DO NOTHING),
+diff de vínculos com INSERT/DELETE em lote e memo nome -> id entre lotes.
+"""
+from datetime import datetime
+
+from models import Account, Tag, Transaction, TransactionTag
+from repositories.tag_repository import TagRepository
+from services.transaction_service import _sync_tags_for_transaction
+
+
+def _tx(db, user_id, account_id, category_id):
+    t = Transaction(
+        date=datetime(2024, 2, 1), account_id=account_id, category_id=category_id,
+        type="expense", amount=10, description="Tags", user_id=user_id,
+    )
+    db.add(t)
+    db.commit()
+    return t
+
+
+class TestTagSync:
+    def test_resolve_ids_creates_missing_once(self, db, test_user):
+        user_id = test_user.id
+        db.add(Tag(user_id=user_id, name="casa"))
+        db.commit()
+        repo = TagRepository(db)
+        ids = repo.resolve_ids(user_id, ["casa", "mercado", "casa", "lazer"])
+        assert list(ids) == ["casa", "mercado", "lazer"]
+        assert db.query(Tag).filter(Tag.user_id == user_id).count() == 3
+        assert repo.resolve_ids(user_id, ["lazer", "mercado"]) == {"lazer": ids["lazer"], "mercado": ids["mercado"]}
+
+    def test_memo_skips_database(self, db, test_user, count_statements):
+        user_id = test_user.id
+        memo = {}
+        repo = TagRepository(db)
+        repo.resolve_ids(user_id, ["a", "b"], memo)
+        with count_statements(db) as statements:
+            result = repo.resolve_ids(user_id, ["b", "a"], memo)
+        assert result == {"b": memo["b"], "a": memo["a"]}
+        assert statements == []
+
+    def test_sync_diff_in_constant_statements(self, db, test_user, test_account, test_category, count_statements):
+        """Adicionar/remover N tags custa o mesmo número de statements que 1 tag."""
+        user_id = test_user.id
+        t = _tx(db, user_id, test_account.id, test_category.id)
+        tx_id = t.id
+
+        _sync_tags_for_transaction(db, tx_id, user_id, ["x"])
+        with count_statements(db) as few:
+            _sync_tags_for_transaction(db, tx_id, user_id, ["y"])
+        names = [f"tag{i}" for i in range(8)]
+        with count_statements(db) as many:
+            _sync_tags_for_transaction(db, tx_id, user_id, names)
+        assert len(few) == len(many)
+        db.commit()
+        links = db.query(TransactionTag).filter(TransactionTag.transaction_id == tx_id).all()
+        assert sorted(tt.tag.name for tt in links) == sorted(names)
+
+        _sync_tags_for_transaction(db, tx_id, user_id, ["tag1", " ", "tag1"])
+        db.commit()
+        db.expire_all()
+        assert db.query(Transaction).get(tx_id).tags == ["tag1"]
+
+    def test_transfer_and_update_via_api(self, client, auth_headers, db, test_user, test_account, test_category):
+        savings = Account(name="Poupança", type="savings", balance=0, user_id=test_user.id)
+        db.add(savings)
+        db.commit()
+        response = client.post("/api/transactions/", json={
+            "date": datetime(2024, 2, 1).isoformat(),
+            "account_id": test_account.id,
+            "to_account_id": savings.id,
+            "category_id": test_category.id,
+            "type": "transfer",
+            "amount_cents": 1000,
+            "description": "Reserva",
+            "tags": ["reserva", "mensal"],
+        }, headers=auth_headers)
+        assert response.status_code == 200, response.text
+        assert db.query(Tag).filter(Tag.user_id == test_user.id).count() == 2
+        assert db.query(TransactionTag).count() == 4
+
+        tx_id = response.json()["id"]
+        response = client.put(f"/api/transactions/{tx_id}", json={"tags": ["mensal", "nova"]}, headers=auth_headers)
+        assert response.status_code == 200, response.text
+        assert sorted(response.json()["tags"]) == ["mensal", "nova"]
@@ -0,0 +1,211 @@
+"""
+Importação de extratos: POST /api/transactions/import (CSV/OFX).
+Lotes com INSERT multi-linha de transações e ledger; saldo por delta; resultado por linha;
+OFX reimportado não duplica (FITID).
+"""
+import functools
+import io
+from decimal import Decimal
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.exc import IntegrityError
+
+import routers.transactions as transactions_router
+import services.transaction_import_service as import_service
+
+from models import Account, LedgerEntry, Tag, Transaction, TransactionTag
+from core.ledger_utils import get_balance_from_ledger
+from services.transaction_import_service import (
+    check_row_limit,
+    import_batch,
+    iter_csv_rows,
+    iter_import_batches,
+    iter_ofx_rows,
+)
+
+CSV_CONTENT = (
+    "data;descrição;valor;categoria;tags\n"
+    "05/01/2024;Salário;3.500,00;Test Category;fixo|mensal\n"
+    "06/01/2024;Mercado;-250,40;;\n"
+    "07/01/2024;Padaria;-12,00;Inexistente;\n"
+    "xx/01/2024;Linha ruim;10,00;;\n"
+)
+
+OFX_CONTENT = """OFXHEADER:100
+DATA:OFXSGML
+<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS><BANKTRANLIST>
+<STMTTRN>
+<TRNTYPE>DEBIT
+<DTPOSTED>20240110120000[-3:BRT]
+<TRNAMT>-45.90
+<FITID>A1
+<MEMO>Farmácia
+</STMTTRN>
+<STMTTRN><TRNTYPE>CREDIT<DTPOSTED>20240111<TRNAMT>100.00<FITID>A2<NAME>Pix recebido</STMTTRN>
+</BANKTRANLIST></STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>
+"""
+
+
+def _upload(client, headers, account_id, content, filename, **form):
+    data = {"account_id": account_id, **form}
+    return client.post(
+        "/api/transactions/import",
+        data=data,
+        files={"file": (filename, content.encode("utf-8"), "text/plain")},
+        headers=headers,
+    )
+
+
+class TestImportEndpoint:
+    def test_csv_import_per_row_results(self, client, auth_headers, db, test_account, test_category):
+        """Linhas válidas criadas em lote; categoria por nome ou padrão; inválidas viram erro da linha."""
+        response = _upload(client, auth_headers, test_account.id, CSV_CONTENT, "extrato.csv")
+        assert response.status_code == 200, response.text
+        body = response.json()
+        assert body["imported"] == 1
+        assert body["errors"] == 3
+        statuses = {r["line"]: r["status"] for r in body["results"]}
+        assert statuses == {2: "created", 3: "error", 4: "error", 5: "error"}
+
+        response = _upload(
+            client, auth_headers, test_account.id, CSV_CONTENT, "extrato.csv",
+            category_id=test_category.id,
+        )
+        body = response.json()
+        assert body["imported"] == 3
+        assert body["errors"] == 1
+
+        db.expire_all()
+        expected = Decimal("1000") + 2 * Decimal("3500.00") - Decimal("250.40") - Decimal("12.00")
+        assert Decimal(str(get_balance_from_ledger(test_account.id, db))) == expected
+        account = db.query(Account).get(test_account.id)
+        assert Decimal(str(account.balance)) == expected
+
+        salary = db.query(Transaction).filter(Transaction.description == "Salário").first()
+        assert sorted(salary.tags) == ["fixo", "mensal"]
+        assert db.query(Tag).filter(Tag.name == "fixo").count() == 1
+
+    def test_ofx_reimport_is_deduplicated(self, client, auth_headers, db, test_account, test_category):
+        """FITID já importado na conta → duplicate; saldo não muda na reimportação."""
+        first = _upload(
+            client, auth_headers, test_account.id, OFX_CONTENT, "extrato.ofx",
+            category_id=test_category.id,
+        ).json()
+        assert first["imported"] == 2
+        second = _upload(
+            client, auth_headers, test_account.id, OFX_CONTENT, "extrato.ofx",
+            category_id=test_category.id,
+        ).json()
+        assert second["imported"] == 0
+        assert second["duplicates"] == 2
+        assert Decimal(str(get_balance_from_ledger(test_account.id, db))) == Decimal("1054.10")
+
+    def test_unknown_account_and_format(self, client, auth_headers, test_account):
+        assert _upload(client, auth_headers, "nao-existe", CSV_CONTENT, "a.csv").status_code == 404
+        assert _upload(client, auth_headers, test_account.id, CSV_CONTENT, "a.xls").status_code == 400
+        assert _upload(
+            client, auth_headers, test_account.id, CSV_CONTENT, "a.csv", category_id="nao-existe"
+        ).status_code == 404
+
+    def test_too_many_rows_writes_nothing(
+        self, client, auth_headers, db, test_account, test_category, monkeypatch
+    ):
+        """Limite de linhas conferido antes do primeiro lote: 413 e nenhuma transação gravada."""
+        monkeypatch.setattr(
+            transactions_router, "check_row_limit", functools.partial(check_row_limit, max_rows=2)
+        )
+        monkeypatch.setattr(
+            transactions_router, "iter_import_batches", functools.partial(iter_import_batches, batch_size=1)
+        )
+        response = _upload(
+            client, auth_headers, test_account.id, CSV_CONTENT, "extrato.csv", category_id=test_category.id
+        )
+        assert response.status_code == 413
+        assert db.query(Transaction).count() == 0
+
+    def test_integrity_error_rolls_back_only_that_batch(
+        self, client, auth_headers, db, test_account, test_category, monkeypatch
+    ):
+        """
+        Erro do banco num lote (ex.: reimportação concorrente batendo na chave de idempotência):
+        só esse lote é desfeito e vira erro por linha; os demais ficam gravados e a resposta é 200.
+        """
+        monkeypatch.setattr(
+            transactions_router, "iter_import_batches", functools.partial(iter_import_batches, batch_size=1)
+        )
+        original = import_service.TransactionService.create_transactions_bulk
+        calls = []
+
+        def flaky(items, user_id, db_, **kwargs):
+            calls.append(items)
+            ids = original(items, user_id, db_, **kwargs)
+            if len(calls) == 2:
+                db_.flush()
+                raise IntegrityError("INSERT INTO transactions", {}, Exception("uq_transactions_idempotency"))
+            return ids
+
+        monkeypatch.setattr(import_service.TransactionService, "create_transactions_bulk", staticmethod(flaky))
+        content = (
+            "data;descrição;valor\n"
+            "05/01/2024;Primeira;-10,00\n"
+            "06/01/2024;Segunda;-20,00\n"
+            "07/01/2024;Terceira;-30,00\n"
+        )
+        response = _upload(
+            client, auth_headers, test_account.id, content, "extrato.csv", category_id=test_category.id
+        )
+        assert response.status_code == 200, response.text
+        body = response.json()
+        assert [(r["line"], r["status"]) for r in body["results"]] == [
+            (2, "created"), (3, "error"), (4, "created"),
+        ]
+        assert body["imported"] == 2
+
+        db.expire_all()
+        descriptions = {
+            t.description for t in db.query(Transaction).filter(Transaction.account_id == test_account.id)
+        }
+        assert {"Primeira", "Terceira"} <= descriptions
+        assert "Segunda" not in descriptions
+        expected = Decimal("1000") - Decimal("40.00")
+        assert Decimal(str(get_balance_from_ledger(test_account.id, db))) == expected
+
+
+class TestImportParsing:
+    def test_csv_parsing(self):
+        rows = list(iter_csv_rows(io.StringIO(CSV_CONTENT)))
+        assert rows[0]["row"]["type"] == "income"
+        assert rows[0]["row"]["amount"] == Decimal("3500.00")
+        assert rows[1]["row"]["type"] == "expense"
+        assert rows[1]["row"]["amount"] == Decimal("250.40")
+        assert "error" in rows[3]
+
+    def test_csv_missing_columns(self):
+        with pytest.raises(HTTPException) as exc:
+            list(iter_csv_rows(io.StringIO("data,valor\n01/01/2024,10\n")))
+        assert exc.value.status_code == 400
+
+    def test_ofx_parsing_small_chunks(self):
+        """Blocos <STMTTRN> cortados entre leituras são reconstituídos."""
+        rows = list(iter_ofx_rows(io.StringIO(OFX_CONTENT), chunk_size=16))
+        assert [r["row"]["fitid"] for r in rows] == ["A1", "A2"]
+        assert rows[0]["row"]["description"] == "Farmácia"
+        assert rows[0]["row"]["type"] == "expense"
+        assert rows[1]["row"]["description"] == "Pix recebido"
+
+    def test_max_rows(self):
+        assert check_row_limit(({"line": i} for i in range(5)), max_rows=5) == 5
+        rows = ({"line": i, "error": "x"} for i in range(10))
+        with pytest.raises(HTTPException) as exc:
+            check_row_limit(rows, max_rows=5)
+        assert exc.value.status_code == 413
+
+    def test_import_batch_bulk_writes(self, db, test_user, test_account, test_category):
+        """Lote grava transações, ledger e vínculos de tags com INSERT em lote."""
+        parsed = list(iter_csv_rows(io.StringIO(CSV_CONTENT)))[:2]
+        results = import_batch(db, test_user.id, test_account, parsed, test_category.id)
+        db.commit()
+        ids = [r["transaction_id"] for r in results]
+        assert db.query(LedgerEntry).filter(LedgerEntry.transaction_id.in_(ids)).count() == 2
+        assert db.query(TransactionTag).filter(TransactionTag.transaction_id == ids[0]).count() == 2
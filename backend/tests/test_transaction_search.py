@@ -0,0 +1,83 @@
+"""
+GET /api/transactions/search: busca indexada (FTS5 no SQLite de testes), sem acentos,
+por prefixo, ordenada por relevância e paginada por cursor.
+"""
+from datetime import datetime
+
+from models import Transaction
+from core.pagination import NEXT_CURSOR_HEADER
+
+
+def _tx(db, user_id, account_id, category_id, description):
+    t = Transaction(
+        date=datetime(2024, 4, 1),
+        account_id=account_id,
+        category_id=category_id,
+        type="expense",
+        amount=10,
+        description=description,
+        user_id=user_id,
+    )
+    db.add(t)
+    db.commit()
+    return t
+
+
+def _search(client, headers, q, **params):
+    return client.get("/api/transactions/search", params={"q": q, **params}, headers=headers)
+
+
+class TestTransactionSearch:
+    def test_accent_insensitive_prefix(self, client, auth_headers, db, test_user, test_account, test_category):
+        for d in ["Pão de açúcar", "Padaria do João", "Farmácia", "PAO francês"]:
+            _tx(db, test_user.id, test_account.id, test_category.id, d)
+        response = _search(client, auth_headers, "pao")
+        assert response.status_code == 200, response.text
+        assert {t["description"] for t in response.json()} == {"Pão de açúcar", "PAO francês"}
+
+        assert [t["description"] for t in _search(client, auth_headers, "farmac").json()] == ["Farmácia"]
+        assert [t["description"] for t in _search(client, auth_headers, "joao padaria").json()] == ["Padaria do João"]
+
+    def test_ranking_and_cursor(self, client, auth_headers, db, test_user, test_account, test_category):
+        """Descrição mais curta/focada no termo vem primeiro; cursor percorre tudo sem repetir."""
+        _tx(db, test_user.id, test_account.id, test_category.id, "Mercado do bairro com feira livre e padaria")
+        best = _tx(db, test_user.id, test_account.id, test_category.id, "Mercado")
+        for i in range(3):
+            _tx(db, test_user.id, test_account.id, test_category.id, f"Mercado compra {i}")
+
+        first = _search(client, auth_headers, "mercado", limit=2)
+        assert first.json()[0]["id"] == best.id
+
+        seen, response = [], first
+        while True:
+            seen.extend(t["id"] for t in response.json())
+            cursor = response.headers.get(NEXT_CURSOR_HEADER)
+            if not cursor:
+                break
+            response = _search(client, auth_headers, "mercado", limit=2, after=cursor)
+        assert len(seen) == len(set(seen)) == 5
+
+    def test_excludes_deleted_and_other_users(self, client, auth_headers, db, test_user, test_account, test_category):
+        t = _tx(db, test_user.id, test_account.id, test_category.id, "Cinema")
+        t.deleted_at = datetime(2024, 4, 2)
+        db.commit()
+        assert _search(client, auth_headers, "cinema").json() == []
+
+    def test_index_follows_updates(self, client, auth_headers, db, test_user, test_account, test_category):
+        t = _tx(db, test_user.id, test_account.id, test_category.id, "Academia")
+        t.description = "Natação"
+        db.commit()
+        assert _search(client, auth_headers, "academia").json() == []
+        assert [r["id"] for r in _search(client, auth_headers, "natacao").json()] == [t.id]
+
+    def test_empty_terms_and_bad_cursor(self, client, auth_headers):
+        assert _search(client, auth_headers, "!!!").json() == []
+        assert _search(client, auth_headers, "x", after="???").status_code == 400
+
+    def test_benchmark_runs(self, db, test_user):
+        from scripts.benchmark_transaction_search import run_benchmark, seed
+
+        user_id = seed(db, rows=200)
+        results = run_benchmark(db, user_id, ["mercado"], repeat=1)
+        assert results[0]["term"] == "mercado"
+        assert results[0]["indexed_ms"] >= 0
@@ -0,0 +1,216 @@
+"""
+POST /api/transactions/batch: várias transações numa única transação de banco (tudo ou nada),
+validação em lote (contas/categorias), locks uma vez e Idempotency-Key do lote.
+"""
+from datetime import datetime
+from decimal import Decimal
+
+from models import Account, LedgerEntry, Transaction
+from core.ledger_utils import get_balance_from_ledger
+
+
+def _item(account_id, category_id, tx_type, cents, description="Lote", **extra):
+    return {
+        "date": datetime(2024, 3, 1, 12, 0).isoformat(),
+        "account_id": account_id,
+        "category_id": category_id,
+        "type": tx_type,
+        "amount_cents": cents,
+        "description": description,
+        "tags": extra.pop("tags", []),
+        **extra,
+    }
+
+
+def _savings(db, user_id):
+    account = Account(name="Poupança", type="savings", balance=0, user_id=user_id)
+    db.add(account)
+    db.commit()
+    db.refresh(account)
+    return account
+
+
+class TestTransactionsBatch:
+    def test_batch_creates_all_items(self, client, auth_headers, db, test_user, test_account, test_category):
+        """income + expense + transfer entre duas contas; ordem preservada na resposta."""
+        savings = _savings(db, test_user.id)
+        items = [
+            _item(test_account.id, test_category.id, "income", 20000, "Freela", tags=["extra"]),
+            _item(test_account.id, test_category.id, "expense", 5050, "Mercado"),
+            _item(test_account.id, test_category.id, "transfer", 30000, "Reserva", to_account_id=savings.id),
+        ]
+        response = client.post("/api/transactions/batch", json={"items": items}, headers=auth_headers)
+        assert response.status_code == 200, response.text
+        body = response.json()
+        assert body["created"] == 3
+        assert [t["description"] for t in body["transactions"]][:2] == ["Freela", "Mercado"]
+        assert body["transactions"][0]["tags"] == ["extra"]
+
+        db.expire_all()
+        assert Decimal(str(get_balance_from_ledger(test_account.id, db))) == Decimal("849.50")
+        assert Decimal(str(get_balance_from_ledger(savings.id, db))) == Decimal("300.00")
+        assert Decimal(str(db.query(Account).get(test_account.id).balance)) == Decimal("849.50")
+
+    def test_batch_transfers_lock_accounts_once(
+        self, client, auth_headers, db, test_user, test_account, test_category, monkeypatch
+    ):
+        """
+        Origem e destino de todos os itens bloqueados num único lock_accounts_for_write; a checagem
+        de saldo das transferências vê as receitas e transferências anteriores do lote.
+        """
+        import services.transaction_service as transaction_service
+
+        savings = _savings(db, test_user.id)
+        calls = []
+        original = transaction_service.lock_accounts_for_write
+
+        def counting(account_ids, db_, **kwargs):
+            calls.append(sorted(set(account_ids)))
+            return original(account_ids, db_, **kwargs)
+
+        monkeypatch.setattr(transaction_service, "lock_accounts_for_write", counting)
+        items = [
+            _item(test_account.id, test_category.id, "income", 50000, "Salário"),
+            _item(test_account.id, test_category.id, "transfer", 120000, "Reserva", to_account_id=savings.id),
+            _item(savings.id, test_category.id, "transfer", 20000, "Volta", to_account_id=test_account.id),
+        ]
+        response = client.post("/api/transactions/batch", json={"items": items}, headers=auth_headers)
+        assert response.status_code == 200, response.text
+        assert calls == [sorted([test_account.id, savings.id])]
+
+        db.expire_all()
+        assert Decimal(str(db.query(Account).get(test_account.id).balance)) == Decimal("500.00")
+        assert Decimal(str(db.query(Account).get(savings.id).balance)) == Decimal("1000.00")
+        assert Decimal(str(get_balance_from_ledger(savings.id, db))) == Decimal("1000.00")
+
+    def test_batch_checks_balance_in_item_order(self, client, auth_headers, db, test_user, test_account, test_category):
+        """A transferência vê só os itens anteriores: despesa listada depois não reduz o saldo checado."""
+        savings = _savings(db, test_user.id)
+        items = [
+            _item(test_account.id, test_category.id, "transfer", 80000, "Reserva", to_account_id=savings.id),
+            _item(test_account.id, test_category.id, "expense", 50000, "Aluguel"),
+        ]
+        response = client.post("/api/transactions/batch", json={"items": items}, headers=auth_headers)
+        assert response.status_code == 200, response.text
+        assert [t["type"] for t in response.json()["transactions"]] == ["transfer", "expense"]
+        db.expire_all()
+        assert Decimal(str(db.query(Account).get(test_account.id).balance)) == Decimal("-300.00")
+        assert Decimal(str(get_balance_from_ledger(savings.id, db))) == Decimal("800.00")
+        out_leg = db.query(Transaction).filter(Transaction.account_id == test_account.id, Transaction.type == "transfer").one()
+        in_leg = db.query(Transaction).filter(Transaction.account_id == savings.id).one()
+        assert (out_leg.transfer_transaction_id, in_leg.transfer_transaction_id) == (in_leg.id, out_leg.id)
+
+        # Ordem inversa: a despesa anterior deixa saldo insuficiente para a transferência
+        items.reverse()
+        response = client.post("/api/transactions/batch", json={"items": items}, headers=auth_headers)
+        assert response.status_code == 422
+        assert response.json()["detail"]["code"] == "TX_INSUFFICIENT_BALANCE"
+        assert db.query(Transaction).count() == 3
+
+    def test_batch_checks_ownership_before_locking(
+        self, client, auth_headers, test_account, test_category, monkeypatch
+    ):
+        import services.transaction_service as transaction_service
+
+        calls = []
+        original = transaction_service.lock_accounts_for_write
+
+        def counting(account_ids, db_, **kwargs):
+            calls.append(sorted(set(account_ids)))
+            return original(account_ids, db_, **kwargs)
+
+        monkeypatch.setattr(transaction_service, "lock_accounts_for_write", counting)
+        items = [_item(test_account.id, test_category.id, "transfer", 500, to_account_id="conta-de-outro")]
+        response = client.post("/api/transactions/batch", json={"items": items}, headers=auth_headers)
+        assert response.status_code == 404
+        assert calls == [[test_account.id]]
+
+    def test_batch_transfer_to_unknown_account(self, client, auth_headers, db, test_account, test_category):
+        items = [
+            _item(test_account.id, test_category.id, "income", 1000),
+            _item(test_account.id, test_category.id, "transfer", 500, to_account_id="conta-de-outro"),
+        ]
+        response = client.post("/api/transactions/batch", json={"items": items}, headers=auth_headers)
+        assert response.status_code == 404
+        assert db.query(Transaction).count() == 0
+
+    def test_batch_is_atomic(self, client, auth_headers, db, test_account, test_category):
+        """Uma categoria inválida → 404 e nada é gravado."""
+        items = [
+            _item(test_account.id, test_category.id, "income", 1000),
+            _item(test_account.id, "categoria-inexistente", "expense", 500),
+        ]
+        response = client.post("/api/transactions/batch", json={"items": items}, headers=auth_headers)
+        assert response.status_code == 404
+        assert db.query(Transaction).count() == 0
+        assert db.query(LedgerEntry).filter(LedgerEntry.transaction_id.isnot(None)).count() == 0
+
+    def test_batch_unknown_account(self, client, auth_headers, test_account, test_category):
+        items = [_item("conta-de-outro", test_category.id, "income", 1000)]
+        response = client.post("/api/transactions/batch", json={"items": items}, headers=auth_headers)
+        assert response.status_code == 404
+
+    def test_batch_idempotency_key(self, client, auth_headers, db, test_account, test_category):
+        """Mesma key + mesmo body → mesma resposta, sem duplicar."""
+        items = [_item(test_account.id, test_category.id, "income", 1000)]
+        headers = {**auth_headers, "Idempotency-Key": "lote-1"}
+        first = client.post("/api/transactions/batch", json={"items": items}, headers=headers)
+        second = client.post("/api/transactions/batch", json={"items": items}, headers=headers)
+        assert first.status_code == 200 and second.status_code == 200
+        assert first.json()["transactions"][0]["id"] == second.json()["transactions"][0]["id"]
+        assert db.query(Transaction).count() == 1
+
+    def test_batch_limits(self, client, auth_headers, test_account, test_category):
+        assert client.post("/api/transactions/batch", json={"items": []}, headers=auth_headers).status_code == 422
+        items = [_item(test_account.id, test_category.id, "income", 100)] * 101
+        assert client.post("/api/transactions/batch", json={"items": items}, headers=auth_headers).status_code == 422
+
+
+class TestTransactionsBatchDelete:
+    """DELETE /api/transactions (lote) set-based: estornos em lote, parceira de transferência, round trips constantes."""
+
+    def _create_many(self, client, headers, account_id, category_id, n):
+        items = [_item(account_id, category_id, "expense", 1000 + i) for i in range(n)]
+        response = client.post("/api/transactions/batch", json={"items": items}, headers=headers)
+        return [t["id"] for t in response.json()["transactions"]]
+
+    def test_batch_delete_reverts_balances(self, client, auth_headers, db, test_user, test_account, test_category):
+        savings = _savings(db, test_user.id)
+        items = [
+            _item(test_account.id, test_category.id, "expense", 10000),
+            _item(test_account.id, test_category.id, "transfer", 20000, to_account_id=savings.id),
+        ]
+        created = client.post("/api/transactions/batch", json={"items": items}, headers=auth_headers).json()
+        ids = [t["id"] for t in created["transactions"]]
+
+        response = client.request(
+            "DELETE", "/api/transactions/", json={"ids": ids + ["nao-existe"]}, headers=auth_headers
+        )
+        assert response.status_code == 200
+        body = response.json()
+        assert body["deleted_ids"] == ids
+        assert body["errors"] == [{"id": "nao-existe", "reason": "not_found"}]
+
+        db.expire_all()
+        assert db.query(Transaction).count() == 0
+        assert Decimal(str(get_balance_from_ledger(test_account.id, db))) == Decimal("1000.00")
+        assert Decimal(str(get_balance_from_ledger(savings.id, db))) == Decimal("0")
+        assert Decimal(str(db.query(Account).get(savings.id).balance)) == Decimal("0")
+
+    def test_batch_delete_constant_round_trips(
+        self, client, auth_headers, db, test_account, test_category, count_statements
+    ):
+        """Excluir 2 ou 20 transações custa o mesmo número de statements SQL."""
+        from core.side_effects import post_commit_dispatcher
+
+        def delete_statements(ids):
+            # Efeitos pós-commit das criações rodam em workers no mesmo engine: não contar os deles
+            post_commit_dispatcher.wait_idle()
+            with count_statements(db) as statements:
+                response = client.request("DELETE", "/api/transactions/", json={"ids": ids}, headers=auth_headers)
+            assert response.json()["deleted"] == len(ids)
+            return len(statements)
+
+        small = self._create_many(client, auth_headers, test_account.id, test_category.id, 2)
+        large = self._create_many(client, auth_headers, test_account.id, test_category.id, 20)
+        assert delete_statements(small) == delete_statements(large)
@@ -0,0 +1,131 @@
+"""
+Group commit por conta (core.write_coalescer): escritas concorrentes na mesma conta são
+aplicadas numa única transação; cada chamador recebe o próprio resultado ou erro.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+import services.transaction_service as transaction_service
+from core.ledger_utils import get_balance_from_ledger
+from core.write_coalescer import AccountWriteCoalescer
+from models import Account, Transaction
+from services.transaction_service import TransactionService
+
+
+def _counting_coalescer(window_ms=300, max_batch=50):
+    """Coalescer do service com contagem de lotes aplicados."""
+    batches = []
+
+    def apply(session, key, items):
+        batches.append(len(items))
+        return TransactionService.create_transactions_bulk(items, key[0], session)
+
+    return AccountWriteCoalescer(apply_batch=apply, window_ms=window_ms, max_batch=max_batch), batches
+
+
+def _data(category_id, cents, description, **extra):
+    return {
+        "date": datetime(2024, 6, 1, 10, 0),
+        "category_id": category_id,
+        "type": "expense",
+        "amount_cents": cents,
+        "description": description,
+        "tags": [],
+        **extra,
+    }
+
+
+def _create_in_thread(bind, user_id, account_id, data):
+    session = sessionmaker(bind=bind, autoflush=False)()
+    try:
+        account = session.query(Account).get(account_id)
+        return TransactionService.create_transaction_coalesced(data, account, user_id, session).id
+    finally:
+        session.close()
+
+
+class TestWriteCoalescer:
+    def test_concurrent_writes_share_one_commit(self, db, test_user, test_account, test_category, monkeypatch):
+        coalescer, batches = _counting_coalescer()
+        monkeypatch.setattr(transaction_service, "_write_coalescer", coalescer)
+        bind, user_id, account_id = db.get_bind(), test_user.id, test_account.id
+
+        with ThreadPoolExecutor(max_workers=5) as executor:
+            futures = [
+                executor.submit(
+                    _create_in_thread, bind, user_id, account_id,
+                    _data(test_category.id, 1000 * (i + 1), f"Rateio {i}"),
+                )
+                for i in range(5)
+            ]
+            ids = [f.result() for f in futures]
+
+        assert batches == [5]
+        db.expire_all()
+        by_id = {t.id: t for t in db.query(Transaction).filter(Transaction.id.in_(ids))}
+        assert sorted(by_id[i].description for i in ids) == [f"Rateio {i}" for i in range(5)]
+        # 1000 - (10 + 20 + 30 + 40 + 50)
+        assert Decimal(str(get_balance_from_ledger(account_id, db))) == Decimal("850.00")
+        assert Decimal(str(db.query(Account).get(account_id).balance)) == Decimal("850.00")
+
+    def test_full_group_is_flushed_without_waiting_window(self, db, test_user, test_account, test_category, monkeypatch):
+        coalescer, batches = _counting_coalescer(window_ms=60_000, max_batch=1)
+        monkeypatch.setattr(transaction_service, "_write_coalescer", coalescer)
+        tx = TransactionService.create_transaction_coalesced(
+            _data(test_category.id, 500, "Sozinha"), test_account, test_user.id, db
+        )
+        assert tx.description == "Sozinha"
+        assert batches == [1]
+
+    def test_failed_write_does_not_fail_the_group(self, db):
+        """Lote com erro é reaplicado escrita a escrita: só o item inválido recebe a exceção."""
+        calls = []
+
+        def apply(session, key, items):
+            calls.append(list(items))
+            if "ruim" in items:
+                raise ValueError("item inválido")
+            return [f"ok:{item}" for item in items]
+
+        coalescer = AccountWriteCoalescer(apply_batch=apply, window_ms=300)
+        barrier = threading.Barrier(3)
+        bind = db.get_bind()
+
+        def submit(item):
+            barrier.wait()
+            return coalescer.submit(bind, ("u", "a"), item)
+
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            futures = {item: executor.submit(submit, item) for item in ("a", "ruim", "b")}
+        assert futures["a"].result() == "ok:a"
+        assert futures["b"].result() == "ok:b"
+        with pytest.raises(ValueError):
+            futures["ruim"].result()
+        assert len(calls[0]) == 3 and len(calls) == 4
+
+    def test_post_uses_group_commit_when_enabled(
+        self, client, auth_headers, db, test_account, test_category, monkeypatch
+    ):
+        coalescer, batches = _counting_coalescer(window_ms=1)
+        monkeypatch.setattr(transaction_service, "_write_coalescer", coalescer)
+        monkeypatch.setattr(transaction_service, "TX_GROUP_COMMIT_ENABLED", True)
+        payload = {
+            "date": datetime(2024, 6, 2, 9, 0).isoformat(),
+            "account_id": test_account.id,
+            "category_id": test_category.id,
+            "type": "expense",
+            "amount_cents": 2500,
+            "description": "Feira",
+            "tags": ["casa"],
+        }
+        response = client.post("/api/transactions/", json=payload, headers=auth_headers)
+        assert response.status_code == 200, response.text
+        assert response.json()["tags"] == ["casa"]
+        assert batches == [1]
+        db.expire_all()
+        assert Decimal(str(db.query(Account).get(test_account.id).balance)) == Decimal("975.00")